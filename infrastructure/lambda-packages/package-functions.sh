@@ -9,6 +9,13 @@ LAMBDA_DIR="/Users/christianperez/Desktop/VetROI/lambda"
 PACKAGES_DIR="/Users/christianperez/Desktop/VetROI/infrastructure/lambda-packages"
 DEPLOY_BUCKET="vetroi-cloudformation-deploys-20250619"
 
+# Bundle lambda/shared/vetroi_shared into a single-file package
+add_shared() {
+    cd "$LAMBDA_DIR/shared"
+    zip -r "$1" vetroi_shared -x '*__pycache__*'
+    cd - > /dev/null
+}
+
 # DD214 Upload
 echo ""
 echo "Processing VetROI_DD214_GenerateUploadURL..."
@@ -27,6 +34,7 @@ if [ -f "$LAMBDA_DIR/dd214_status/lambda_function.py" ]; then
     cd "$LAMBDA_DIR/dd214_status"
     zip -r "$PACKAGES_DIR/VetROI_DD214_GetStatus.zip" lambda_function.py
     cd - > /dev/null
+    add_shared "$PACKAGES_DIR/VetROI_DD214_GetStatus.zip"
     aws s3 cp "$PACKAGES_DIR/VetROI_DD214_GetStatus.zip" "s3://$DEPLOY_BUCKET/lambda/VetROI_DD214_GetStatus.zip" --region us-east-2
     echo "✅ Packaged and uploaded VetROI_DD214_GetStatus"
 fi
@@ -49,6 +57,7 @@ if [ -f "$LAMBDA_DIR/dd214_get_insights/lambda_function.py" ]; then
     cd "$LAMBDA_DIR/dd214_get_insights"
     zip -r "$PACKAGES_DIR/VetROI_DD214_GetInsights.zip" lambda_function.py
     cd - > /dev/null
+    add_shared "$PACKAGES_DIR/VetROI_DD214_GetInsights.zip"
     aws s3 cp "$PACKAGES_DIR/VetROI_DD214_GetInsights.zip" "s3://$DEPLOY_BUCKET/lambda/VetROI_DD214_GetInsights.zip" --region us-east-2
     echo "✅ Packaged and uploaded VetROI_DD214_GetInsights"
 fi
@@ -82,6 +91,7 @@ if [ -d "$LAMBDA_DIR/dd214_insights/src" ]; then
     cd "$LAMBDA_DIR/dd214_insights/src"
     zip -r "$PACKAGES_DIR/VetROI_DD214_Insights.zip" .
     cd - > /dev/null
+    add_shared "$PACKAGES_DIR/VetROI_DD214_Insights.zip"
     aws s3 cp "$PACKAGES_DIR/VetROI_DD214_Insights.zip" "s3://$DEPLOY_BUCKET/lambda/VetROI_DD214_Insights.zip" --region us-east-2
     echo "✅ Packaged and uploaded VetROI_DD214_Insights"
 fi
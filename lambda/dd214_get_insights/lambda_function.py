@@ -2,6 +2,8 @@ import json
 import boto3
 import os
 from typing import Dict, Any
+
+from vetroi_shared.compression import compress_event_response
 from decimal import Decimal
 
 class DecimalEncoder(json.JSONEncoder):
@@ -22,8 +24,15 @@ s3_client = boto3.client('s3')
 PROCESSING_TABLE = os.environ.get('PROCESSING_TABLE', 'VetROI_DD214_Processing')
 INSIGHTS_TABLE = os.environ.get('INSIGHTS_TABLE', 'VetROI_CareerInsights')
 
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Get DD214 processing insights"""
+    # Compressed only behind an HTTP API; VetROI_DD214_API (REST) has no binaryMediaTypes
+    return compress_event_response(get_insights(event), event)
+
+
+def get_insights(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Look up insights for the documentId in the path"""
     
     # Extract document ID from path parameters
     path_params = event.get('pathParameters', {})
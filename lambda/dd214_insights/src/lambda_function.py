@@ -9,6 +9,7 @@ import random
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from vetroi_shared.token_budget import estimate_tokens, input_budget, output_budget, truncate_to_tokens
 try:
     from enhanced_prompts_original import get_original_dd214_prompt
     from enhanced_prompts_v2 import get_legacy_intelligence_prompt, get_meta_ai_prompts
@@ -29,6 +30,15 @@ MODEL_ID = os.environ.get('MODEL_ID', 'us.amazon.nova-lite-v1:0')
 S3_DATA_BUCKET = os.environ.get('S3_DATA_BUCKET', 'altroi-data')
 REDACTED_BUCKET = os.environ.get('REDACTED_BUCKET', 'vetroi-dd214-redacted')
 
+# Expected reply size per call; maxTokens adds headroom and is capped by the model (see token_budget.py)
+INSIGHTS_OUTPUT_TOKENS = 8000
+BASIC_INSIGHTS_OUTPUT_TOKENS = 1600
+LEGACY_REPORT_OUTPUT_TOKENS = 4000
+META_AI_OUTPUT_TOKENS = 2400
+
+# Room left for the prompt templates that wrap the DD214 text
+PROMPT_TEMPLATE_TOKENS = 8000
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Generate AI-powered career insights from DD214 data"""
     
@@ -72,6 +82,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         redacted_text = get_redacted_document(document_id)
         
         if redacted_text:
+            # Oversized OCR output would overflow the model context; keep the leading pages
+            text_budget = input_budget(MODEL_ID, INSIGHTS_OUTPUT_TOKENS) - PROMPT_TEMPLATE_TOKENS
+            redacted_text = truncate_to_tokens(redacted_text, text_budget)
+
             # Use AI to analyze the full redacted document
             insights = generate_ai_insights_from_dd214(redacted_text, document_id)
         else:
@@ -610,7 +624,7 @@ CRITICAL SUCCESS FACTORS:
                 'content': [{'text': prompt}]
             }],
             inferenceConfig={
-                'maxTokens': 10000,
+                'maxTokens': output_budget(MODEL_ID, estimate_tokens(prompt), INSIGHTS_OUTPUT_TOKENS),
                 'temperature': 0.8,
                 'topP': 0.95
             }
@@ -705,7 +719,7 @@ def generate_ai_insights(profile: Dict[str, Any], onet_matches: List[Dict[str, A
                 'content': [{'text': prompt}]
             }],
             inferenceConfig={
-                'maxTokens': 2000,
+                'maxTokens': output_budget(MODEL_ID, estimate_tokens(prompt), BASIC_INSIGHTS_OUTPUT_TOKENS),
                 'temperature': 0.7,
                 'topP': 0.9
             }
@@ -922,7 +936,7 @@ def generate_legacy_report(redacted_text: str, veteran_profile: Dict[str, Any])
                 'content': [{'text': prompt}]
             }],
             inferenceConfig={
-                'maxTokens': 5000,  # Need high token count for 1500 words
+                'maxTokens': output_budget(MODEL_ID, estimate_tokens(prompt), LEGACY_REPORT_OUTPUT_TOKENS),
                 'temperature': 0.9,  # Higher temperature for creative writing
                 'topP': 0.95
             }
@@ -966,7 +980,7 @@ def generate_meta_ai_recommendations(veteran_profile: Dict[str, Any], ai_insight
                 'content': [{'text': prompt}]
             }],
             inferenceConfig={
-                'maxTokens': 3000,
+                'maxTokens': output_budget(MODEL_ID, estimate_tokens(prompt), META_AI_OUTPUT_TOKENS),
                 'temperature': 0.8,
                 'topP': 0.9
             }
@@ -3,6 +3,8 @@ import boto3
 import os
 from typing import Dict, Any
 
+from vetroi_shared.compression import compress_event_response
+
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 stepfunctions = boto3.client('stepfunctions')
@@ -12,8 +14,15 @@ s3_client = boto3.client('s3')
 TABLE_NAME = os.environ.get('TABLE_NAME', 'VetROI_DD214_Processing')
 BUCKET_NAME = os.environ.get('BUCKET_NAME', 'vetroi-dd214-secure')
 
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Get DD214 processing status"""
+    # Compressed only behind an HTTP API; VetROI_DD214_API (REST) has no binaryMediaTypes
+    return compress_event_response(get_status(event), event)
+
+
+def get_status(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Look up processing status for the documentId in the path"""
     
     # Extract document ID from path parameters
     path_params = event.get('pathParameters', {})
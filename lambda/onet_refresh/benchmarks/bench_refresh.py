@@ -0,0 +1,205 @@
+"""
+O*NET refresh wall-clock time, sequential vs concurrent, per code vs per SOC
+
+    cd lambda/onet_refresh && python benchmarks/bench_refresh.py
+
+Runs the refresh against a local fake O*NET that answers every request after
+a fixed delay, standing in for the real API's round trip. S3 writes go to a
+dict.
+
+The first comparison uses the handler's crosswalk. Its baseline is the
+original refresh loop: one code at a time, with the three calls for each SOC
+made in turn. That is compared with the refresh engine with no rate limit,
+and with the default token bucket the Lambda uses. Every run must describe
+the same careers for every code.
+
+The second uses a synthetic crosswalk in which codes share SOCs, as real
+ones do. It compares fetching and storing full details per code x SOC with
+the per-SOC store, at the default rate limit, by requests, S3 bytes and wall
+clock.
+
+The handler imports boto3 and powertools; run with the recommend Lambda's
+vendored packages on PYTHONPATH if they are not installed.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('POWERTOOLS_LOG_LEVEL', 'WARNING')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from src import handler  # noqa: E402
+from src.refresh_engine import (  # noqa: E402
+    BURST, MAX_WORKERS, RATE_PER_SECOND, RESOURCES, RefreshEngine, TokenBucket, build_session, career_payload,
+    resource_path
+)
+
+LATENCY_SECONDS = 0.25
+
+# Synthetic overlapping crosswalk: codes x top matches drawn from a shared pool
+SOCS_PER_CODE = 5
+SOC_POOL = [f'{major}-{minor:04d}.00' for major in (11, 13, 15, 29, 33, 43, 47, 49) for minor in range(1011, 1016)]
+
+
+class FakeONet(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with FakeONet.lock:
+            FakeONet.active += 1
+            FakeONet.peak = max(FakeONet.peak, FakeONet.active)
+        time.sleep(LATENCY_SECONDS)
+
+        soc, _, resource = self.path.split('/occupations/', 1)[1].partition('/')
+        if resource == 'tasks':
+            body = {'tasks': [{'statement': f'{soc} task {i}'} for i in range(8)]}
+        elif resource == 'skills':
+            body = {'skills': [{'name': f'{soc} skill {i}'} for i in range(12)]}
+        else:
+            body = {'code': soc, 'title': f'Occupation {soc}', 'description': 'x' * 400, 'job_zones': [3]}
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with FakeONet.lock:
+            FakeONet.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def sequential_refresh(base_url, codes):
+    """The refresh loop as it was before the engine, for the baseline"""
+    session = requests.Session()
+    files = {}
+    for code in codes:
+        careers = []
+        for soc in handler.get_military_crosswalk(session, code)[:10]:
+            response = session.get(f"{base_url}/occupations/{soc}", timeout=10)
+            if response.status_code != 200:
+                continue
+            data = response.json()
+            tasks = session.get(f"{base_url}/occupations/{soc}/tasks", timeout=10).json().get('tasks', [])
+            skills = session.get(f"{base_url}/occupations/{soc}/skills", timeout=10).json().get('skills', [])
+            careers.append({
+                'soc': soc,
+                'title': data.get('title', ''),
+                'description': data.get('description', ''),
+                'tasks': [task['statement'] for task in tasks][:5],
+                'skills': [skill['name'] for skill in skills][:10],
+                'job_zones': data.get('job_zones', [])
+            })
+        files[f"military/{code}/careers.json"] = careers
+    return files
+
+
+def engine_refresh(base_url, codes, limiter):
+    """The handler's refresh; returns each code's careers rebuilt from the per-SOC files"""
+    files = {}
+
+    def put(key, data):
+        body = json.dumps(data)
+        files[key] = json.loads(body)
+        return len(body)
+
+    engine = RefreshEngine(build_session(None, MAX_WORKERS), base_url, limiter, MAX_WORKERS)
+    handler.refresh_military_codes(engine, codes, put)
+
+    careers = {
+        key: [{k: v for k, v in files[handler.OCCUPATION_KEY.format(soc=soc)].items() if k != 'refreshed_at'}
+              for soc in data['socs']]
+        for key, data in files.items() if key.startswith('military/')
+    }
+    return careers, engine, sum(len(json.dumps(data)) for data in files.values())
+
+
+def per_code_refresh(base_url, codes, limiter):
+    """Concurrent refresh storing full details per code, fetching every code x SOC"""
+    engine = RefreshEngine(build_session(None, MAX_WORKERS), base_url, limiter, MAX_WORKERS)
+    crosswalks = {code: handler.get_military_crosswalk(None, code)[:10] for code in codes}
+    jobs = [(soc, resource) for code in codes for soc in crosswalks[code] for resource in RESOURCES]
+    responses = iter(engine.run_all(lambda job: engine.get_json(resource_path(*job)), jobs))
+
+    bytes_written = 0
+    for code in codes:
+        careers = [career_payload(soc, *(next(responses) for _ in RESOURCES)) for soc in crosswalks[code]]
+        bytes_written += len(json.dumps({'military_code': code, 'careers': [c for c in careers if c],
+                                         'refreshed_at': '2026-01-01T00:00:00'}))
+    return engine, bytes_written
+
+
+def overlapping_crosswalk(codes):
+    rng = random.Random(7)
+    mappings = {code: rng.sample(SOC_POOL, SOCS_PER_CODE) for code in codes}
+    return lambda session, military_code: mappings.get(military_code, [])
+
+
+def timed(fn):
+    FakeONet.peak = 0
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeONet)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    codes = handler.MILITARY_CODES
+    n_requests = 3 * sum(len(handler.get_military_crosswalk(None, code)[:10]) for code in codes)
+
+    print(f"{len(codes)} military codes, {n_requests} O*NET requests, {LATENCY_SECONDS * 1000:.0f} ms per request, "
+          f"{MAX_WORKERS} workers")
+
+    baseline, sequential_s = timed(lambda: sequential_refresh(base_url, codes))
+    print(f"  sequential loop:                 {sequential_s:6.2f} s  (peak {FakeONet.peak} in flight)")
+
+    (careers, _, _), unlimited_s = timed(lambda: engine_refresh(base_url, codes, None))
+    assert careers == baseline
+    print(f"  engine, no rate limit:           {unlimited_s:6.2f} s  (peak {FakeONet.peak} in flight)  "
+          f"{sequential_s / unlimited_s:4.1f}x")
+
+    limiter = TokenBucket(RATE_PER_SECOND, BURST)
+    (careers, _, _), limited_s = timed(lambda: engine_refresh(base_url, codes, limiter))
+    assert careers == baseline
+    print(f"  engine, {RATE_PER_SECOND:g} req/s burst {BURST}:     {limited_s:6.2f} s  "
+          f"(peak {FakeONet.peak} in flight)  {sequential_s / limited_s:4.1f}x, "
+          f"{limiter.waited_seconds:.1f} s token wait across workers")
+
+    handler.get_military_crosswalk = overlapping_crosswalk(codes)
+    n_pairs = len(codes) * SOCS_PER_CODE
+    n_distinct = len({soc for code in codes for soc in handler.get_military_crosswalk(None, code)})
+    print(f"\nOverlapping crosswalk: {len(codes)} codes x {SOCS_PER_CODE} SOCs, {n_distinct} distinct, "
+          f"{RATE_PER_SECOND:g} req/s burst {BURST}")
+
+    (engine, per_code_bytes), per_code_s = timed(
+        lambda: per_code_refresh(base_url, codes, TokenBucket(RATE_PER_SECOND, BURST)))
+    assert engine.requests_made == 3 * n_pairs
+    print(f"  per code x SOC:  {engine.requests_made:4d} requests  {per_code_bytes / 1024:6.1f} KiB  "
+          f"{per_code_s:6.2f} s")
+
+    (_, engine, per_soc_bytes), per_soc_s = timed(
+        lambda: engine_refresh(base_url, codes, TokenBucket(RATE_PER_SECOND, BURST)))
+    assert engine.requests_made == 3 * n_distinct
+    print(f"  per SOC:         {engine.requests_made:4d} requests  {per_soc_bytes / 1024:6.1f} KiB  "
+          f"{per_soc_s:6.2f} s  ({per_code_s / per_soc_s:.1f}x faster, "
+          f"{per_code_bytes / per_soc_bytes:.1f}x fewer bytes)")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,15 @@
 import json
 import os
+import time
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, List, Tuple
 
 import boto3
 import requests
 from aws_lambda_powertools import Logger, Tracer
 
+from .refresh_engine import BURST, MAX_WORKERS, RATE_PER_SECOND, RefreshEngine, TokenBucket, build_session
+
 logger = Logger()
 tracer = Tracer()
 
@@ -17,6 +20,9 @@ CACHE_BUCKET = os.environ.get('CACHE_BUCKET')
 ONET_API_URL = os.environ.get('ONET_API_URL', 'https://services.onetcenter.org/ws')
 SECRET_NAME = os.environ.get('ONET_SECRET_NAME', 'VetROI/ONet/ApiCredentials')
 
+# Career details are stored once per SOC; military/{code}/careers.json lists SOCs
+OCCUPATION_KEY = 'occupations/{soc}.json'
+
 # Common military codes to refresh
 MILITARY_CODES = [
     '11B', '11C', '13B', '19D', '25B', '31B', '35S', '68W', '88M', '92Y',  # Army
@@ -36,26 +42,24 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Get O*NET credentials
         auth = get_onet_credentials()
         
-        # Initialize session
-        session = requests.Session()
-        session.auth = (auth['username'], auth['password'])
-        
-        success_count = 0
-        error_count = 0
+        # One pooled session and rate limit shared by every worker
+        session = build_session((auth['username'], auth['password']), MAX_WORKERS)
+        engine = RefreshEngine(session, ONET_API_URL, TokenBucket(RATE_PER_SECOND, BURST), MAX_WORKERS)
         
-        # Refresh data for each military code
-        for military_code in MILITARY_CODES:
-            try:
-                refresh_military_code(session, military_code)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Failed to refresh {military_code}: {e}")
-                error_count += 1
+        started = time.perf_counter()
+        success_count, error_count = refresh_military_codes(engine, MILITARY_CODES)
         
         # Refresh general career data
         refresh_top_careers(session)
         
-        logger.info(f"Refresh complete. Success: {success_count}, Errors: {error_count}")
+        logger.info(
+            f"Refresh complete. Success: {success_count}, Errors: {error_count}",
+            extra={
+                'elapsed_seconds': round(time.perf_counter() - started, 2),
+                'onet_requests': engine.requests_made,
+                'rate_limit_wait_seconds': round(engine.limiter.waited_seconds, 2)
+            }
+        )
         
         return {
             'status': 'success' if error_count == 0 else 'partial',
@@ -80,35 +84,70 @@ def get_onet_credentials() -> Dict[str, str]:
 
 
 @tracer.capture_method
-def refresh_military_code(session: requests.Session, military_code: str) -> None:
-    """Refresh O*NET data for a specific military code"""
+def refresh_military_codes(engine: RefreshEngine, military_codes: List[str],
+                           put_cache: Callable[[str, Dict[str, Any]], int] = None) -> Tuple[int, int]:
+    """
+    Refresh O*NET data for many military codes at once
     
-    logger.info(f"Refreshing data for military code: {military_code}")
+    Each distinct SOC across all codes is fetched once and stored under
+    OCCUPATION_KEY. Each code's file then lists its SOCs in match order rather
+    than copying their details. SOC files are written first, so a code never
+    references one that failed. Returns (success, error) counts of codes.
+    """
+    put_cache = put_cache or put_cache_object
     
-    # Get crosswalk data
-    crosswalk_data = get_military_crosswalk(session, military_code)
+    # Top 10 matches per code
+    crosswalks = {code: get_military_crosswalk(engine.session, code)[:10] for code in military_codes}
+    careers = engine.fetch_careers(soc for code in military_codes for soc in crosswalks[code])
+    logger.info(f"Refreshing {len(military_codes)} military codes, {len(careers)} distinct careers")
     
-    # Get detailed career data for top matches
-    careers = []
-    for soc_code in crosswalk_data[:10]:  # Top 10 matches
-        career_data = get_career_details(session, soc_code)
-        if career_data:
-            careers.append(career_data)
+    refreshed_at = datetime.utcnow().isoformat()
     
-    # Cache the data
-    cache_key = f"military/{military_code}/careers.json"
-    cache_data = {
-        'military_code': military_code,
-        'careers': careers,
-        'refreshed_at': datetime.utcnow().isoformat()
-    }
+    def write_occupation(soc_code: str) -> int:
+        return put_cache(OCCUPATION_KEY.format(soc=soc_code), {**careers[soc_code], 'refreshed_at': refreshed_at})
+    
+    found = [soc for soc, career in careers.items() if career]
+    stored = set()
+    bytes_written = 0
+    for soc_code, result in zip(found, engine.run_all(write_occupation, found)):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to store {soc_code}: {result}")
+        else:
+            stored.add(soc_code)
+            bytes_written += result or 0
+    
+    def write_code(military_code: str) -> int:
+        return put_cache(f"military/{military_code}/careers.json", {
+            'military_code': military_code,
+            'socs': [soc for soc in crosswalks[military_code] if soc in stored],
+            'refreshed_at': refreshed_at
+        })
+    
+    error_count = 0
+    for military_code, result in zip(military_codes, engine.run_all(write_code, military_codes)):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to refresh {military_code}: {result}")
+            error_count += 1
+        else:
+            bytes_written += result or 0
     
+    logger.info(f"Stored {len(stored)} careers for {len(military_codes) - error_count} codes",
+                extra={'bytes_written': bytes_written})
+    
+    return len(military_codes) - error_count, error_count
+
+
+def put_cache_object(key: str, data: Dict[str, Any]) -> int:
+    """Write one JSON document to the cache bucket, returning its size in bytes"""
+    
+    body = json.dumps(data).encode('utf-8')
     s3_client.put_object(
         Bucket=CACHE_BUCKET,
-        Key=cache_key,
-        Body=json.dumps(cache_data),
+        Key=key,
+        Body=body,
         ContentType='application/json'
     )
+    return len(body)
 
 
 @tracer.capture_method
@@ -127,74 +166,6 @@ def get_military_crosswalk(session: requests.Session, military_code: str) -> Lis
     return mock_mappings.get(military_code, [])
 
 
-@tracer.capture_method
-def get_career_details(session: requests.Session, soc_code: str) -> Dict[str, Any]:
-    """Get detailed career information from O*NET"""
-    
-    try:
-        # Get occupation details
-        url = f"{ONET_API_URL}/occupations/{soc_code}"
-        response = session.get(url, timeout=10)
-        
-        if response.status_code != 200:
-            return None
-        
-        data = response.json()
-        
-        # Get additional details (tasks, skills, etc.)
-        tasks = get_occupation_tasks(session, soc_code)
-        skills = get_occupation_skills(session, soc_code)
-        
-        return {
-            'soc': soc_code,
-            'title': data.get('title', ''),
-            'description': data.get('description', ''),
-            'tasks': tasks[:5],
-            'skills': skills[:10],
-            'job_zones': data.get('job_zones', [])
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to get details for {soc_code}: {e}")
-        return None
-
-
-@tracer.capture_method
-def get_occupation_tasks(session: requests.Session, soc_code: str) -> List[str]:
-    """Get tasks for an occupation"""
-    
-    try:
-        url = f"{ONET_API_URL}/occupations/{soc_code}/tasks"
-        response = session.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            tasks = response.json().get('tasks', [])
-            return [task['statement'] for task in tasks]
-        
-        return []
-        
-    except Exception:
-        return []
-
-
-@tracer.capture_method
-def get_occupation_skills(session: requests.Session, soc_code: str) -> List[str]:
-    """Get skills for an occupation"""
-    
-    try:
-        url = f"{ONET_API_URL}/occupations/{soc_code}/skills"
-        response = session.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            skills = response.json().get('skills', [])
-            return [skill['name'] for skill in skills]
-        
-        return []
-        
-    except Exception:
-        return []
-
-
 @tracer.capture_method
 def refresh_top_careers(session: requests.Session) -> None:
     """Refresh general top careers data"""
@@ -242,9 +213,4 @@ def refresh_top_careers(session: requests.Session) -> None:
         'refreshed_at': datetime.utcnow().isoformat()
     }
     
-    s3_client.put_object(
-        Bucket=CACHE_BUCKET,
-        Key=cache_key,
-        Body=json.dumps(cache_data),
-        ContentType='application/json'
-    )
\ No newline at end of file
+    put_cache_object(cache_key, cache_data)
\ No newline at end of file
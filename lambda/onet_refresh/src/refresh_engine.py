@@ -0,0 +1,190 @@
+"""
+Concurrent, rate-limited O*NET fetches for the nightly cache refresh
+
+Each distinct SOC the refresh needs is fetched once, however many military
+codes map to it. Every request goes through one bounded worker pool: the
+detail requests for all SOCs are queued first, and as each one succeeds the
+SOC's tasks and skills requests are queued behind them. A SOC whose detail
+request fails is skipped without fetching its tasks or skills, as the
+sequential refresh did. A shared token bucket caps the request rate across
+all workers, and one requests Session with a per-host pool sized to the
+worker count keeps connections alive between calls.
+
+Follow-up requests are queued by the calling thread, never by a worker, so
+no worker ever blocks waiting on another and the pool cannot deadlock.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from aws_lambda_powertools import Logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = Logger()
+
+# O*NET Web Services throttles bursts with 429s; stay under that by default
+# and let the retry below absorb the occasional one
+MAX_WORKERS = int(os.environ.get('ONET_REFRESH_WORKERS', '8'))
+RATE_PER_SECOND = float(os.environ.get('ONET_REFRESH_RATE_PER_SECOND', '10'))
+BURST = int(os.environ.get('ONET_REFRESH_BURST', '10'))
+REQUEST_TIMEOUT_SECONDS = (3.05, 10)
+MAX_RETRIES = 2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Payload limits kept per SOC, as the sequential refresh had them
+MAX_TASKS = 5
+MAX_SKILLS = 10
+
+# Fetched only for SOCs whose detail request succeeded
+LIST_RESOURCES = ('tasks', 'skills')
+RESOURCES = ('details',) + LIST_RESOURCES
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.waited_seconds = 0.0
+
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+                self.waited_seconds += wait
+            self.sleep(wait)
+
+
+def build_session(auth: Optional[Tuple[str, str]], pool_size: int = MAX_WORKERS) -> requests.Session:
+    """Session with one keep-alive pool per host, sized to the worker count, and GET retries"""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET'}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.auth = auth
+    session.headers.update({'Accept': 'application/json', 'User-Agent': 'VetROI-Refresh/1.0'})
+    return session
+
+
+class RefreshEngine:
+    """Fetches career details for many SOC codes through one worker pool and rate limiter"""
+
+    def __init__(self, session: requests.Session, base_url: str, limiter: Optional[TokenBucket] = None,
+                 max_workers: int = MAX_WORKERS):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.limiter = limiter
+        self.max_workers = max_workers
+        self.requests_made = 0
+        self._count_lock = threading.Lock()
+
+    def get_json(self, path: str) -> Optional[Dict[str, Any]]:
+        """GET one O*NET path; None on any error or non-200"""
+        if self.limiter is not None:
+            self.limiter.acquire()
+        with self._count_lock:
+            self.requests_made += 1
+
+        try:
+            response = self.session.get(f"{self.base_url}{path}", timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code != 200:
+                logger.warning(f"O*NET {path} returned {response.status_code}")
+                return None
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"O*NET {path} failed: {e}")
+            return None
+
+    def fetch_careers(self, soc_codes: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Career payload per distinct SOC code, fetched concurrently
+
+        Repeated codes are fetched once. A SOC whose detail request fails maps
+        to None and its tasks and skills are not requested; failed tasks or
+        skills requests leave that list empty.
+        """
+        unique = list(dict.fromkeys(soc_codes))
+        details: Dict[str, Optional[Dict[str, Any]]] = {}
+        lists: Dict[str, List[Future]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='onet-refresh') as pool:
+            pending = {pool.submit(self.get_json, resource_path(soc, 'details')): soc for soc in unique}
+            for future in as_completed(pending):
+                soc = pending[future]
+                details[soc] = future.result()
+                if details[soc] is not None:
+                    lists[soc] = [pool.submit(self.get_json, resource_path(soc, resource))
+                                  for resource in LIST_RESOURCES]
+
+            return {
+                soc: career_payload(soc, details[soc], *(future.result() for future in lists.get(soc, ())))
+                for soc in unique
+            }
+
+    def run_all(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Apply fn to every item on the worker pool, e.g. the S3 writes; exceptions are returned"""
+        def call(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='onet-refresh') as pool:
+            return list(pool.map(call, items))
+
+
+def resource_path(soc_code: str, resource: str) -> str:
+    if resource == 'details':
+        return f"/occupations/{soc_code}"
+    return f"/occupations/{soc_code}/{resource}"
+
+
+def career_payload(soc_code: str, details: Optional[Dict[str, Any]], tasks: Optional[Dict[str, Any]] = None,
+                   skills: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Cached career for one SOC; None without details. Malformed tasks or skills are skipped"""
+    if not isinstance(details, dict):
+        return None
+    return {
+        'soc': soc_code,
+        'title': details.get('title', ''),
+        'description': details.get('description', ''),
+        'tasks': _item_values(tasks, 'tasks', 'statement')[:MAX_TASKS],
+        'skills': _item_values(skills, 'skills', 'name')[:MAX_SKILLS],
+        'job_zones': details.get('job_zones', [])
+    }
+
+
+def _item_values(response: Optional[Dict[str, Any]], key: str, field: str) -> List[Any]:
+    """field of every item listed under key, skipping items without it"""
+    items = response.get(key) if isinstance(response, dict) else None
+    if not isinstance(items, list):
+        return []
+    return [item[field] for item in items if isinstance(item, dict) and item.get(field)]
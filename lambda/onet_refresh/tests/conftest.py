@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The handler creates its boto3 clients at import
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('POWERTOOLS_TRACE_DISABLED', 'true')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,166 @@
+import threading
+
+import requests
+
+from src import handler
+from src.refresh_engine import MAX_SKILLS, RefreshEngine, TokenBucket, career_payload
+
+
+class FakeClock:
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+class FakeSession:
+    """Answers O*NET occupation paths from a dict; unknown paths are 404s"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.paths = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout):
+        path = url.split('/ws', 1)[1]
+        with self._lock:
+            self.paths.append(path)
+        response = self.responses.get(path, (404, {}))
+        if isinstance(response, Exception):
+            raise response
+        return FakeResponse(*response)
+
+
+def occupation(soc):
+    return {
+        f'/occupations/{soc}': (200, {'code': soc, 'title': f'Occupation {soc}', 'job_zones': [3]}),
+        f'/occupations/{soc}/tasks': (200, {'tasks': [{'statement': f'{soc} task'}]}),
+        f'/occupations/{soc}/skills': (200, {'skills': [{'name': f'{soc} skill'}]}),
+    }
+
+
+def engine_for(responses):
+    return RefreshEngine(FakeSession(responses), 'https://onet.example/ws', max_workers=4)
+
+
+class TestTokenBucket:
+
+    def test_burst_is_free_then_requests_are_paced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=4, burst=3, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            bucket.acquire()
+        assert clock.now == 0
+
+        bucket.acquire()
+        bucket.acquire()
+        assert clock.now == 0.5
+        assert bucket.waited_seconds == 0.5
+
+    def test_idle_time_refills_up_to_the_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=4, burst=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.now += 60
+        bucket.acquire()
+        bucket.acquire()
+        assert bucket.waited_seconds == 0
+
+        bucket.acquire()
+        assert bucket.waited_seconds == 0.25
+
+
+class TestFetchCareers:
+
+    def test_repeated_socs_are_fetched_once(self):
+        engine = engine_for({**occupation('29-2042.00'), **occupation('29-1141.00')})
+
+        careers = engine.fetch_careers(['29-2042.00', '29-1141.00', '29-2042.00', '29-2042.00'])
+
+        assert list(careers) == ['29-2042.00', '29-1141.00']
+        assert engine.requests_made == 6
+        assert careers['29-2042.00']['tasks'] == ['29-2042.00 task']
+
+    def test_failed_details_skip_tasks_and_skills(self):
+        responses = {**occupation('29-2042.00'), **occupation('29-1141.00')}
+        responses['/occupations/29-1141.00'] = (500, {})
+        engine = engine_for(responses)
+
+        careers = engine.fetch_careers(['29-2042.00', '29-1141.00'])
+
+        assert careers['29-1141.00'] is None
+        assert careers['29-2042.00']['skills'] == ['29-2042.00 skill']
+        assert not [path for path in engine.session.paths if path.startswith('/occupations/29-1141.00/')]
+
+    def test_errors_are_isolated_per_soc(self):
+        responses = {**occupation('29-2042.00'), **occupation('29-1141.00'), **occupation('29-2061.00')}
+        responses['/occupations/29-1141.00'] = requests.ConnectionError('reset')
+        responses['/occupations/29-2061.00/tasks'] = (200, ValueError('not JSON'))
+        responses['/occupations/29-2042.00/skills'] = (200, {'skills': [{'name': 'Speaking'}, {'id': 7}, 'x']})
+        engine = engine_for(responses)
+
+        careers = engine.fetch_careers(['29-2042.00', '29-1141.00', '29-2061.00'])
+
+        assert careers['29-1141.00'] is None
+        assert careers['29-2061.00']['tasks'] == []
+        assert careers['29-2061.00']['skills'] == ['29-2061.00 skill']
+        assert careers['29-2042.00']['skills'] == ['Speaking']
+
+
+class TestCareerPayload:
+
+    def test_malformed_items_are_skipped(self):
+        tasks = {'tasks': [{'statement': 'Treat patients'}, {'id': 1}, None, {'statement': ''}]}
+        skills = {'skills': [{'name': f'Skill {i}'} for i in range(MAX_SKILLS + 5)]}
+
+        career = career_payload('29-2042.00', {'title': 'EMT'}, tasks, skills)
+
+        assert career['tasks'] == ['Treat patients']
+        assert len(career['skills']) == MAX_SKILLS
+
+    def test_unexpected_shapes_leave_lists_empty(self):
+        career = career_payload('29-2042.00', {'title': 'EMT'}, {'tasks': 'none'}, ['not', 'a', 'dict'])
+
+        assert (career['tasks'], career['skills']) == ([], [])
+        assert career_payload('29-2042.00', None, None, None) is None
+
+
+class TestRefreshMilitaryCodes:
+
+    def test_shared_socs_are_stored_once_and_failures_are_left_out(self, monkeypatch):
+        crosswalks = {'68W': ['29-2042.00', '29-1141.00'], '68C': ['29-1141.00', '29-2061.00']}
+        monkeypatch.setattr(handler, 'get_military_crosswalk', lambda session, code: crosswalks[code])
+        responses = {**occupation('29-2042.00'), **occupation('29-1141.00')}
+        engine = engine_for(responses)
+        files = {}
+
+        def put(key, data):
+            files[key] = data
+            return 1
+
+        assert handler.refresh_military_codes(engine, ['68W', '68C'], put) == (2, 0)
+        assert engine.requests_made == 3 + 3 + 1
+        assert sorted(key for key in files if key.startswith('occupations/')) == [
+            'occupations/29-1141.00.json', 'occupations/29-2042.00.json'
+        ]
+        assert files['military/68C/careers.json']['socs'] == ['29-1141.00']
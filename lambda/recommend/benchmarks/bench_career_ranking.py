@@ -0,0 +1,64 @@
+"""
+Career ranking latency
+
+    cd lambda/recommend && python benchmarks/bench_career_ranking.py
+
+Builds synthetic features the size of the O*NET database (about 1,000
+occupations, 35 skills) and a matching wage table, then times rank_careers
+for a typical crosswalk result, a large one and a full-catalog ranking.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.career_ranking import OccupationFeatures, rank_careers  # noqa: E402
+from src.wage_table import NATIONAL, WageTable, build_table  # noqa: E402
+
+OCCUPATION_COUNT = 1_016
+SKILL_COUNT = 35
+STATES = [NATIONAL, 'TX', 'CA', 'VA']
+CANDIDATE_COUNTS = [50, 1_000, 5_000]
+
+
+def synthetic_features(rng):
+    socs = [f'{11 + i % 43:02d}-{1000 + i:04d}.00' for i in range(OCCUPATION_COUNT)]
+    occupations = [[soc, rng.randint(1, 5), rng.getrandbits(SKILL_COUNT)] for soc in socs]
+    return OccupationFeatures([f'Skill {i}' for i in range(SKILL_COUNT)], occupations)
+
+
+def synthetic_wages(socs, rng):
+    path = os.path.join(tempfile.mkdtemp(), 'wage_table.bin')
+    build_table(({
+        'AREA_TYPE': '1' if state == NATIONAL else '2', 'PRIM_STATE': state, 'OCC_CODE': soc[:7],
+        'O_GROUP': 'detailed', 'TOT_EMP': '1000', 'A_MEAN': str(median), 'A_PCT10': str(median),
+        'A_PCT25': str(median), 'A_MEDIAN': str(median), 'A_PCT75': str(median), 'A_PCT90': str(median)
+    } for soc in socs for state in STATES for median in [rng.randint(25_000, 180_000)]), path)
+    return WageTable(path)
+
+
+def main():
+    rng = random.Random(7)
+    features = synthetic_features(rng)
+    socs = list(features._rows)
+    table = synthetic_wages(socs, rng)
+    profile = {'education': 'associate', 'homeState': 'TX', 'relocate': False, 'clearance': 'Secret',
+               'skills': ['Skill 3', 'Skill 8', 'Skill 21', 'Skill 30']}
+    print(f"features: {len(features)} occupations x {SKILL_COUNT} skills")
+
+    for count in CANDIDATE_COUNTS:
+        candidates = [rng.choice(socs) for _ in range(count)]
+        rank_careers(candidates, profile, features, table)
+        number = max(20, 20_000 // count)
+        seconds = timeit.timeit(lambda: rank_careers(candidates, profile, features, table), number=number) / number
+        print(f"rank {count:>5} candidates, top 10: {seconds * 1e3:.2f} ms ({seconds * 1e6 / count:.2f} us each)")
+
+    table.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Bytes saved and CPU cost of response compression by payload size
+
+    cd lambda/recommend && python benchmarks/bench_compression.py
+
+Payloads are synthetic crosswalk responses shaped like O*NET's
+/online/crosswalks/military output, grown to each target size. Wire bytes are
+the compressed size; the body API Gateway receives is base64 and a third larger.
+"""
+
+import base64
+import gzip
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+
+from vetroi_shared.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli  # noqa: E402
+
+SIZES = [512, 2_000, 10_000, 50_000, 200_000]
+
+
+def crosswalk_payload(target_bytes):
+    occupations = []
+    payload = {'keyword': '68W', 'total': 1, 'match': [{
+        'code': '68W',
+        'title': 'Combat Medic Specialist (Army - Enlisted)',
+        'occupations': {'occupation': occupations}
+    }]}
+    i = 0
+    while len(json.dumps(payload)) < target_bytes:
+        occupations.append({
+            'code': f'29-{2000 + i}.00',
+            'title': f'Healthcare Support Occupation {i}',
+            'href': f'https://services.onetcenter.org/ws/online/occupations/29-{2000 + i}.00/',
+            'tags': {'bright_outlook': i % 3 == 0, 'green': False, 'apprenticeship': i % 5 == 0}
+        })
+        i += 1
+    return json.dumps(payload).encode()
+
+
+def measure(name, fn, raw, number):
+    seconds = timeit.timeit(lambda: base64.b64encode(fn(raw)), number=number) / number
+    compressed = len(fn(raw))
+    saved = 100 * (1 - compressed / len(raw))
+    print(f"{len(raw):>10}{name:>8}{compressed:>12}{saved:>9.1f}%{seconds * 1e6:>12.0f}")
+
+
+def main():
+    print(f"{'raw bytes':>10}{'codec':>8}{'wire bytes':>12}{'saved':>10}{'cpu us':>12}")
+    for size in SIZES:
+        raw = crosswalk_payload(size)
+        number = max(20, 2_000_000 // size)
+        measure('gzip', lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), raw, number)
+        if brotli is not None:
+            measure('br', lambda data: brotli.compress(data, quality=BROTLI_QUALITY), raw, number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Dispatch overhead and cold-start import time for the recommend Lambda
+
+    cd lambda/recommend && python benchmarks/bench_router.py
+
+Dispatch compares the previous if-chain (copied below, handlers stubbed) with
+the compiled Router. Cold start imports lambda_function in a fresh interpreter,
+with and without boto3 pulled in eagerly as the old module-level clients did.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.router import Request, Router  # noqa: E402
+
+EVENTS = {
+    'POST /recommend': {
+        'httpMethod': 'POST', 'path': '/recommend',
+        'body': json.dumps({'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False, 'education': 'bachelor'})
+    },
+    'GET /career/{soc}': {'httpMethod': 'GET', 'path': '/career/29-2042.00'},
+    'GET /autocomplete': {'httpMethod': 'GET', 'path': '/autocomplete', 'queryStringParameters': {'q': '68'}},
+    'POST /sentra/conversation': {
+        'requestContext': {'http': {'method': 'POST'}}, 'rawPath': '/prod/sentra/conversation',
+        'body': json.dumps({'sessionId': 'abc', 'message': 'hello'})
+    },
+}
+
+
+def stub(request, context):
+    return request
+
+
+def legacy_dispatch(event, context):
+    """The pre-router lambda_handler control flow, minus logging and handler bodies"""
+    if event.get('httpMethod') == 'POST' or event.get('requestContext', {}).get('http', {}).get('method') == 'POST':
+        try:
+            body = json.loads(event.get('body', '{}'))
+            if body.get('action') == 'lexMission':
+                return stub(body, context)
+        except:  # noqa: E722
+            pass
+
+    http_method = (
+        event.get('httpMethod') or
+        event.get('requestContext', {}).get('http', {}).get('method') or
+        event.get('requestContext', {}).get('httpMethod')
+    )
+
+    path = event.get('path') or event.get('rawPath', '')
+    if '/career/' in path and http_method == 'GET':
+        return stub(event, context)
+    if path.rstrip('/').endswith('/autocomplete') and http_method == 'GET':
+        return stub(event, context)
+    if '/sentra/conversation' in path and http_method == 'POST':
+        return stub(json.loads(event.get('body', '{}')), context)
+
+    return stub(json.loads(event.get('body', '{}')), context)
+
+
+router = Router(default=stub)
+router.add('POST', '/recommend', stub)
+router.add('GET', '/career/{soc}', stub)
+router.add('GET', '/autocomplete', stub)
+router.add('POST', '/sentra/conversation', stub)
+
+
+def routed_dispatch(event, context):
+    request = router.dispatch(Request(event), context)
+    if request.method == 'POST':
+        request.body
+    return request
+
+
+def bench_dispatch(number=100_000):
+    print(f"{'route':<28}{'if-chain us':>14}{'router us':>12}")
+    for name, event in EVENTS.items():
+        legacy = timeit.timeit(lambda: legacy_dispatch(event, None), number=number) / number * 1e6
+        routed = timeit.timeit(lambda: routed_dispatch(event, None), number=number) / number * 1e6
+        print(f"{name:<28}{legacy:>14.2f}{routed:>12.2f}")
+
+
+def import_ms(statement, runs=5):
+    """Best-of-N wall time for a fresh interpreter to run the import statement"""
+    code = f"import time; t = time.perf_counter(); {statement}; print((time.perf_counter() - t) * 1000)"
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return min(
+        float(subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    )
+
+
+def bench_cold_start():
+    eager = import_ms('import boto3; import lambda_function')
+    lazy = import_ms('import lambda_function')
+    print(f"\ncold import, boto3 eager: {eager:.0f} ms")
+    print(f"cold import, boto3 lazy:  {lazy:.0f} ms")
+
+
+if __name__ == '__main__':
+    bench_dispatch()
+    bench_cold_start()
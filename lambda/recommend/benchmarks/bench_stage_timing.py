@@ -0,0 +1,68 @@
+"""
+Stage timing overhead
+
+    cd lambda/recommend && python benchmarks/bench_stage_timing.py
+
+Measures what instrumentation adds to a request: one `with stage(...)` block
+and one @timed_stage call, inside and outside a request timer, and the cost
+of building and printing the EMF line for a request with ten stages. The
+budget is 50 us per stage.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.stage_timing import request_timer, stage, timed_stage  # noqa: E402
+
+STAGES_PER_REQUEST = 10
+NUMBER = 200_000
+
+
+def noop():
+    return None
+
+
+timed_noop = timed_stage('Noop')(noop)
+
+
+def per_call_ns(fn, number=NUMBER):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+
+def with_stage():
+    with stage('Noop'):
+        pass
+
+
+def main():
+    bare = per_call_ns(noop)
+
+    print(f"outside a request: stage block {per_call_ns(with_stage):.0f} ns, "
+          f"decorated call {per_call_ns(timed_noop) - bare:.0f} ns over a bare call")
+
+    # Inside one long-lived timer; every iteration appends a duration
+    with contextlib.redirect_stdout(io.StringIO()):
+        with request_timer('bench'):
+            block = per_call_ns(with_stage)
+            decorated = per_call_ns(timed_noop) - bare
+    print(f"inside a request: stage block {block:.0f} ns, decorated call {decorated:.0f} ns over a bare call")
+
+    def request():
+        with request_timer('POST /recommend'):
+            for i in range(STAGES_PER_REQUEST):
+                with stage(f'Stage{i}'):
+                    pass
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        whole = per_call_ns(request, number=20_000)
+    print(f"request with {STAGES_PER_REQUEST} stages, EMF line included: {whole / 1000:.1f} us "
+          f"({whole / 1000 / STAGES_PER_REQUEST:.2f} us per stage)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Token estimator speed by prompt size, and accuracy against logged Bedrock usage
+
+    cd lambda/recommend && python benchmarks/bench_token_budget.py
+    cd lambda/recommend && python benchmarks/bench_token_budget.py --samples usage.jsonl
+
+Speed is measured on synthetic Sentra-style prompts (prose, JSON profile data,
+pay figures). Accuracy needs ground truth, which only Bedrock has: --samples
+takes the bedrock_usage lines from CloudWatch (one JSON object per line, as
+written by prompt_cache.log_cache_usage), holds out every fifth sample, and
+reports the error of the default coefficients and of coefficients refit on
+the rest. Paste the refit values into COEFFICIENTS when they beat the defaults.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+
+from vetroi_shared.token_budget import COEFFICIENTS, calibrate, estimate_from_features, estimate_tokens  # noqa: E402
+
+SIZES = [200, 2_000, 20_000, 200_000]
+
+PROSE = ("Your experience as a 68W Combat Medic translates directly to civilian roles such as "
+         "paramedic, emergency room technician, and physician assistant. ")
+PROFILE = json.dumps({'branch': 'army', 'mos': '68W', 'rank': 'E-5', 'yearsOfService': 6,
+                      'state': 'TX', 'salary': {'median': 48_720, 'p90': 71_300}})
+
+
+def prompt(target_chars):
+    text = ''
+    while len(text) < target_chars:
+        text += PROSE + PROFILE + '\n'
+    return text[:target_chars]
+
+
+def load_samples(path):
+    samples = []
+    with open(path) as lines:
+        for line in lines:
+            record = json.loads(line)
+            if record.get('event') != 'bedrock_usage' or not record.get('promptFeatures'):
+                continue
+            # Cached prefix tokens are billed separately but still count toward the prompt
+            actual = (record['inputTokens'] + record.get('cacheReadInputTokens', 0)
+                      + record.get('cacheWriteInputTokens', 0))
+            samples.append((record['promptFeatures'], actual))
+    return samples
+
+
+def mean_abs_pct_error(samples, coefficients):
+    errors = [abs(estimate_from_features(features, coefficients) - actual) / actual
+              for features, actual in samples if actual]
+    return 100 * sum(errors) / len(errors)
+
+
+def bench_speed():
+    print(f"{'chars':>10}{'estimate':>10}{'us/call':>10}{'MB/s':>8}")
+    for size in SIZES:
+        text = prompt(size)
+        number = max(20, 2_000_000 // size)
+        seconds = timeit.timeit(lambda: estimate_tokens(text), number=number) / number
+        print(f"{size:>10}{estimate_tokens(text):>10}{seconds * 1e6:>10.1f}{size / seconds / 1e6:>8.1f}")
+
+
+def bench_accuracy(path):
+    samples = load_samples(path)
+    held_out = samples[::5]
+    training = [sample for i, sample in enumerate(samples) if i % 5]
+    refit = calibrate(training)
+
+    print(f"\n{len(training)} training / {len(held_out)} held-out samples from {path}")
+    print(f"{'coefficients':>14}{'MAPE':>8}  values")
+    for name, coefficients in (('default', COEFFICIENTS), ('refit', refit)):
+        values = ', '.join(f'{field}={value:.3f}' for field, value in zip(COEFFICIENTS._fields, coefficients))
+        print(f"{name:>14}{mean_abs_pct_error(held_out, coefficients):>7.1f}%  {values}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', help='JSONL of bedrock_usage log lines')
+    args = parser.parse_args()
+
+    bench_speed()
+    if args.samples:
+        bench_accuracy(args.samples)
+
+
+if __name__ == '__main__':
+    main()
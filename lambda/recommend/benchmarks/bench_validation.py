@@ -0,0 +1,101 @@
+"""
+VeteranRequest validation latency and import cost
+
+    cd lambda/recommend && python benchmarks/bench_validation.py
+
+Compares the previous request path (json.loads, then VeteranRequest(**body)
+with a v1-style @validator) against parse_veteran_request on the raw body,
+a 1,000-profile bulk import against validate_veteran_requests, the time to
+import the pydantic stack and src.models in a fresh interpreter, and the
+time to build each model's validator.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import timeit
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from src.models import VeteranRequest, parse_veteran_request, validate_veteran_requests  # noqa: E402
+
+# The model as it was before the v2 validators, for comparison
+LEGACY_MODELS = textwrap.dedent('''
+    from typing import List, Optional
+    from pydantic import BaseModel, Field, validator
+    from src.models import Branch, Education, USState
+
+
+    class VeteranRequest(BaseModel):
+        branch: Branch
+        code: str = Field(..., min_length=1, max_length=20)
+        homeState: USState
+        relocate: bool
+        relocateState: Optional[USState] = None
+        education: Education
+        skills: Optional[List[str]] = Field(default_factory=list)
+        clearance: Optional[str] = None
+
+        @validator('relocateState')
+        def validate_relocate_state(cls, v, values):
+            if values.get('relocate') and not v:
+                raise ValueError('relocateState is required when relocate is true')
+            return v
+''')
+
+BODY = json.dumps({
+    'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': True, 'relocateState': 'CA',
+    'education': 'associate', 'skills': ['Triage', 'Leadership', 'Logistics'], 'clearance': 'Secret'
+}).encode('utf-8')
+BATCH_SIZE = 1_000
+IMPORT_RUNS = 7
+
+
+def best_import_ms(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    runs = [float(subprocess.check_output([sys.executable, '-W', 'ignore', '-c', code], cwd=ROOT))
+            for _ in range(IMPORT_RUNS)]
+    return min(runs)
+
+
+def per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    legacy_dir = tempfile.mkdtemp()
+    with open(os.path.join(legacy_dir, 'legacy_models.py'), 'w') as f:
+        f.write(LEGACY_MODELS)
+    sys.path.insert(0, legacy_dir)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        from legacy_models import VeteranRequest as LegacyVeteranRequest
+
+    legacy = per_call_us(lambda: LegacyVeteranRequest(**json.loads(BODY)), 20_000)
+    fast = per_call_us(lambda: parse_veteran_request(BODY), 20_000)
+    print(f"single request: json.loads + model(**body) {legacy:.2f} us, model_validate_json {fast:.2f} us "
+          f"({legacy / fast:.1f}x)")
+
+    batch = b'[' + b','.join([BODY] * BATCH_SIZE) + b']'
+    legacy = per_call_us(lambda: [LegacyVeteranRequest(**item) for item in json.loads(batch)], 20)
+    fast = per_call_us(lambda: validate_veteran_requests(batch), 20)
+    print(f"bulk import of {BATCH_SIZE}: per-item loop {legacy / 1000:.2f} ms, TypeAdapter {fast / 1000:.2f} ms "
+          f"({legacy / fast:.1f}x)")
+
+    print(f"import (fresh interpreter, best of {IMPORT_RUNS}): pydantic {best_import_ms('pydantic'):.1f} ms, "
+          f"src.models including pydantic {best_import_ms('src.models'):.1f} ms")
+
+    legacy = per_call_us(lambda: LegacyVeteranRequest.model_rebuild(force=True), 50)
+    fast = per_call_us(lambda: (VeteranRequest.model_rebuild(force=True), TypeAdapter(list[VeteranRequest])), 50)
+    print(f"validator build: previous model {legacy / 1000:.2f} ms, model + batch adapter {fast / 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Wage table lookup throughput and resident memory
+
+    cd lambda/recommend && python benchmarks/bench_wage_table.py
+
+Builds a synthetic table the size of a full OES release (830 detailed SOC
+codes x 54 areas), then measures open time, single and batch lookups, and
+resident memory after opening and after touching every row. The same data
+as nested dicts of NamedTuples is measured for comparison.
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.wage_table import NATIONAL, Wages, WageTable, build_table  # noqa: E402
+
+SOC_COUNT = 830
+STATES = [NATIONAL] + [f'S{i:02d}' for i in range(53)]
+BATCH_SIZE = 25
+
+
+def oes_rows():
+    for i in range(SOC_COUNT):
+        soc = f'{11 + i % 43:02d}-{1000 + i:04d}'
+        for j, state in enumerate(STATES):
+            median = 30_000 + 97 * i + 11 * j
+            yield {
+                'AREA_TYPE': '1' if state == NATIONAL else '2', 'PRIM_STATE': state, 'OCC_CODE': soc,
+                'O_GROUP': 'detailed', 'TOT_EMP': str(1_000 + i), 'A_MEAN': str(median + 2_000),
+                'A_PCT10': str(median - 12_000), 'A_PCT25': str(median - 6_000), 'A_MEDIAN': str(median),
+                'A_PCT75': str(median + 8_000), 'A_PCT90': str(median + 20_000)
+            }
+
+
+def rss_kb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'wage_table.bin')
+    counts = build_table(oes_rows(), path)
+    print(f"table: {counts['socs']} SOC x {counts['areas']} areas, {os.path.getsize(path) / 1024:.0f} KB on disk")
+
+    before = rss_kb()
+    table = WageTable(path)
+    opened = rss_kb()
+    print(f"open: {table.load_ms:.2f} ms, +{opened - before} KB resident")
+
+    socs = [f'{soc}.00' for soc in table.socs]
+    batch = socs[:BATCH_SIZE]
+
+    number = 200_000
+    seconds = timeit.timeit(lambda: table.lookup(socs[417], 'S17'), number=number) / number
+    print(f"lookup: {seconds * 1e9:.0f} ns ({1 / seconds / 1e6:.2f} M/s)")
+
+    number = 20_000
+    seconds = timeit.timeit(lambda: table.lookup_many(batch, 'S17'), number=number) / number
+    print(f"lookup_many({BATCH_SIZE}): {seconds * 1e6:.1f} us ({seconds * 1e9 / BATCH_SIZE:.0f} ns per SOC)")
+
+    for soc in socs:
+        table.lookup_many([soc], 'S17')
+        for state in STATES:
+            table.lookup(soc, state)
+    print(f"all rows touched: +{rss_kb() - before} KB resident")
+
+    tracemalloc.start()
+    nested = {soc: {state: table.lookup(soc, state) for state in STATES} for soc in socs}
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"same data as dict of {Wages.__name__} tuples: {size / 1024:.0f} KB allocated ({len(nested)} SOC)")
+
+    table.close()
+
+
+if __name__ == '__main__':
+    main()
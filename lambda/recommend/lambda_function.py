@@ -6,13 +6,96 @@ Just returns O*NET crosswalk data from /online/crosswalks/military
 """
 
 import json
+import os
 import uuid
 import time
-import boto3
-import base64
-import urllib3
 from datetime import datetime
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional, Sequence
+
+from src import aws_clients
+from src.cache import DynamoDBCacheTier, TieredCache, TTLCache
+from src.career_ranking import get_occupation_features, rank_careers
+from src.conversation_window import ConversationWindow, fold_older_turns, load_window, window_messages
+from src.crosswalk_index import CrosswalkIndex, load_index
+from src.mos_autocomplete import MosAutocomplete, load_code_list, merge_code_lists
+from src.onet_session import onet_get, connection_stats
+from src.projection import compile_projection, fields_spec, project
+from src.prompt_cache import log_cache_usage, mark_history_cache_point, system_blocks
+from src.report_prefetch import MAX_CAREER_CANDIDATES, MAX_PREFETCH_REPORTS, career_soc_codes, prefetch_reports
+from src.router import Request, Router
+from src.sentra_stream import (
+    SENTRA_WEBSOCKET_ENDPOINT, NDJSONSink, WebSocketSink, emit_stream_metrics, stream_reply
+)
+from src.session_store import load_crosswalk, session_item, session_writes, summary_folds
+from src.single_flight import onet_flights
+from src.stage_timing import request_timer, set_cache_hit, stage, timed_stage
+from src.wage_table import get_wage_table, wages_by_soc
+from vetroi_shared.compression import compress_event_response
+from vetroi_shared.token_budget import (
+    ContextOverflowError, estimate_from_features, estimate_tokens, input_budget, message_features,
+    output_budget
+)
+
+CROSSWALK_CACHE_TABLE = os.environ.get('CROSSWALK_CACHE_TABLE')
+CROSSWALK_FRESH_SECONDS = int(os.environ.get('CROSSWALK_FRESH_SECONDS', str(7 * 24 * 3600)))
+CROSSWALK_STALE_SECONDS = int(os.environ.get('CROSSWALK_STALE_SECONDS', str(90 * 24 * 3600)))
+REPORT_TIMEOUT_SECONDS = float(os.environ.get('REPORT_TIMEOUT_SECONDS', '5'))
+REPORT_PREFETCH_DEADLINE_SECONDS = float(os.environ.get('REPORT_PREFETCH_DEADLINE_SECONDS', '8'))
+SESSION_FLUSH_SECONDS = float(os.environ.get('SESSION_FLUSH_SECONDS', '3'))
+DEFAULT_RANKED_CAREERS = 10
+MAX_RANKED_CAREERS = 50
+SENTRA_HISTORY_TOKEN_BUDGET = int(os.environ.get('SENTRA_HISTORY_TOKEN_BUDGET', '6000'))
+SENTRA_SUMMARY_MAX_TOKENS = int(os.environ.get('SENTRA_SUMMARY_MAX_TOKENS', '400'))
+# Inference profile ID; prompt caching applies when this names a model that supports it
+SENTRA_MODEL_ID = os.environ.get('SENTRA_MODEL_ID', "us.anthropic.claude-3-5-sonnet-20241022-v2:0")
+# Typical Sentra reply size, reserved out of the input budget (see vetroi_shared/token_budget.py)
+SENTRA_EXPECTED_OUTPUT_TOKENS = int(os.environ.get('SENTRA_EXPECTED_OUTPUT_TOKENS', '1000'))
+# maxTokens ceiling for a Sentra reply, so long answers are not cut off
+SENTRA_MAX_OUTPUT_TOKENS = int(os.environ.get('SENTRA_MAX_OUTPUT_TOKENS', '4096'))
+
+CORS_PREFLIGHT_RESPONSE = {
+    'statusCode': 200,
+    'headers': {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With',
+        'Access-Control-Max-Age': '86400'
+    },
+    'body': ''
+}
+
+
+# Per-route state is built on first use so a cold start only pays for the matched route
+
+@lru_cache(maxsize=1)
+def get_crosswalk_cache() -> TieredCache:
+    """In-process LRU, backed by the shared DynamoDB tier when CROSSWALK_CACHE_TABLE is set"""
+    shared = None
+    if CROSSWALK_CACHE_TABLE:
+        # DYNAMODB_ENDPOINT_URL points at DynamoDB Local for offline testing
+        table = aws_clients.table(CROSSWALK_CACHE_TABLE, endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+        shared = DynamoDBCacheTier(table, CROSSWALK_STALE_SECONDS)
+    
+    return TieredCache(
+        'crosswalk',
+        local=TTLCache(maxsize=256, ttl_seconds=min(3600, CROSSWALK_FRESH_SECONDS)),
+        shared=shared,
+        fresh_seconds=CROSSWALK_FRESH_SECONDS,
+        stale_seconds=CROSSWALK_STALE_SECONDS
+    )
+
+
+@lru_cache(maxsize=1)
+def get_crosswalk_index() -> Optional[CrosswalkIndex]:
+    return load_index()
+
+
+@lru_cache(maxsize=1)
+def get_mos_autocomplete() -> MosAutocomplete:
+    crosswalk_index = get_crosswalk_index()
+    index_codes = crosswalk_index.military_codes() if crosswalk_index else []
+    return MosAutocomplete(merge_code_lists(load_code_list(), index_codes))
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -25,58 +108,35 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     if 'bot' in event and 'name' in event['bot']:
         return handle_lex_intent(event, context)
     
-    # Handle frontend request to invoke Lex
-    if event.get('httpMethod') == 'POST' or event.get('requestContext', {}).get('http', {}).get('method') == 'POST':
-        try:
-            body = json.loads(event.get('body', '{}'))
-            if body.get('action') == 'lexMission':
-                return handle_lex_proxy(body, context)
-        except:
-            pass
-    
-    # Handle CORS preflight - check multiple possible event structures
-    http_method = (
-        event.get('httpMethod') or 
-        event.get('requestContext', {}).get('http', {}).get('method') or
-        event.get('requestContext', {}).get('httpMethod')
-    )
+    request = Request(event)
     
-    if http_method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With',
-                'Access-Control-Max-Age': '86400'
-            },
-            'body': ''
-        }
-    
-    # Check if this is a career detail request
-    path = event.get('path') or event.get('rawPath', '')
-    if '/career/' in path and http_method == 'GET':
-        return handle_career_detail(event, context)
-    
-    # Check if this is a Sentra conversation request
-    if '/sentra/conversation' in path:
-        if http_method == 'OPTIONS':
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With',
-                    'Access-Control-Max-Age': '86400'
-                },
-                'body': ''
-            }
-        elif http_method == 'POST':
-            return handle_sentra_conversation(event, context)
+    # Handle CORS preflight for every route
+    if request.method == 'OPTIONS':
+        return CORS_PREFLIGHT_RESPONSE
     
+    # Per-stage durations go to CloudWatch as one EMF line when the request ends
+    with request_timer('unmatched') as timer:
+        try:
+            response = router.dispatch(request, context)
+        except ValueError as e:
+            response = error_response(400, str(e))
+        finally:
+            timer.route = request.route or timer.route
+        
+        # Crosswalks and career reports run to tens of KB; compress when the client accepts it
+        with stage('Compress'):
+            return compress_event_response(response, event)
+
+
+def handle_recommend(request: Request, context: Any) -> Dict[str, Any]:
+    """POST /recommend - O*NET crosswalk for a veteran profile, or the Lex mission proxy"""
     try:
         # Parse request for recommend endpoint
-        body = json.loads(event.get('body', '{}'))
+        body = request.body
+        
+        # Handle frontend request to invoke Lex
+        if body.get('action') == 'lexMission':
+            return handle_lex_proxy(body, context)
         
         # Validate required fields
         required = ['branch', 'code', 'homeState', 'relocate', 'education']
@@ -84,23 +144,65 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if field not in body:
                 return error_response(400, f'Missing required field: {field}')
         
+        # Optional projection, e.g. fields=list for the career list view; validated before any lookups
+        fields = fields_spec(body.get('fields') or request.query.get('fields'))
+        if fields:
+            compile_projection(fields)
+        
         # Generate session ID
         session_id = str(uuid.uuid4())
         
         # Get O*NET crosswalk data - THE CORRECT ENDPOINT
-        onet_data = get_onet_crosswalk_data(body['code'], body.get('branch'))
+        with stage('Crosswalk'):
+            onet_data = get_onet_crosswalk_data(body['code'], body.get('branch'))
+        
+        # Store session in DynamoDB in the background; it overlaps with prefetch and serialization
+        session_writes.submit(store_session, session_id, body, onet_data)
         
-        # Store session in DynamoDB
-        store_session(session_id, body, onet_data)
+        # Annual wages for every career, in the state the veteran will work in
+        soc_codes = career_soc_codes(onet_data, MAX_CAREER_CANDIDATES)
+        state = body.get('relocateState') if body.get('relocate') and body.get('relocateState') else body['homeState']
+        with stage('Wages'):
+            wages = wages_by_soc(get_wage_table(), soc_codes, state)
         
-        # Return response with ONLY O*NET data
+        # Return response with O*NET data and wages from the shipped OES table
         response_data = {
             'session_id': session_id,
             'profile': body,
             'onet_careers': onet_data,
+            'wages': wages,
             'timestamp': datetime.utcnow().isoformat()
         }
         
+        # Top careers for this profile with explanations; onet_careers keeps O*NET's order
+        features = get_occupation_features()
+        if features is not None:
+            top_k = min(int(body.get('topK') or DEFAULT_RANKED_CAREERS), MAX_RANKED_CAREERS)
+            with stage('Ranking'):
+                ranked = rank_careers(soc_codes, body, features, get_wage_table(), top_k)
+            response_data['ranked_careers'] = [career._asdict() for career in ranked]
+        
+        # Opt-in: embed the top-N career reports so the frontend skips its /career/{soc} calls
+        prefetch_count = min(int(body.get('prefetchReports') or 0), MAX_PREFETCH_REPORTS)
+        if prefetch_count > 0:
+            with stage('PrefetchReports'):
+                reports, report_errors = prefetch_reports(
+                    career_soc_codes(onet_data, prefetch_count),
+                    fetch_career_report,
+                    REPORT_PREFETCH_DEADLINE_SECONDS
+                )
+            response_data['career_reports'] = reports
+            response_data['career_report_errors'] = report_errors
+        
+        with stage('Serialize'):
+            response_body = json.dumps(project(response_data, fields))
+        
+        # A frozen container would drop the write, so wait for it before returning
+        with stage('SessionFlush'):
+            unfinished = session_writes.flush(SESSION_FLUSH_SECONDS)
+        if unfinished:
+            print(f"Session write still running after {SESSION_FLUSH_SECONDS}s: {session_id}")
+        
         return {
             'statusCode': 200,
             'headers': {
@@ -109,9 +211,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
                 'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With'
             },
-            'body': json.dumps(response_data)
+            'body': response_body
         }
         
+    except ValueError as e:
+        return error_response(400, str(e))
     except Exception as e:
         print(f"Lambda error: {str(e)}")
         import traceback
@@ -123,58 +227,61 @@ def get_onet_crosswalk_data(military_code: str, branch: str = None) -> Dict[str,
     """
     Get O*NET military crosswalk data from the CORRECT endpoint
     /online/crosswalks/military - returns nested structure with occupations
+    
+    Answered from the offline crosswalk index when the code is indexed, otherwise
+    read-through from the crosswalk cache; error fallbacks are never cached.
     """
-    try:
-        # Get credentials from Secrets Manager
-        secret_name = "ONET"
-        secrets_client = boto3.client('secretsmanager')
-        response = secrets_client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(response['SecretString'])
-        
-        # Make O*NET API call using urllib3
-        http = urllib3.PoolManager()
-        
-        # CORRECT ENDPOINT - /online/crosswalks/military
-        url = "https://services.onetcenter.org/ws/online/crosswalks/military"
-        
-        # Create basic auth header
-        credentials = f"{secret['username']}:{secret['password']}"
-        auth_header = base64.b64encode(credentials.encode()).decode()
-        
-        headers = {
-            'Accept': 'application/json',
-            'User-Agent': 'VetROI/1.0',
-            'Authorization': f'Basic {auth_header}'
-        }
-        
-        # Pass keyword parameter
-        params = {
-            'keyword': military_code
+    # Pass keyword parameter
+    params = {
+        'keyword': military_code
+    }
+    
+    # Add branch parameter if provided
+    if branch:
+        # Map frontend branch names to O*NET branch codes
+        branch_map = {
+            'army': 'army',
+            'navy': 'navy',
+            'air_force': 'air_force',
+            'marines': 'marine_corps',
+            'marine_corps': 'marine_corps',
+            'coast_guard': 'coast_guard'
         }
+        if branch.lower() in branch_map:
+            params['branch'] = branch_map[branch.lower()]
+    
+    crosswalk_index = get_crosswalk_index()
+    if crosswalk_index is not None:
+        indexed = crosswalk_index.lookup(military_code, params.get('branch'))
+        if indexed is not None:
+            print(f"Crosswalk index hit for {military_code} ({params.get('branch', 'all')})")
+            set_cache_hit(True)
+            return indexed
+    
+    cache_key = f"{military_code.strip().upper()}#{params.get('branch', 'all')}"
+    crosswalk_cache = get_crosswalk_cache()
+    data = crosswalk_cache.get_or_load(
+        cache_key,
+        lambda: onet_flights.do(('crosswalk', cache_key), lambda: fetch_onet_crosswalk(military_code, params)),
+        cacheable=lambda result: 'error' not in result
+    )
+    print(f"Crosswalk cache stats: {crosswalk_cache.stats()}")
+    set_cache_hit(crosswalk_cache.last_source != 'origin')
+    
+    return data
+
+
+@timed_stage('ONetCrosswalk')
+def fetch_onet_crosswalk(military_code: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """Call the O*NET crosswalk endpoint, returning an empty structure on failure"""
+    try:
+        # Credentials and the keep-alive pool are cached per container
+        path = "/online/crosswalks/military"
         
-        # Add branch parameter if provided
-        if branch:
-            # Map frontend branch names to O*NET branch codes
-            branch_map = {
-                'army': 'army',
-                'navy': 'navy',
-                'air_force': 'air_force',
-                'marines': 'marine_corps',
-                'marine_corps': 'marine_corps',
-                'coast_guard': 'coast_guard'
-            }
-            if branch.lower() in branch_map:
-                params['branch'] = branch_map[branch.lower()]
-        
-        print(f"Calling O*NET API: {url} with params: {params}")
+        print(f"Calling O*NET API: {path} with params: {params}")
         
-        response = http.request(
-            'GET',
-            url,
-            fields=params,
-            headers=headers,
-            timeout=10.0
-        )
+        response = onet_get(path, fields=params)
+        print(f"O*NET connection stats: {connection_stats()}")
         
         if response.status != 200:
             raise Exception(f"O*NET API returned status {response.status}")
@@ -203,22 +310,18 @@ def get_onet_crosswalk_data(military_code: str, branch: str = None) -> Dict[str,
         }
 
 
+@timed_stage('StoreSession')
 def store_session(session_id: str, profile: Dict, onet_data: Dict) -> None:
-    """Store session in DynamoDB"""
+    """Store session in DynamoDB; runs on the background session writer"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('VetROI_Sessions')
+        table = aws_clients.table('VetROI_Sessions')
         
         timestamp = int(time.time())
         
-        item = {
-            'session_id': session_id,
-            'timestamp': timestamp,
-            'veteran_profile': profile,
-            'onet_careers': onet_data,
-            'created_at': datetime.utcnow().isoformat(),
-            'ttl': timestamp + (90 * 24 * 60 * 60)  # 90 days
-        }
+        # Profile plus a content hash; the crosswalk itself is stored once per distinct payload
+        item = session_item(session_id, timestamp, profile, onet_data)
+        item['created_at'] = datetime.utcnow().isoformat()
+        item['ttl'] = timestamp + (90 * 24 * 60 * 60)  # 90 days
         
         table.put_item(Item=item)
         print(f"Stored session: {session_id}")
@@ -242,60 +345,35 @@ def error_response(status_code: int, message: str) -> Dict[str, Any]:
     }
 
 
-def handle_career_detail(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+def handle_career_detail(request: Request, context: Any) -> Dict[str, Any]:
     """Handle career detail requests from O*NET /mnm/careers/{soc}/report endpoint"""
     try:
-        # Extract SOC code from path
-        path = event.get('path') or event.get('rawPath', '')
-        path_params = event.get('pathParameters', {})
-        
-        # Try to get SOC from pathParameters first
-        soc_code = path_params.get('socCode') or path_params.get('soc')
-        
-        # If not found, extract from path
-        if not soc_code and '/career/' in path:
-            soc_code = path.split('/career/')[-1].strip('/')
+        # API Gateway names the parameter socCode; the route pattern names it soc
+        soc_code = request.path_params.get('socCode') or request.path_params.get('soc')
         
         if not soc_code:
             return error_response(400, 'Missing SOC code in path')
         
-        print(f"Fetching career details for SOC: {soc_code}")
-        
-        # Get O*NET credentials
-        secret_name = "ONET"
-        secrets_client = boto3.client('secretsmanager')
-        response = secrets_client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(response['SecretString'])
-        
-        # Call O*NET career report API
-        http = urllib3.PoolManager()
-        url = f"https://services.onetcenter.org/ws/mnm/careers/{soc_code}/report"
-        
-        # Create basic auth header
-        credentials = f"{secret['username']}:{secret['password']}"
-        auth_header = base64.b64encode(credentials.encode()).decode()
-        
-        headers = {
-            'Accept': 'application/json',
-            'User-Agent': 'VetROI/1.0',
-            'Authorization': f'Basic {auth_header}'
-        }
+        # Optional projection, e.g. fields=summary for career cards
+        fields = request.query.get('fields')
+        if fields:
+            try:
+                compile_projection(fields)
+            except ValueError as e:
+                return error_response(400, str(e))
         
-        print(f"Calling O*NET API: {url}")
+        print(f"Fetching career details for SOC: {soc_code}")
         
-        response = http.request(
-            'GET',
-            url,
-            headers=headers,
-            timeout=10.0
-        )
+        response = request_career_report(soc_code)
         
         if response.status != 200:
             print(f"O*NET API error: Status {response.status}")
             return error_response(response.status, f"O*NET API error: {response.data.decode('utf-8')}")
         
         # Parse and return the O*NET response as-is
-        data = json.loads(response.data.decode('utf-8'))
+        with stage('Serialize'):
+            data = json.loads(response.data.decode('utf-8'))
+            body = json.dumps(project(data, fields))
         print(f"Successfully fetched career data for {soc_code}")
         
         return {
@@ -306,7 +384,7 @@ def handle_career_detail(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
                 'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With'
             },
-            'body': json.dumps(data)
+            'body': body
         }
         
     except Exception as e:
@@ -316,11 +394,70 @@ def handle_career_detail(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return error_response(500, f"Error fetching career details: {str(e)}")
 
 
-def handle_sentra_conversation(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+def request_career_report(soc_code: str, timeout: float = 10.0):
+    """
+    Call O*NET /mnm/careers/{soc}/report over the shared, authenticated pool
+    
+    Concurrent requests for the same SOC code share one upstream call.
+    """
+    path = f"/mnm/careers/{soc_code}/report"
+    
+    print(f"Calling O*NET API: {path}")
+    
+    response = onet_flights.do(('career_report', soc_code), lambda: onet_get(path, timeout=timeout))
+    print(f"O*NET connection stats: {connection_stats()}, single-flight: {onet_flights.stats()}")
+    
+    return response
+
+
+def fetch_career_report(soc_code: str) -> Dict[str, Any]:
+    """Fetch and parse one career report for prefetching, raising on any non-200"""
+    response = request_career_report(soc_code, timeout=REPORT_TIMEOUT_SECONDS)
+    
+    if response.status != 200:
+        raise Exception(f"O*NET API returned status {response.status}")
+    
+    return json.loads(response.data.decode('utf-8'))
+
+
+def handle_autocomplete(request: Request, context: Any) -> Dict[str, Any]:
+    """Suggest known military codes for a partial or mistyped code, without calling O*NET"""
+    started = time.perf_counter()
+    
+    params = request.query
+    query = params.get('q', '')
+    branch = params.get('branch') or None
+    
+    try:
+        limit = min(max(int(params.get('limit', 10)), 1), 25)
+    except ValueError:
+        return error_response(400, 'limit must be an integer')
+    
+    suggestions = get_mos_autocomplete().suggest(query, branch=branch, limit=limit)
+    
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With',
+            'Cache-Control': 'public, max-age=3600'
+        },
+        'body': json.dumps({
+            'query': query,
+            'branch': branch,
+            'suggestions': suggestions,
+            'took_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    }
+
+
+def handle_sentra_conversation(request: Request, context: Any) -> Dict[str, Any]:
     """Handle Sentra AI career counselor conversations"""
     try:
         # Parse request body
-        body = json.loads(event.get('body', '{}'))
+        body = request.body
         
         # Validate required fields
         if not body.get('sessionId'):
@@ -335,29 +472,32 @@ def handle_sentra_conversation(event: Dict[str, Any], context: Any) -> Dict[str,
         # Get veteran context from their journey
         veteran_context = prepare_veteran_context(session_id, body.get('veteranContext', {}))
         
-        # Initialize or get conversation history
+        # Initialize or get conversation history: newest turns within the token budget plus a summary
         if conversation_id:
             print(f"Continuing conversation: {conversation_id}")
-            conversation_history = get_conversation_history(conversation_id)
-            print(f"Retrieved {len(conversation_history)} historical messages")
+            history = get_conversation_history(conversation_id)
+            print(f"Retrieved {len(history.turns)} recent turns (~{history.tokens} tokens), "
+                  f"summary: {bool(history.summary)}")
         else:
             conversation_id = str(uuid.uuid4())
-            conversation_history = []
+            history = EMPTY_HISTORY
             print(f"Starting new conversation: {conversation_id}")
         
-        # Build the system prompt with context
-        is_new_conversation = len(conversation_history) == 0
-        system_prompt = build_sentra_system_prompt(veteran_context, is_new_conversation)
+        # Build the system prompt: shared static instructions, then this veteran's context
+        is_new_conversation = not history.turns and not history.summary
+        system = system_blocks(
+            SENTRA_STATIC_PROMPT,
+            build_sentra_dynamic_prompt(veteran_context, is_new_conversation, history.summary),
+            SENTRA_MODEL_ID
+        )
         
-        # Prepare messages for Claude
-        messages = []
+        # Prepare messages for Claude, starting with the recent history; the next turn reuses it from cache
+        messages = mark_history_cache_point(window_messages(history), SENTRA_MODEL_ID)
         
-        # Add conversation history (if any)
-        for msg in conversation_history:
-            messages.append({
-                "role": msg['role'],
-                "content": [{"text": msg['content']}]
-            })
+        # Turns that fell out of the window are summarized alongside the reply; the fold is not
+        # flushed with the session writes, so it may finish on a later invocation
+        if history.truncated:
+            summary_folds.submit(fold_conversation_history, conversation_id, history)
         
         # Add current user message (unless it's the initial greeting)
         if user_message != "INITIAL_GREETING":
@@ -372,25 +512,44 @@ def handle_sentra_conversation(event: Dict[str, Any], context: Any) -> Dict[str,
                 "content": [{"text": "I'm ready to discuss my career transition. Please introduce yourself and ask me about my goals."}]
             })
         
+        # Size the call: trim history if the prompt would overflow, then budget the reply
+        prompt_features = fit_sentra_messages(system, messages)
+        max_tokens = output_budget(
+            SENTRA_MODEL_ID, estimate_from_features(prompt_features), SENTRA_EXPECTED_OUTPUT_TOKENS,
+            ceiling=SENTRA_MAX_OUTPUT_TOKENS
+        )
+        
         # Call Claude 3.5 Sonnet v2 via Bedrock Converse API using inference profile
-        bedrock_client = boto3.client('bedrock-runtime', region_name='us-east-2')
-        
-        response = bedrock_client.converse(
-            modelId="us.anthropic.claude-3-5-sonnet-20241022-v2:0",  # Using inference profile ID
-            messages=messages,
-            system=[{"text": system_prompt}],
-            inferenceConfig={
-                "maxTokens": 4096,
+        bedrock_client = aws_clients.client('bedrock-runtime', region_name='us-east-2')
+        
+        converse_args = {
+            'modelId': SENTRA_MODEL_ID,
+            'messages': messages,
+            'system': system,
+            'inferenceConfig': {
+                "maxTokens": max_tokens,
                 "temperature": 0.7,
                 "topP": 0.9
             }
-        )
+        }
+        
+        # Opt-in token streaming; the blocking path below is unchanged
+        if body.get('stream'):
+            return stream_sentra_reply(
+                bedrock_client, converse_args, body.get('connectionId'),
+                conversation_id, session_id, user_message, prompt_features
+            )
+        
+        with stage('Bedrock'):
+            response = bedrock_client.converse(**converse_args)
+        log_cache_usage(response.get('usage', {}), 'sentra', response.get('stopReason'), prompt_features)
         
         # Extract response
         assistant_message = response["output"]["message"]["content"][0]["text"]
         
         # Store conversation turn
         store_conversation_turn(conversation_id, session_id, user_message, assistant_message)
+        session_writes.flush(SESSION_FLUSH_SECONDS)
         
         # Return response
         return {
@@ -408,6 +567,9 @@ def handle_sentra_conversation(event: Dict[str, Any], context: Any) -> Dict[str,
             })
         }
         
+    except ContextOverflowError as e:
+        print(f"Sentra prompt too large: {str(e)}")
+        return error_response(413, 'Message is too long for Sentra to answer; please shorten it')
     except Exception as e:
         print(f"Error in Sentra conversation: {str(e)}")
         import traceback
@@ -415,6 +577,86 @@ def handle_sentra_conversation(event: Dict[str, Any], context: Any) -> Dict[str,
         return error_response(500, f"Error in conversation: {str(e)}")
 
 
+def stream_sentra_reply(bedrock_client: Any, converse_args: Dict[str, Any], connection_id: Optional[str],
+                        conversation_id: str, session_id: str, user_message: str,
+                        prompt_features: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """
+    Stream a Sentra reply with converse_stream
+    
+    Deltas go to the client's WebSocket connection when one is given and
+    SENTRA_WEBSOCKET_ENDPOINT is set (it is not deployed yet; see
+    src/sentra_stream.py), otherwise they are returned as NDJSON events. The
+    turn is persisted once the full text is assembled, before the done event.
+    """
+    if connection_id and SENTRA_WEBSOCKET_ENDPOINT:
+        sink, transport = WebSocketSink(connection_id), 'websocket'
+    else:
+        sink, transport = NDJSONSink(), 'ndjson'
+    
+    sink.send({'type': 'start', 'conversationId': conversation_id})
+    try:
+        result = stream_reply(bedrock_client, sink.send, **converse_args)
+    except Exception as e:
+        sink.send({'type': 'error', 'error': str(e)})
+        sink.close()
+        raise
+    
+    store_conversation_turn(conversation_id, session_id, user_message, result.text)
+    session_writes.flush(SESSION_FLUSH_SECONDS)
+    
+    timestamp = datetime.utcnow().isoformat()
+    sink.send({'type': 'done', 'stopReason': result.stop_reason, 'timestamp': timestamp})
+    sink.close()
+    
+    emit_stream_metrics(result, transport)
+    log_cache_usage(result.usage, 'sentra_stream', result.stop_reason, prompt_features)
+    print(f"Sentra stream: ttft={result.ttft_ms}ms total={result.total_ms:.0f}ms usage={result.usage}")
+    
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'POST, GET, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With'
+    }
+    
+    if transport == 'ndjson':
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': sink.content_type, **headers},
+            'body': sink.body()
+        }
+    
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json', **headers},
+        'body': json.dumps({
+            'conversationId': conversation_id,
+            'response': result.text,
+            'streamed': True,
+            'timestamp': timestamp
+        })
+    }
+
+
+def fit_sentra_messages(system: list, messages: list) -> Sequence[int]:
+    """
+    Drop the oldest history turns until the prompt fits the model's input budget
+    
+    The history window normally keeps prompts far below the limit; this guards
+    against oversized single messages or summaries. Returns the prompt's token
+    features; the last (current) message is never dropped.
+    """
+    budget = input_budget(SENTRA_MODEL_ID, SENTRA_EXPECTED_OUTPUT_TOKENS)
+    features = [a + b for a, b in zip(message_features(system), message_features(messages))]
+    
+    while estimate_from_features(features) > budget and len(messages) > 2:
+        dropped = messages[:2]
+        del messages[:2]
+        features = [a - b for a, b in zip(features, message_features(dropped))]
+        print(f"Dropped oldest turn to fit the Sentra input budget of {budget} tokens")
+    
+    return features
+
+
 def prepare_veteran_context(session_id: str, provided_context: Dict) -> Dict[str, Any]:
     """Prepare comprehensive context for Sentra from the veteran's journey"""
     
@@ -424,8 +666,7 @@ def prepare_veteran_context(session_id: str, provided_context: Dict) -> Dict[str
     
     # Otherwise, fetch from DynamoDB
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('VetROI_Sessions')
+        table = aws_clients.table('VetROI_Sessions')
         
         response = table.get_item(Key={'session_id': session_id})
         if 'Item' not in response:
@@ -437,7 +678,7 @@ def prepare_veteran_context(session_id: str, provided_context: Dict) -> Dict[str
         context = {
             'veteranProfile': session.get('veteran_profile', {}),
             'careersExplored': session.get('careers_explored', []),
-            'onetMatches': session.get('onet_careers', {})
+            'onetMatches': load_crosswalk(session)
         }
         
         return context
@@ -447,36 +688,8 @@ def prepare_veteran_context(session_id: str, provided_context: Dict) -> Dict[str
         return {}
 
 
-def build_sentra_system_prompt(veteran_context: Dict, is_new_conversation: bool = True) -> str:
-    """Build a comprehensive system prompt for Sentra with veteran context"""
-    
-    profile = veteran_context.get('veteranProfile', {})
-    careers = veteran_context.get('careerJourney', {}).get('careersViewed', [])
-    
-    prompt = """You are Sentra, a knowledgeable and empathetic AI career counselor for military veterans. 
-
-"""
-    if is_new_conversation:
-        prompt += "You're meeting a veteran for the first time who has the following background:\n"
-    else:
-        prompt += "You're continuing a conversation with a veteran. Their background:\n"
-    
-    # Add profile information
-    if profile:
-        prompt += f"\n- Branch: {profile.get('branch', 'Unknown')}"
-        prompt += f"\n- Military Occupation: {profile.get('mosTitle', profile.get('mos', 'Unknown'))}"
-        prompt += f"\n- Current Education: {profile.get('education', 'Unknown').replace('_', ' ').title()}"
-        prompt += f"\n- Home State: {profile.get('homeState', 'Unknown')}"
-        if profile.get('relocate'):
-            prompt += f"\n- Willing to relocate to: {profile.get('relocateState', 'Anywhere')}"
-    
-    # Add careers explored
-    if careers:
-        prompt += "\n\nCareers they've explored:"
-        for career in careers:
-            prompt += f"\n- {career.get('title', 'Unknown')} (SOC: {career.get('soc', 'Unknown')})"
-    
-    prompt += """
+# Identical for every veteran and every turn, so it is built once and sent ahead of a cache point
+SENTRA_STATIC_PROMPT = """You are Sentra, a knowledgeable and empathetic AI career counselor for military veterans. 
 
 Your role is to:
 1. Build on their exploration, not start from scratch
@@ -503,51 +716,103 @@ IMPORTANT:
 - Ask one clear question at a time to guide the discussion forward
 - Provide specific, actionable advice when asked
 - Remember what the veteran has already told you in this conversation
-
 """
+
+
+def build_sentra_dynamic_prompt(veteran_context: Dict, is_new_conversation: bool = True, summary: str = '') -> str:
+    """Per-veteran part of the system prompt: background, careers explored and conversation summary"""
+    
+    profile = veteran_context.get('veteranProfile', {})
+    careers = veteran_context.get('careerJourney', {}).get('careersViewed', [])
+    
+    if is_new_conversation:
+        prompt = "You're meeting a veteran for the first time who has the following background:\n"
+    else:
+        prompt = "You're continuing a conversation with a veteran. Their background:\n"
+    
+    # Add profile information
+    if profile:
+        prompt += f"\n- Branch: {profile.get('branch', 'Unknown')}"
+        prompt += f"\n- Military Occupation: {profile.get('mosTitle', profile.get('mos', 'Unknown'))}"
+        prompt += f"\n- Current Education: {profile.get('education', 'Unknown').replace('_', ' ').title()}"
+        prompt += f"\n- Home State: {profile.get('homeState', 'Unknown')}"
+        if profile.get('relocate'):
+            prompt += f"\n- Willing to relocate to: {profile.get('relocateState', 'Anywhere')}"
+    
+    # Add careers explored
+    if careers:
+        prompt += "\n\nCareers they've explored:"
+        for career in careers:
+            prompt += f"\n- {career.get('title', 'Unknown')} (SOC: {career.get('soc', 'Unknown')})"
+    
+    if summary:
+        prompt += f"\n\nSummary of the earlier conversation:\n{summary}"
+    
     if is_new_conversation:
-        prompt += "\nFor this first interaction, briefly introduce yourself and ask what brings them to career counseling today."
+        prompt += "\n\nFor this first interaction, briefly introduce yourself and ask what brings them to career counseling today."
     else:
-        prompt += "\nContinue the conversation naturally from where you left off. Don't re-introduce yourself or their background."
+        prompt += "\n\nContinue the conversation naturally from where you left off. Don't re-introduce yourself or their background."
     
     return prompt
 
 
-def get_conversation_history(conversation_id: str) -> list:
-    """Get previous conversation turns from DynamoDB"""
+EMPTY_HISTORY = ConversationWindow(
+    turns=[], summary='', summarized_through=0, oldest_timestamp=None, tokens=0, truncated=False
+)
+
+
+def get_conversation_history(conversation_id: str) -> ConversationWindow:
+    """Get the newest conversation turns that fit the history token budget, plus the rolling summary"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('VetROI_Conversations')
-        
-        response = table.query(
-            KeyConditionExpression='conversation_id = :cid',
-            ExpressionAttributeValues={':cid': conversation_id},
-            ScanIndexForward=True  # Sort by timestamp ascending
-        )
-        
-        history = []
-        for item in response.get('Items', []):
-            history.append({
-                'role': 'user',
-                'content': item['user_message']
-            })
-            history.append({
-                'role': 'assistant',
-                'content': item['assistant_message']
-            })
-        
-        return history
+        table = aws_clients.table('VetROI_Conversations')
+        return load_window(table, conversation_id, SENTRA_HISTORY_TOKEN_BUDGET)
         
     except Exception as e:
         print(f"Error fetching conversation history: {e}")
-        return []
+        return EMPTY_HISTORY
+
+
+def fold_conversation_history(conversation_id: str, history: ConversationWindow) -> None:
+    """Fold turns older than the history window into the conversation summary"""
+    try:
+        table = aws_clients.table('VetROI_Conversations')
+        folded = fold_older_turns(table, conversation_id, history, summarize_turns, SENTRA_SUMMARY_MAX_TOKENS)
+        print(f"Folded {folded} turns into the summary for {conversation_id}")
+        
+    except Exception as e:
+        print(f"Error updating conversation summary: {e}")
+        # The turns stay stored; the next message retries the fold
+
+
+def summarize_turns(previous_summary: str, turns: list, max_tokens: int) -> str:
+    """Extend the running summary with older turns via Bedrock"""
+    transcript = "\n".join(
+        f"Veteran: {turn['user_message']}\nSentra: {turn['assistant_message']}" for turn in turns
+    )
+    prompt = (
+        f"Summary so far:\n{previous_summary or '(none)'}\n\n"
+        f"Next part of the conversation:\n{transcript}\n\n"
+        f"Rewrite the summary to cover both in under {max_tokens * 3 // 4} words. Keep the veteran's goals, "
+        "constraints, decisions and any advice already given. Reply with the summary only."
+    )
+    
+    bedrock_client = aws_clients.client('bedrock-runtime', region_name='us-east-2')
+    response = bedrock_client.converse(
+        modelId=SENTRA_MODEL_ID,
+        messages=[{"role": "user", "content": [{"text": prompt}]}],
+        inferenceConfig={
+            "maxTokens": output_budget(SENTRA_MODEL_ID, estimate_tokens(prompt), max_tokens),
+            "temperature": 0.2
+        }
+    )
+    log_cache_usage(response.get('usage', {}), 'sentra_summary', response.get('stopReason'))
+    return response["output"]["message"]["content"][0]["text"]
 
 
 def store_conversation_turn(conversation_id: str, session_id: str, user_message: str, assistant_message: str):
     """Store conversation turn in DynamoDB"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('VetROI_Conversations')
+        table = aws_clients.table('VetROI_Conversations')
         
         timestamp = int(time.time() * 1000)  # Millisecond timestamp
         
@@ -572,7 +837,7 @@ def handle_lex_proxy(body: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Proxy Lex invocation from frontend"""
     try:
         # Initialize Lex runtime client
-        lex_client = boto3.client('lexv2-runtime', region_name='us-east-1')
+        lex_client = aws_clients.client('lexv2-runtime', region_name='us-east-1')
         
         # Get session ID or create new one
         session_id = body.get('sessionId', str(uuid.uuid4()))
@@ -624,6 +889,14 @@ def handle_lex_proxy(body: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
 
 
+# Compiled once per container; unmatched requests fall through to /recommend
+router = Router(default=handle_recommend)
+router.add('POST', '/recommend', handle_recommend)
+router.add('GET', '/career/{soc}', handle_career_detail)
+router.add('GET', '/autocomplete', handle_autocomplete)
+router.add('POST', '/sentra/conversation', handle_sentra_conversation)
+
+
 def handle_lex_intent(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle Lex bot intents - just pass through for fulfillment"""
     
@@ -661,8 +934,7 @@ def handle_lex_intent(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 def store_lex_interaction(session_id: str, veteran_context: Dict, message: str) -> None:
     """Store Lex interaction in DynamoDB"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('VetROI_Sessions')
+        table = aws_clients.table('VetROI_Sessions')
         
         timestamp = int(time.time())
         
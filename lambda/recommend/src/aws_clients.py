@@ -0,0 +1,44 @@
+"""
+Lazily created, container-wide boto3 clients
+
+boto3 is imported on first use, so routes that never touch AWS (autocomplete,
+Lex fulfillment) skip its import cost on a cold start, and warm invocations
+reuse the same clients instead of building new ones per request.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+_lock = threading.Lock()
+_instances: Dict[Tuple[Any, ...], Any] = {}
+
+
+def client(service_name: str, region_name: Optional[str] = None,
+           endpoint_url: Optional[str] = None) -> Any:
+    """Shared boto3 client for a service and region"""
+    key = ('client', service_name, region_name, endpoint_url)
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                import boto3
+                instance = boto3.client(service_name, region_name=region_name, endpoint_url=endpoint_url)
+                _instances[key] = instance
+    return instance
+
+
+def table(table_name: str, region_name: Optional[str] = None,
+          endpoint_url: Optional[str] = None) -> Any:
+    """Shared DynamoDB Table resource"""
+    key = ('table', table_name, region_name, endpoint_url)
+    instance = _instances.get(key)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(key)
+            if instance is None:
+                import boto3
+                dynamodb = boto3.resource('dynamodb', region_name=region_name, endpoint_url=endpoint_url)
+                instance = dynamodb.Table(table_name)
+                _instances[key] = instance
+    return instance
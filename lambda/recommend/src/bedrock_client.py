@@ -1,15 +1,83 @@
 import os
 import json
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Optional
+from functools import lru_cache
 
 import boto3
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger, Tracer, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
 from botocore.exceptions import ClientError
 
+from . import aws_clients
+from .cache import S3CacheTier, TieredCache, TTLCache
 from .models import VeteranRequest, Career
+from .onet_client import cache_bucket
+from vetroi_shared.token_budget import estimate_tokens, output_budget
 
 logger = Logger()
 tracer = Tracer()
+metrics = Metrics()
+
+# Typical size of a recommendations or career-analysis reply
+EXPECTED_OUTPUT_TOKENS = 1500
+
+# Bump whenever _build_prompt or _parse_response changes what a cached answer
+# would contain; old entries are then never read again and age out of S3.
+PROMPT_VERSION = '1'
+
+# Generated recommendations are reused for identical profiles and O*NET data,
+# locally and across containers through CACHE_BUCKET. No stale window: an
+# expired entry is regenerated rather than served while Bedrock is called.
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.environ.get('RECOMMENDATION_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+RECOMMENDATION_CACHE_PREFIX = 'cache/recommendations/'
+
+recommendation_cache = TTLCache(maxsize=1024, ttl_seconds=3600, max_bytes=4 * 1024 * 1024)
+
+
+@lru_cache(maxsize=1)
+def recommendation_tiers() -> TieredCache:
+    bucket = cache_bucket()
+    return TieredCache(
+        'recommendations',
+        local=recommendation_cache,
+        shared=S3CacheTier(aws_clients.client('s3'), bucket, RECOMMENDATION_CACHE_PREFIX) if bucket else None,
+        fresh_seconds=RECOMMENDATION_CACHE_TTL_SECONDS,
+        stale_seconds=RECOMMENDATION_CACHE_TTL_SECONDS,
+        write_behind=True
+    )
+
+
+def normalize_profile(request: VeteranRequest) -> Dict[str, Any]:
+    """
+    The request fields the recommendations prompt uses, in canonical form
+
+    Skill order, case and duplicates, code case and an unused relocateState
+    do not change the prompt's meaning, so they do not change the fingerprint.
+    """
+    clearance = (request.clearance or '').strip().lower()
+    return {
+        'branch': request.branch.value,
+        'code': request.code.strip().upper(),
+        'state': (request.relocateState if request.relocate else request.homeState).value,
+        'relocate': request.relocate,
+        'education': request.education.value,
+        'skills': sorted({skill.strip().lower() for skill in request.skills or [] if skill.strip()}),
+        'clearance': '' if clearance in ('none', 'none specified', 'n/a') else clearance
+    }
+
+
+def profile_fingerprint(request: VeteranRequest, onet_snippet: str) -> str:
+    """sha256 over the normalized profile and the O*NET text the prompt embeds"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(normalize_profile(request), sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(hashlib.sha256(onet_snippet.encode('utf-8')).digest())
+    return digest.hexdigest()
+
+
+def recommendation_key(model_id: str, fingerprint: str) -> str:
+    return f"{model_id}/v{PROMPT_VERSION}/{fingerprint}"
 
 
 class BedrockClient:
@@ -32,27 +100,46 @@ class BedrockClient:
             List of recommended careers
         """
         try:
-            # Build the prompt
-            prompt = self._build_prompt(request, onet_data)
-            
-            # Call Bedrock
-            response = self._invoke_bedrock(prompt)
-            
-            # Parse response into Career objects
-            careers = self._parse_response(response)
-            
-            return careers[:5]  # Ensure we return exactly 5
+            onet_snippet = self._format_onet_data(onet_data)
+            key = recommendation_key(self.model_id, profile_fingerprint(request, onet_snippet))
+            tiers = recommendation_tiers()
+
+            # Only a miss reaches Bedrock; unparseable answers are not cached
+            cached = tiers.get_or_load(
+                key,
+                lambda: self._generate(request, onet_snippet),
+                cacheable=bool
+            )
+            self._record_cache_result(tiers.last_source)
+
+            if not cached:
+                return self._get_fallback_recommendations(request)
+            return [Career(**career) for career in cached]
             
         except Exception as e:
             logger.error(f"Bedrock generation error: {e}")
             # Return fallback recommendations
             return self._get_fallback_recommendations(request)
+
+    def _generate(self, request: VeteranRequest, onet_snippet: str) -> List[Dict[str, Any]]:
+        """Call Bedrock and return up to five careers in their JSON form"""
+        prompt = self._build_prompt(request, onet_snippet=onet_snippet)
+        response = self._invoke_bedrock(prompt)
+        careers = self._parse_response(response)
+        return [career.model_dump(by_alias=True) for career in careers[:5]]  # Ensure we return exactly 5
+
+    def _record_cache_result(self, source: Optional[str]) -> None:
+        if source == 'origin':
+            metrics.add_metric(name="BedrockCacheMiss", unit=MetricUnit.Count, value=1)
+        else:
+            metrics.add_metric(name="BedrockCallsAvoided", unit=MetricUnit.Count, value=1)
     
     @tracer.capture_method
     def generate_chat_response(self, veteran_profile: VeteranRequest, 
                              onet_careers: Dict[str, Any], 
                              user_message: str,
-                             conversation_history: List[Dict[str, Any]]) -> str:
+                             conversation_history: List[Dict[str, Any]],
+                             summary: str = '') -> str:
         """
         Generate chat response for veteran career counseling
         
@@ -60,7 +147,8 @@ class BedrockClient:
             veteran_profile: Veteran's profile data
             onet_careers: O*NET career matches
             user_message: User's current message
-            conversation_history: Previous conversation messages
+            conversation_history: Previous conversation messages, already bounded by the caller
+            summary: Rolling summary of turns older than conversation_history
             
         Returns:
             AI-generated response string
@@ -71,7 +159,8 @@ class BedrockClient:
                 veteran_profile, 
                 onet_careers, 
                 user_message, 
-                conversation_history
+                conversation_history,
+                summary
             )
             
             # Call Bedrock
@@ -83,10 +172,25 @@ class BedrockClient:
             logger.error(f"Chat generation error: {e}")
             return "I apologize, but I'm having trouble processing your request. Let me try to help you explore your career options based on your military experience."
     
+    @tracer.capture_method
+    def summarize_conversation(self, previous_summary: str, turns: List[Dict[str, Any]], max_tokens: int) -> str:
+        """Extend the running chat summary with older turns (conversation_window Summarizer)"""
+        transcript = "\n".join(
+            f"Veteran: {turn['user_message']}\nSentra: {turn['assistant_message']}" for turn in turns
+        )
+        prompt = (
+            f"Summary so far:\n{previous_summary or '(none)'}\n\n"
+            f"Next part of the conversation:\n{transcript}\n\n"
+            f"Rewrite the summary to cover both in under {max_tokens * 3 // 4} words. Keep the veteran's goals, "
+            "constraints, decisions and any advice already given. Reply with the summary only."
+        )
+        return self._invoke_bedrock(prompt, expected_output_tokens=max_tokens)
+    
     def _build_chat_prompt(self, veteran_profile: VeteranRequest, 
                           onet_careers: Dict[str, Any], 
                           user_message: str,
-                          conversation_history: List[Dict[str, Any]]) -> str:
+                          conversation_history: List[Dict[str, Any]],
+                          summary: str = '') -> str:
         """Build chat prompt with full context"""
         
         state_pref = veteran_profile.relocateState if veteran_profile.relocate else veteran_profile.homeState
@@ -109,11 +213,11 @@ class BedrockClient:
         
         # Build conversation history context
         history_text = ""
-        if conversation_history:
-            recent_history = conversation_history[-6:]  # Last 3 exchanges
-            for msg in recent_history:
-                role = "Veteran" if msg['role'] == 'user' else "Sentra"
-                history_text += f"{role}: {msg['content']}\n"
+        if summary:
+            history_text += f"Summary of the earlier conversation: {summary}\n\n"
+        for msg in conversation_history:
+            role = "Veteran" if msg['role'] == 'user' else "Sentra"
+            history_text += f"{role}: {msg['content']}\n"
         
         prompt = f"""System: You are Sentra, VetROI's expert AI career counselor specializing in military-to-civilian transitions.
 
@@ -144,7 +248,8 @@ Response:"""
         
         return prompt
     
-    def _build_prompt(self, request: VeteranRequest, onet_data: Dict[str, Any]) -> str:
+    def _build_prompt(self, request: VeteranRequest, onet_data: Optional[Dict[str, Any]] = None,
+                      onet_snippet: Optional[str] = None) -> str:
         """Build the prompt for Bedrock"""
         
         state_pref = request.relocateState if request.relocate else request.homeState
@@ -154,7 +259,8 @@ Response:"""
         skills_list = ", ".join(request.skills) if request.skills else "Not specified"
         
         # Format O*NET data
-        onet_snippet = self._format_onet_data(onet_data)
+        if onet_snippet is None:
+            onet_snippet = self._format_onet_data(onet_data or {})
         
         prompt = f"""System: You are VetROI, an employment transition expert for U.S. military veterans.
 
@@ -220,14 +326,15 @@ Tags: {', '.join(filter(None, [bright, green]))}
         return "\n".join(formatted)
     
     @tracer.capture_method
-    def _invoke_bedrock(self, prompt: str) -> str:
+    def _invoke_bedrock(self, prompt: str, expected_output_tokens: int = EXPECTED_OUTPUT_TOKENS) -> str:
         """Invoke Bedrock model"""
+        max_tokens = output_budget(self.model_id, estimate_tokens(prompt), expected_output_tokens)
         try:
             # Prepare the request based on model type
             if 'claude' in self.model_id:
                 request_body = {
                     "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
+                    "max_tokens": max_tokens,
                     "temperature": 0.7,
                     "messages": [
                         {
@@ -240,7 +347,7 @@ Tags: {', '.join(filter(None, [bright, green]))}
                 # Generic format for other models
                 request_body = {
                     "prompt": prompt,
-                    "max_tokens": 2000,
+                    "max_tokens": max_tokens,
                     "temperature": 0.7
                 }
             
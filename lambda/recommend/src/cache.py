@@ -0,0 +1,295 @@
+"""
+Read-through caching for O*NET responses
+
+TieredCache layers a bounded in-process LRU (per container) over an optional
+shared tier that every container can read. Entries older than the fresh
+window but still inside the stale window are served immediately while a
+background thread refreshes them, so popular keys never wait on O*NET.
+"""
+
+import gzip
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+    ttl_seconds: Optional[float] = None     # overrides the cache default, e.g. for negative entries
+    size: int = 0                           # bytes counted against TTLCache.max_bytes
+
+
+def json_size(value: Any) -> int:
+    """Approximate in-memory cost of a JSON-shaped value: its compact encoded length"""
+    return len(json.dumps(value, separators=(',', ':'), default=str))
+
+
+class TTLCache:
+    """
+    Thread-safe LRU with a per-entry TTL, bounded by entry count and optionally by bytes
+
+    With max_bytes set, each value is sized once on insert with `sizeof` and
+    least recently used entries are evicted until the total fits. A value
+    larger than max_bytes on its own is not stored.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = 3600,
+                 clock: Callable[[], float] = time.time, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = json_size):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            ttl = self.ttl_seconds if entry.ttl_seconds is None else entry.ttl_seconds
+            if self.clock() - entry.stored_at >= ttl:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None,
+            ttl_seconds: Optional[float] = None) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        entry = CacheEntry(value, self.clock() if stored_at is None else stored_at, ttl_seconds, size)
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.total_bytes += size
+            while len(self._entries) > self.maxsize or (
+                    self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DynamoDBCacheTier:
+    """
+    Shared cache tier stored in a DynamoDB table keyed on `cache_key`
+
+    Payloads are zlib-compressed JSON in a binary attribute. `expires_at` is
+    set so DynamoDB TTL can reap entries that fell out of the stale window.
+    """
+
+    def __init__(self, table: Any, retention_seconds: float):
+        self.table = table
+        self.retention_seconds = retention_seconds
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        item = self.table.get_item(Key={'cache_key': key}).get('Item')
+        if not item:
+            return None
+
+        payload = item['payload']
+        if hasattr(payload, 'value'):  # boto3 wraps binary attributes
+            payload = payload.value
+        value = json.loads(zlib.decompress(bytes(payload)))
+        return CacheEntry(value, float(item['stored_at']))
+
+    def put(self, key: str, value: Any, stored_at: float) -> None:
+        payload = zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+        self.table.put_item(Item={
+            'cache_key': key,
+            'payload': payload,
+            'stored_at': Decimal(str(round(stored_at, 3))),
+            'expires_at': int(stored_at + self.retention_seconds)
+        })
+
+
+class S3CacheTier:
+    """
+    Shared cache tier stored as gzip-compressed JSON objects under a key prefix
+
+    Freshness is kept in the `stored-at` object metadata, so a read needs no
+    second request. Expiry past the stale window is left to a lifecycle rule
+    on the prefix.
+    """
+
+    def __init__(self, client: Any, bucket: str, prefix: str = ''):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            raise
+
+        value = json.loads(gzip.decompress(response['Body'].read()))
+        return CacheEntry(value, float(response['Metadata']['stored-at']))
+
+    def put(self, key: str, value: Any, stored_at: float) -> None:
+        body = gzip.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'), mtime=0)
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=body,
+            ContentType='application/json',
+            ContentEncoding='gzip',
+            Metadata={'stored-at': str(round(stored_at, 3))}
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.json.gz"
+
+
+class TieredCache:
+    """
+    Local LRU over an optional shared tier with stale-while-revalidate
+
+    With write_behind, shared tier writes run on the background executor so a
+    miss returns as soon as the origin answers.
+    """
+
+    def __init__(self, name: str, local: TTLCache, shared: Optional[Any] = None,
+                 fresh_seconds: float = 7 * 24 * 3600, stale_seconds: float = 90 * 24 * 3600,
+                 clock: Callable[[], float] = time.time, write_behind: bool = False):
+        self.name = name
+        self.local = local
+        self.shared = shared
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.clock = clock
+        self.write_behind = write_behind
+
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f'{name}-refresh')
+
+        self.counts = {'local_hits': 0, 'shared_hits': 0, 'stale_hits': 0, 'misses': 0,
+                       'refreshes': 0, 'shared_errors': 0}
+        self.last_source = None
+        self.last_age_seconds = None
+
+    def get_or_load(self, key: str, loader: Callable[[], Any],
+                    cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss
+
+        Values rejected by `cacheable` (e.g. error fallbacks) are returned to the
+        caller but never stored.
+        """
+        entry = self.local.get(key)
+        if entry is not None:
+            return self._served('local', entry)
+
+        entry = self._shared_get(key)
+        if entry is not None:
+            age = self.clock() - entry.stored_at
+            if age < self.fresh_seconds:
+                # Kept locally for the local TTL from now, but never past the fresh window;
+                # stored_at stays the shared write time so reported ages are true
+                local_ttl = min(self.local.ttl_seconds, self.fresh_seconds - age)
+                self.local.set(key, entry.value, entry.stored_at, ttl_seconds=age + local_ttl)
+                return self._served('shared', entry)
+            if age < self.stale_seconds:
+                self._refresh_in_background(key, loader, cacheable)
+                return self._served('stale', entry)
+
+        self.counts['misses'] += 1
+        self.last_source = 'origin'
+        self.last_age_seconds = 0.0
+
+        value = loader()
+        if cacheable(value):
+            self._store(key, value)
+        return value
+
+    def hit_ratio(self) -> float:
+        hits = self.counts['local_hits'] + self.counts['shared_hits'] + self.counts['stale_hits']
+        total = hits + self.counts['misses']
+        return hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            'hit_ratio': round(self.hit_ratio(), 3),
+            'last_source': self.last_source,
+            'last_age_seconds': self.last_age_seconds
+        }
+
+    def _served(self, source: str, entry: CacheEntry) -> Any:
+        self.counts[f'{source}_hits'] += 1
+        self.last_source = source
+        self.last_age_seconds = round(self.clock() - entry.stored_at, 1)
+        return entry.value
+
+    def _store(self, key: str, value: Any) -> None:
+        stored_at = self.clock()
+        self.local.set(key, value, stored_at)
+        if self.shared is None:
+            return
+        if self.write_behind:
+            self._executor.submit(self._shared_put, key, value, stored_at)
+        else:
+            self._shared_put(key, value, stored_at)
+
+    def _shared_put(self, key: str, value: Any, stored_at: float) -> None:
+        try:
+            self.shared.put(key, value, stored_at)
+        except Exception as e:
+            self.counts['shared_errors'] += 1
+            print(f"{self.name} cache: shared tier write failed for {key}: {e}")
+
+    def _shared_get(self, key: str) -> Optional[CacheEntry]:
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.get(key)
+        except Exception as e:
+            self.counts['shared_errors'] += 1
+            print(f"{self.name} cache: shared tier read failed for {key}: {e}")
+            return None
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any],
+                               cacheable: Callable[[Any], bool]) -> None:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = loader()
+                if cacheable(value):
+                    self._store(key, value)
+                    self.counts['refreshes'] += 1
+            except Exception as e:
+                print(f"{self.name} cache: background refresh failed for {key}: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
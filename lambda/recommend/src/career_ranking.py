@@ -0,0 +1,415 @@
+"""
+Profile-aware ranking of crosswalk occupations
+
+Each candidate occupation gets a weighted score from:
+
+- onet_rank: O*NET's own crosswalk order, kept as a prior
+- education: the occupation's O*NET job zone against the veteran's education
+- wage: median annual wage in the work state (src/wage_table.py), scaled
+  across the candidates
+- skills: share of the O*NET skills matched from the veteran's free-text
+  skills that the occupation rates as important, from a precomputed skill
+  bitset per occupation. A listed skill matches an O*NET skill by exact
+  name, through SKILL_ALIASES ("leadership", "logistics"), or by sharing a
+  word stem with its name ("equipment repair" -> Repairing)
+- clearance: bonus for occupations where a security clearance is valued
+
+Occupation features live in a small JSON file shipped with the package,
+built offline from the O*NET database text files:
+
+    python -m src.career_ranking build "Job Zones.txt" Skills.txt --output data/occupation_features.json
+
+Features are held column-wise (job zones in an array, skills as one int
+bitmask per occupation), so scoring a candidate is a few index reads and a
+popcount; thousands of candidates rank in a few milliseconds.
+"""
+
+import argparse
+import array
+import csv
+import heapq
+import json
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .wage_table import WageTable, normalize_soc
+
+DEFAULT_FEATURES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'occupation_features.json'
+)
+
+WEIGHTS = {'onet_rank': 0.35, 'education': 0.25, 'wage': 0.2, 'skills': 0.15, 'clearance': 0.05}
+
+# Highest O*NET job zone each education level fully prepares for
+EDUCATION_JOB_ZONE = {
+    'high_school': 2,
+    'associate': 3,
+    'bachelor': 4,
+    'master': 5,
+    'doctorate': 5,
+}
+UNKNOWN_ZONE_FIT = 0.5
+
+# Skills with an importance rating at or above this count as used by the occupation (scale 1-5)
+SKILL_IMPORTANCE_THRESHOLD = 3.0
+
+# Common resume and military terms -> O*NET skill elements, for free text that
+# names none of the elements directly. Matched on the whole skill, then per word.
+SKILL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'leadership': ('Management of Personnel Resources', 'Coordination', 'Judgment and Decision Making'),
+    'supervision': ('Management of Personnel Resources', 'Monitoring'),
+    'management': ('Management of Personnel Resources', 'Management of Material Resources', 'Coordination'),
+    'logistics': ('Management of Material Resources', 'Coordination', 'Time Management'),
+    'supply': ('Management of Material Resources',),
+    'inventory': ('Management of Material Resources',),
+    'budgeting': ('Management of Financial Resources',),
+    'planning': ('Coordination', 'Time Management'),
+    'teamwork': ('Coordination', 'Social Perceptiveness'),
+    'team': ('Coordination',),
+    'communication': ('Speaking', 'Active Listening', 'Writing'),
+    'training': ('Instructing', 'Learning Strategies'),
+    'teaching': ('Instructing', 'Learning Strategies'),
+    'mentoring': ('Instructing', 'Social Perceptiveness'),
+    'problem solving': ('Complex Problem Solving', 'Critical Thinking'),
+    'decision making': ('Judgment and Decision Making',),
+    'customer service': ('Service Orientation', 'Active Listening'),
+    'sales': ('Persuasion', 'Negotiation', 'Service Orientation'),
+    'maintenance': ('Equipment Maintenance', 'Repairing', 'Troubleshooting'),
+    'mechanic': ('Equipment Maintenance', 'Repairing', 'Troubleshooting'),
+    'electronics': ('Troubleshooting', 'Repairing', 'Installation'),
+    'coding': ('Programming',),
+    'software': ('Programming', 'Systems Analysis'),
+    'networking': ('Systems Analysis', 'Installation', 'Troubleshooting'),
+    'cybersecurity': ('Systems Analysis', 'Systems Evaluation', 'Troubleshooting'),
+    'inspection': ('Quality Control Analysis', 'Operations Monitoring'),
+    'analysis': ('Critical Thinking', 'Operations Analysis'),
+    'research': ('Science', 'Reading Comprehension', 'Active Learning'),
+    'medical': ('Science', 'Service Orientation', 'Monitoring'),
+    'triage': ('Judgment and Decision Making', 'Monitoring'),
+    'security': ('Monitoring', 'Judgment and Decision Making'),
+    'driving': ('Operation and Control',),
+}
+
+# Words too generic to match an O*NET skill name on their own
+SKILL_STOPWORDS = {'and', 'of', 'the', 'with', 'for', 'skills', 'skill', 'experience', 'active', 'resources',
+                   'general', 'basic', 'advanced', 'military'}
+# Shortest shared prefix that counts as the same word stem ("repair" ~ "repairing")
+SKILL_STEM_CHARS = 5
+
+# O*NET has no clearance attribute; these SOC groups commonly list clearance as preferred
+CLEARANCE_VALUED_SOC_PREFIXES = ('11-3021', '13-1081', '15-', '17-', '19-4', '33-', '55-')
+NO_CLEARANCE = {'', 'none', 'no', 'n/a'}
+
+
+class RankedCareer(NamedTuple):
+    soc: str
+    score: float
+    onet_position: int
+    contributions: Dict[str, float]     # weighted score per feature
+    reasons: List[str]
+
+
+class OccupationFeatures:
+    """Column-wise job zone and skill bitsets for O*NET occupations"""
+
+    def __init__(self, skills: Sequence[str], occupations: Sequence[Sequence[Any]],
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.skills = list(skills)
+        self.metadata = metadata or {}
+        self._skill_bits = {name.lower(): 1 << i for i, name in enumerate(self.skills)}
+        self._skill_words = [(1 << i, _content_words(name)) for i, name in enumerate(self.skills)]
+        self._phrase_masks: Dict[str, int] = {}
+        self._rows = {soc: i for i, (soc, _, _) in enumerate(occupations)}
+        self.job_zones = array.array('b', (zone or 0 for _, zone, _ in occupations))
+        self.skill_masks = [mask for _, _, mask in occupations]
+        self.clearance_valued = bytes(clearance_valued(soc) for soc, _, _ in occupations)
+
+    @classmethod
+    def load(cls, path: str) -> 'OccupationFeatures':
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['skills'], data['occupations'], data.get('metadata'))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def row(self, soc_code: str) -> Optional[int]:
+        return self._rows.get(soc_code.strip())
+
+    def skill_mask(self, skill_names: Iterable[str]) -> int:
+        """Bitmask of the O*NET skills matching free-text skills; text matching none is ignored"""
+        mask = 0
+        for name in skill_names:
+            phrase = ' '.join(str(name).lower().split())
+            if phrase not in self._phrase_masks:
+                self._phrase_masks[phrase] = self._match_phrase(phrase)
+            mask |= self._phrase_masks[phrase]
+        return mask
+
+    def _match_phrase(self, phrase: str) -> int:
+        if phrase in self._skill_bits:
+            return self._skill_bits[phrase]
+
+        words = _content_words(phrase)
+        aliased = SKILL_ALIASES.get(phrase) or tuple(
+            element for word in words for element in SKILL_ALIASES.get(word, ()))
+        mask = 0
+        for element in aliased:
+            mask |= self._skill_bits.get(element.lower(), 0)
+        for bit, element_words in self._skill_words:
+            if any(_same_stem(word, element_word) for word in words for element_word in element_words):
+                mask |= bit
+        return mask
+
+    def skill_names(self, mask: int) -> List[str]:
+        return [name for i, name in enumerate(self.skills) if mask >> i & 1]
+
+
+def load_features(path: Optional[str] = None) -> Optional[OccupationFeatures]:
+    """Open the shipped features file, returning None when the package was built without one"""
+    path = path or os.environ.get('OCCUPATION_FEATURES_PATH', DEFAULT_FEATURES_PATH)
+    if not os.path.exists(path):
+        print(f"Occupation features not found at {path}, careers keep O*NET order")
+        return None
+
+    try:
+        features = OccupationFeatures.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Failed to load occupation features {path}: {e}")
+        return None
+
+    print(f"Loaded features for {len(features)} occupations from {path}")
+    return features
+
+
+@lru_cache(maxsize=1)
+def get_occupation_features() -> Optional[OccupationFeatures]:
+    """The shipped features, loaded once per container"""
+    return load_features()
+
+
+def _content_words(text: str) -> List[str]:
+    return [word for word in re.findall(r'[a-z]+', text.lower()) if len(word) >= 4 and word not in SKILL_STOPWORDS]
+
+
+def _same_stem(a: str, b: str) -> bool:
+    length = min(len(a), len(b), SKILL_STEM_CHARS)
+    return length >= 4 and a[:length] == b[:length]
+
+
+def has_clearance(clearance: Optional[str]) -> bool:
+    return (clearance or '').strip().lower() not in NO_CLEARANCE
+
+
+def clearance_valued(soc_code: str) -> bool:
+    return soc_code.startswith(CLEARANCE_VALUED_SOC_PREFIXES)
+
+
+def education_fit(job_zone: int, qualified_zone: Optional[int]) -> float:
+    """1.0 within reach of the veteran's education, halving for each zone beyond it"""
+    if not job_zone or qualified_zone is None:
+        return UNKNOWN_ZONE_FIT
+    if job_zone <= qualified_zone:
+        return 1.0
+    return 0.5 ** (job_zone - qualified_zone)
+
+
+def rank_careers(soc_codes: Sequence[str], profile: Dict[str, Any], features: OccupationFeatures,
+                 wage_table: Optional[WageTable] = None, top_k: int = 10,
+                 weights: Dict[str, float] = WEIGHTS) -> List[RankedCareer]:
+    """
+    Score every candidate and return the top_k, best first, with explanations
+
+    profile uses the /recommend body fields: education, skills, clearance,
+    homeState, relocate and relocateState.
+    """
+    count = len(soc_codes)
+    if not count:
+        return []
+
+    state = profile.get('relocateState') if profile.get('relocate') and profile.get('relocateState') \
+        else profile.get('homeState')
+    medians, row_wages = _state_medians(wage_table, features, state) if wage_table is not None else ({}, None)
+    qualified_zone = EDUCATION_JOB_ZONE.get(profile.get('education') or '')
+    veteran_skills = features.skill_mask(profile.get('skills') or [])
+    veteran_skill_count = veteran_skills.bit_count()
+    cleared = has_clearance(profile.get('clearance'))
+
+    w_rank = weights['onet_rank']
+    w_skill = weights['skills'] / veteran_skill_count if veteran_skill_count else 0.0
+    w_clearance = weights['clearance'] if cleared else 0.0
+    # Weighted education score per job zone (0 = unknown), so the loop only indexes
+    zone_scores = [weights['education'] * education_fit(zone, qualified_zone) for zone in range(6)]
+    job_zones, skill_masks, valued, rows = features.job_zones, features.skill_masks, features.clearance_valued, \
+        features._rows
+
+    # Everything but the wage term, which is scaled across the candidates once all wages are known
+    scores = []
+    wages = []
+    for position, soc in enumerate(soc_codes):
+        row = rows.get(soc)
+        if row is None:
+            score = zone_scores[0] + (w_clearance if w_clearance and clearance_valued(soc) else 0.0)
+            wage = medians.get(normalize_soc(soc), 0)
+        else:
+            score = zone_scores[job_zones[row]] + w_skill * (skill_masks[row] & veteran_skills).bit_count() \
+                + w_clearance * valued[row]
+            wage = row_wages[row] if row_wages is not None else 0
+        scores.append(score + w_rank * (1 - position / count))
+        wages.append(wage)
+
+    paid = [wage for wage in wages if wage]
+    low, high = (min(paid), max(paid)) if paid else (0, 0)
+    wage_span = (high - low) or 1
+    if paid:
+        w_wage = weights['wage'] / wage_span
+        scored = [(score + w_wage * (wage - low) if wage else score, -position)
+                  for position, (score, wage) in enumerate(zip(scores, wages))]
+    else:
+        scored = [(score, -position) for position, score in enumerate(scores)]
+
+    top = heapq.nlargest(top_k, scored)
+    context = _RankingContext(features, weights, soc_codes, wages, low, wage_span, state, qualified_zone,
+                              profile.get('education'), veteran_skills, veteran_skill_count, cleared)
+    return [_explain(context, -negative_position, score) for score, negative_position in top]
+
+
+@lru_cache(maxsize=64)
+def _state_medians(wage_table: WageTable, features: OccupationFeatures,
+                   state: Optional[str]) -> Tuple[Dict[str, int], array.array]:
+    """
+    Median wage per BLS SOC for a state, and the same aligned to feature rows
+
+    Computed once per state per container.
+    """
+    medians = wage_table.area_column(state or '', 'median')
+    row_wages = array.array('i', (medians.get(normalize_soc(soc), 0) for soc in features._rows))
+    return medians, row_wages
+
+
+class _RankingContext(NamedTuple):
+    features: OccupationFeatures
+    weights: Dict[str, float]
+    soc_codes: Sequence[str]
+    wages: List[int]
+    low: int
+    wage_span: int
+    state: Optional[str]
+    qualified_zone: Optional[int]
+    education: Optional[str]
+    veteran_skills: int
+    veteran_skill_count: int
+    cleared: bool
+
+
+def _explain(context: _RankingContext, position: int, score: float) -> RankedCareer:
+    """Per-feature contributions and readable reasons for one ranked career"""
+    features, weights = context.features, context.weights
+    soc = context.soc_codes[position]
+    wage = context.wages[position]
+    row = features.row(soc)
+    zone = features.job_zones[row] if row is not None else 0
+    overlap = features.skill_masks[row] & context.veteran_skills if row is not None else 0
+    clearance_bonus = context.cleared and clearance_valued(soc)
+
+    contributions = {
+        'onet_rank': weights['onet_rank'] * (1 - position / len(context.soc_codes)),
+        'education': weights['education'] * education_fit(zone, context.qualified_zone),
+        'wage': weights['wage'] * (wage - context.low) / context.wage_span if wage else 0.0,
+        'skills': weights['skills'] * overlap.bit_count() / context.veteran_skill_count if overlap else 0.0,
+        'clearance': weights['clearance'] if clearance_bonus else 0.0,
+    }
+
+    reasons = [f"O*NET crosswalk match #{position + 1}"]
+    if zone and context.qualified_zone is not None:
+        if zone <= context.qualified_zone:
+            reasons.append(f"Job zone {zone} is within reach with a {context.education} education")
+        else:
+            reasons.append(f"Job zone {zone} usually needs more than a {context.education} education")
+    if wage:
+        reasons.append(f"Median pay ${wage:,} in {context.state}")
+    if overlap:
+        names = features.skill_names(overlap)
+        reasons.append(f"Uses {len(names)} of the {context.veteran_skill_count} O*NET skills matching your "
+                       f"listed skills: {', '.join(names)}")
+    if clearance_bonus:
+        reasons.append("Employers in this field value a security clearance")
+
+    return RankedCareer(
+        soc=soc,
+        score=round(score, 4),
+        onet_position=position,
+        contributions={name: round(value, 4) for name, value in contributions.items()},
+        reasons=reasons
+    )
+
+
+def build_features(job_zone_rows: Iterable[Dict[str, str]], skill_rows: Iterable[Dict[str, str]],
+                   output_path: str) -> Dict[str, int]:
+    """
+    Write a features file from the O*NET database `Job Zones` and `Skills` tables
+
+    A skill is set for an occupation when its importance (scale IM) is at
+    least SKILL_IMPORTANCE_THRESHOLD.
+    """
+    zones: Dict[str, int] = {}
+    for row in job_zone_rows:
+        try:
+            zones[row['O*NET-SOC Code'].strip()] = int(row['Job Zone'])
+        except (KeyError, ValueError):
+            continue
+
+    skills: List[str] = []
+    skill_bits: Dict[str, int] = {}
+    masks: Dict[str, int] = {}
+    for row in skill_rows:
+        if row.get('Scale ID') != 'IM':
+            continue
+        name = row['Element Name'].strip()
+        if name not in skill_bits:
+            skill_bits[name] = 1 << len(skills)
+            skills.append(name)
+        soc = row['O*NET-SOC Code'].strip()
+        masks.setdefault(soc, 0)
+        if float(row['Data Value']) >= SKILL_IMPORTANCE_THRESHOLD:
+            masks[soc] |= skill_bits[name]
+
+    socs = sorted(set(zones) | set(masks))
+    payload = {
+        'skills': skills,
+        'occupations': [[soc, zones.get(soc), masks.get(soc, 0)] for soc in socs],
+        'metadata': {'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+
+    return {'occupations': len(socs), 'skills': len(skills)}
+
+
+def _read_tsv(path: str) -> Iterable[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f, delimiter='\t')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Build the occupation features file for career ranking')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    build = subcommands.add_parser('build', help='Build features from O*NET database text files')
+    build.add_argument('job_zones', help='O*NET "Job Zones.txt"')
+    build.add_argument('skills', help='O*NET "Skills.txt"')
+    build.add_argument('--output', default=DEFAULT_FEATURES_PATH)
+
+    args = parser.parse_args(argv)
+
+    counts = build_features(_read_tsv(args.job_zones), _read_tsv(args.skills), args.output)
+    print(f"Wrote features for {counts['occupations']} occupations ({counts['skills']} skills) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
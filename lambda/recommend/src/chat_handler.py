@@ -1,8 +1,8 @@
 import json
 import os
 import time
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
 
 import boto3
 from aws_lambda_powertools import Logger, Tracer, Metrics
@@ -10,6 +10,8 @@ from aws_lambda_powertools.metrics import MetricUnit
 
 from .models import VeteranRequest
 from .bedrock_client import BedrockClient
+from .conversation_window import ConversationWindow, fold_older_turns, load_window
+from .session_store import session_writes, summary_folds
 
 logger = Logger()
 tracer = Tracer()
@@ -19,6 +21,21 @@ dynamodb = boto3.resource('dynamodb')
 table_name = os.environ.get('TABLE_NAME', 'VetROI_Sessions')
 table = dynamodb.Table(table_name)
 
+# Chat turns are items of their own, keyed (conversation_id = session_id, timestamp ms),
+# so the session item stays the same size however long the chat runs
+turns_table = dynamodb.Table(os.environ.get('CONVERSATIONS_TABLE_NAME', 'VetROI_Conversations'))
+
+CHAT_HISTORY_TOKEN_BUDGET = int(os.environ.get('CHAT_HISTORY_TOKEN_BUDGET', '3000'))
+CHAT_SUMMARY_MAX_TOKENS = int(os.environ.get('CHAT_SUMMARY_MAX_TOKENS', '400'))
+CHAT_FLUSH_SECONDS = 3.0
+TURN_TTL_SECONDS = 90 * 24 * 60 * 60  # Matches the session item
+
+SESSION_ATTRIBUTES = 'session_id, veteran_profile, onet_careers, conversation_history'
+
+EMPTY_HISTORY = ConversationWindow(
+    turns=[], summary='', summarized_through=0, oldest_timestamp=None, tokens=0, truncated=False
+)
+
 
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
@@ -74,19 +91,31 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         veteran_profile = VeteranRequest(**session_data['veteran_profile'])
         onet_careers = session_data['onet_careers']
         
+        # Sessions from before the turn store still carry their history inline
+        if session_data.get('conversation_history'):
+            migrate_conversation_history(session_id, session_data['conversation_history'])
+        
         # Initialize Bedrock client
         bedrock_client = BedrockClient()
         
+        # Newest turns within the token budget; older ones are folded into the
+        # summary in the background, unflushed, so the fold may finish on a later invocation
+        history = get_conversation_window(session_id)
+        if history.truncated:
+            summary_folds.submit(fold_conversation_history, session_id, history, bedrock_client)
+        
         # Generate personalized response using all collected data
         response = bedrock_client.generate_chat_response(
             veteran_profile=veteran_profile,
             onet_careers=onet_careers,
             user_message=message,
-            conversation_history=session_data.get('conversation_history', [])
+            conversation_history=window_history(history),
+            summary=history.summary
         )
         
-        # Update conversation history
-        update_conversation_history(session_id, message, response)
+        # Append the turn
+        session_writes.submit(store_conversation_turn, session_id, message, response)
+        session_writes.flush(CHAT_FLUSH_SECONDS)
         
         # Track metrics
         metrics.add_metric(name="ChatInteractions", unit=MetricUnit.Count, value=1)
@@ -121,7 +150,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 def get_session_data(session_id: str) -> Dict[str, Any]:
     """Retrieve session data from DynamoDB"""
     try:
-        response = table.get_item(Key={'session_id': session_id})
+        response = table.get_item(Key={'session_id': session_id}, ProjectionExpression=SESSION_ATTRIBUTES)
         return response.get('Item')
     except Exception as e:
         logger.error(f"Error retrieving session: {e}")
@@ -129,31 +158,82 @@ def get_session_data(session_id: str) -> Dict[str, Any]:
 
 
 @tracer.capture_method
-def update_conversation_history(session_id: str, user_message: str, ai_response: str) -> None:
-    """Update conversation history in DynamoDB"""
+def get_conversation_window(session_id: str) -> ConversationWindow:
+    """Newest chat turns that fit CHAT_HISTORY_TOKEN_BUDGET, plus the rolling summary"""
     try:
-        timestamp = datetime.utcnow().isoformat()
-        
-        # Update the session with new conversation history
-        table.update_item(
-            Key={'session_id': session_id},
-            UpdateExpression='SET conversation_history = list_append(if_not_exists(conversation_history, :empty), :new_messages)',
-            ExpressionAttributeValues={
-                ':empty': [],
-                ':new_messages': [
-                    {
-                        'role': 'user',
-                        'content': user_message,
-                        'timestamp': timestamp
-                    },
-                    {
-                        'role': 'assistant',
-                        'content': ai_response,
-                        'timestamp': timestamp
-                    }
-                ]
-            }
-        )
-        logger.info(f"Updated conversation history for session: {session_id}")
+        return load_window(turns_table, session_id, CHAT_HISTORY_TOKEN_BUDGET)
+    except Exception as e:
+        logger.error(f"Error loading conversation history: {e}")
+        return EMPTY_HISTORY
+
+
+def window_history(window: ConversationWindow) -> List[Dict[str, Any]]:
+    """Window turns as the role/content messages BedrockClient expects, oldest-first"""
+    messages = []
+    for turn in window.turns:
+        messages.append({'role': 'user', 'content': turn['user_message']})
+        messages.append({'role': 'assistant', 'content': turn['assistant_message']})
+    return messages
+
+
+@tracer.capture_method
+def fold_conversation_history(session_id: str, history: ConversationWindow, bedrock_client: BedrockClient) -> None:
+    """Compact turns older than the window into the summary record"""
+    try:
+        folded = fold_older_turns(turns_table, session_id, history, bedrock_client.summarize_conversation,
+                                  CHAT_SUMMARY_MAX_TOKENS)
+        metrics.add_metric(name="ChatTurnsCompacted", unit=MetricUnit.Count, value=folded)
+    except Exception as e:
+        # The turns stay stored; the next message retries the fold
+        logger.error(f"Error compacting conversation history: {e}")
+
+
+def turn_item(session_id: str, timestamp: int, user_message: str, ai_response: str,
+              created_at: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        'conversation_id': session_id,
+        'timestamp': timestamp,
+        'session_id': session_id,
+        'user_message': user_message,
+        'assistant_message': ai_response,
+        'created_at': created_at or datetime.utcnow().isoformat(),
+        'ttl': int(time.time()) + TURN_TTL_SECONDS
+    }
+
+
+@tracer.capture_method
+def store_conversation_turn(session_id: str, user_message: str, ai_response: str) -> None:
+    """Append one user/assistant exchange to the turn store"""
+    try:
+        turns_table.put_item(Item=turn_item(session_id, int(time.time() * 1000), user_message, ai_response))
+        logger.info(f"Stored conversation turn for session: {session_id}")
+    except Exception as e:
+        logger.error(f"Error storing conversation turn: {e}")
+
+
+@tracer.capture_method
+def migrate_conversation_history(session_id: str, conversation_history: List[Dict[str, Any]]) -> None:
+    """
+    Move an inline conversation_history list into the turn store, then drop it from the session
+
+    Messages were appended in user/assistant pairs sharing one ISO timestamp;
+    each pair becomes a turn at that time, offset by its index so pairs
+    written in the same millisecond keep their order.
+    """
+    try:
+        with turns_table.batch_writer() as batch:
+            for index in range(0, len(conversation_history) - 1, 2):
+                user, assistant = conversation_history[index], conversation_history[index + 1]
+                created_at = user.get('timestamp')
+                try:
+                    millis = int(datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc).timestamp() * 1000)
+                except (TypeError, ValueError):
+                    millis = int(time.time() * 1000) - len(conversation_history)
+                batch.put_item(Item=turn_item(session_id, millis + index // 2, user['content'],
+                                              assistant['content'], created_at))
+
+        table.update_item(Key={'session_id': session_id}, UpdateExpression='REMOVE conversation_history')
+        logger.info(f"Migrated {len(conversation_history) // 2} conversation turns for session: {session_id}")
     except Exception as e:
-        logger.error(f"Error updating conversation history: {e}")
\ No newline at end of file
+        # The inline history stays put and is migrated on the next message
+        logger.error(f"Error migrating conversation history: {e}")
\ No newline at end of file
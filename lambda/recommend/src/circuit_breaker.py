@@ -0,0 +1,68 @@
+"""
+Circuit breaker for upstream calls
+
+After `failure_threshold` consecutive failures the breaker opens and callers
+skip the upstream entirely, serving cached or fallback data instead. Once
+`reset_seconds` have passed a single probe call is let through: success
+closes the breaker, failure opens it for another period.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Any
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; an open breaker admits one probe per period"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                    print(f"{self.name} circuit opened after {self.failures} consecutive failures")
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'trips': self.trips,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,142 @@
+"""
+Token-budgeted conversation history with a rolling summary
+
+Turns live in a DynamoDB table keyed by (conversation_id, timestamp ms), one
+item per user/assistant exchange. The loader reads newest-first a page at a
+time and stops once the token budget is spent, so cost per message stays flat
+however long the conversation gets.
+
+Turns that fall out of the window are folded into a summary item stored at
+timestamp 0 in the same partition. `summarized_through` records the newest
+turn it covers, so each fold only reads and summarizes the turns that dropped
+out since the last one.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from vetroi_shared.token_budget import estimate_tokens, truncate_to_tokens
+
+SUMMARY_TIMESTAMP = 0
+PAGE_SIZE = 20
+FOLD_MAX_TURNS = 20
+
+# (previous summary, turns oldest-first, max tokens) -> new summary
+Summarizer = Callable[[str, List[Dict[str, Any]], int], str]
+
+
+class ConversationWindow(NamedTuple):
+    turns: List[Dict[str, Any]]         # oldest-first
+    summary: str
+    summarized_through: int             # timestamp of the newest turn folded into the summary
+    oldest_timestamp: Optional[int]     # oldest turn kept in the window
+    tokens: int                         # estimated tokens for turns plus summary
+    truncated: bool                     # older turns exist that did not fit the budget
+
+
+def turn_tokens(item: Dict[str, Any]) -> int:
+    return estimate_tokens(item.get('user_message', '')) + estimate_tokens(item.get('assistant_message', ''))
+
+
+def load_summary(table: Any, conversation_id: str) -> Dict[str, Any]:
+    response = table.get_item(Key={'conversation_id': conversation_id, 'timestamp': SUMMARY_TIMESTAMP})
+    return response.get('Item') or {}
+
+
+def load_window(table: Any, conversation_id: str, token_budget: int,
+                page_size: int = PAGE_SIZE) -> ConversationWindow:
+    """Newest turns that fit token_budget alongside the stored summary"""
+    summary_item = load_summary(table, conversation_id)
+    summary = summary_item.get('summary', '')
+    summarized_through = int(summary_item.get('summarized_through', SUMMARY_TIMESTAMP))
+
+    remaining = token_budget - estimate_tokens(summary)
+    kept: List[Dict[str, Any]] = []
+    truncated = False
+
+    query = {
+        'KeyConditionExpression': 'conversation_id = :cid AND #ts > :after',
+        'ExpressionAttributeNames': {'#ts': 'timestamp'},
+        'ExpressionAttributeValues': {':cid': conversation_id, ':after': summarized_through},
+        'ScanIndexForward': False,
+        'Limit': page_size
+    }
+
+    while True:
+        response = table.query(**query)
+        for item in response.get('Items', []):
+            cost = turn_tokens(item)
+            if cost > remaining:
+                truncated = True
+                break
+            remaining -= cost
+            kept.append(item)
+
+        last_key = response.get('LastEvaluatedKey')
+        if truncated or not last_key:
+            break
+        query['ExclusiveStartKey'] = last_key
+
+    kept.reverse()
+    return ConversationWindow(
+        turns=kept,
+        summary=summary,
+        summarized_through=summarized_through,
+        oldest_timestamp=int(kept[0]['timestamp']) if kept else None,
+        tokens=token_budget - remaining,
+        truncated=truncated
+    )
+
+
+def window_messages(window: ConversationWindow) -> List[Dict[str, Any]]:
+    """Bedrock Converse messages for the kept turns, oldest-first"""
+    messages = []
+    for item in window.turns:
+        messages.append({'role': 'user', 'content': [{'text': item['user_message']}]})
+        messages.append({'role': 'assistant', 'content': [{'text': item['assistant_message']}]})
+    return messages
+
+
+def fold_older_turns(table: Any, conversation_id: str, window: ConversationWindow,
+                     summarize: Summarizer, summary_max_tokens: int,
+                     max_turns: int = FOLD_MAX_TURNS) -> int:
+    """
+    Fold turns older than the window into the summary; returns how many were folded
+
+    At most max_turns are folded per call, oldest first, so a long legacy
+    conversation catches up over a few messages instead of in one large call.
+    """
+    if not window.truncated:
+        return 0
+
+    condition = 'conversation_id = :cid AND #ts > :after'
+    values = {':cid': conversation_id, ':after': window.summarized_through}
+    if window.oldest_timestamp is not None:
+        condition = 'conversation_id = :cid AND #ts BETWEEN :after AND :before'
+        values[':after'] = window.summarized_through + 1
+        values[':before'] = window.oldest_timestamp - 1
+
+    response = table.query(
+        KeyConditionExpression=condition,
+        ExpressionAttributeNames={'#ts': 'timestamp'},
+        ExpressionAttributeValues=values,
+        ScanIndexForward=True,
+        Limit=max_turns
+    )
+    turns = response.get('Items', [])
+    if not turns:
+        return 0
+
+    summary = truncate_to_tokens(summarize(window.summary, turns, summary_max_tokens), summary_max_tokens)
+
+    item = {
+        'conversation_id': conversation_id,
+        'timestamp': SUMMARY_TIMESTAMP,
+        'summary': summary,
+        'summarized_through': int(turns[-1]['timestamp'])
+    }
+    # The summary expires with the newest turn it covers
+    if 'ttl' in turns[-1]:
+        item['ttl'] = turns[-1]['ttl']
+
+    table.put_item(Item=item)
+    return len(turns)
@@ -0,0 +1,216 @@
+"""
+Offline military-to-SOC crosswalk index shipped with the deployment package
+
+The index is a read-only SQLite file keyed on (normalized military code,
+O*NET branch). Each row holds the zlib-compressed O*NET crosswalk response in
+the same `match[].occupations.occupation[]` shape the frontend consumes, so a
+hit answers /recommend without any network call.
+
+Build it from saved /online/crosswalks/military responses:
+
+    python -m src.crosswalk_index build dumps/ --output data/crosswalk_index.sqlite
+
+Then fold its military codes into the bundled autocomplete list:
+
+    python -m src.crosswalk_index codes --index data/crosswalk_index.sqlite
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .mos_autocomplete import DEFAULT_CODES_PATH, load_code_list, merge_code_lists, write_code_list
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'crosswalk_index.sqlite'
+)
+ALL_BRANCHES = 'all'
+
+SCHEMA = """
+CREATE TABLE crosswalk (
+    code TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (code, branch)
+) WITHOUT ROWID;
+
+CREATE TABLE military_codes (
+    code TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    title TEXT NOT NULL,
+    PRIMARY KEY (code, branch)
+) WITHOUT ROWID;
+
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def normalize_code(military_code: str) -> str:
+    return military_code.strip().upper()
+
+
+class CrosswalkIndex:
+    """Read-only lookups against a prebuilt crosswalk index file"""
+
+    def __init__(self, path: str):
+        started = time.perf_counter()
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True,
+                                     check_same_thread=False)
+        self.metadata = dict(self._conn.execute("SELECT key, value FROM metadata"))
+
+        self.load_ms = (time.perf_counter() - started) * 1000
+
+    def lookup(self, military_code: str, branch: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the crosswalk response for a code and O*NET branch, or None if not indexed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM crosswalk WHERE code = ? AND branch = ?",
+                (normalize_code(military_code), branch or ALL_BRANCHES)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def military_codes(self) -> List[Tuple[str, str, str]]:
+        """All indexed (code, branch, title) rows"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT code, branch, title FROM military_codes ORDER BY code, branch"
+            ).fetchall()
+
+
+def load_index(path: Optional[str] = None) -> Optional[CrosswalkIndex]:
+    """Open the shipped index, returning None when the package was built without one"""
+    path = path or os.environ.get('CROSSWALK_INDEX_PATH', DEFAULT_INDEX_PATH)
+    if not os.path.exists(path):
+        print(f"Crosswalk index not found at {path}, using live O*NET lookups")
+        return None
+
+    try:
+        index = CrosswalkIndex(path)
+    except sqlite3.Error as e:
+        print(f"Failed to open crosswalk index {path}: {e}")
+        return None
+
+    print(f"Loaded crosswalk index {path} in {index.load_ms:.2f} ms "
+          f"(built {index.metadata.get('built_at', 'unknown')})")
+    return index
+
+
+def build_index(responses: Iterable[Dict[str, Any]], output_path: str) -> Dict[str, int]:
+    """
+    Write an index file from O*NET crosswalk responses
+
+    Each response is keyed on its `keyword` and `branch` fields. Codes seen only
+    in branch-specific responses also get an `all` entry merging their matches,
+    mirroring what O*NET returns when no branch filter is given.
+    """
+    entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    merged: Dict[str, List[Dict[str, Any]]] = {}
+    titles: Dict[Tuple[str, str], str] = {}
+
+    for response in responses:
+        if 'error' in response or not isinstance(response.get('match'), list):
+            continue
+
+        code = normalize_code(response.get('keyword', ''))
+        if not code:
+            continue
+        branch = response.get('branch') or ALL_BRANCHES
+
+        entries[(code, branch)] = response
+        if branch != ALL_BRANCHES:
+            merged.setdefault(code, []).extend(response['match'])
+
+        for match in response['match']:
+            if match.get('code') and match.get('title'):
+                match_branch = match.get('branch') or branch
+                titles[(normalize_code(match['code']), match_branch)] = match['title']
+
+    for code, matches in merged.items():
+        if (code, ALL_BRANCHES) not in entries:
+            entries[(code, ALL_BRANCHES)] = {
+                'keyword': code,
+                'branch': ALL_BRANCHES,
+                'total': len(matches),
+                'match': matches
+            }
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    conn = sqlite3.connect(output_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO crosswalk (code, branch, payload) VALUES (?, ?, ?)",
+            [
+                (code, branch, zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), 9))
+                for (code, branch), payload in sorted(entries.items())
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO military_codes (code, branch, title) VALUES (?, ?, ?)",
+            [(code, branch, title) for (code, branch), title in sorted(titles.items())]
+        )
+        conn.executemany(
+            "INSERT INTO metadata (key, value) VALUES (?, ?)",
+            [('built_at', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())),
+             ('entries', str(len(entries)))]
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    return {'entries': len(entries), 'military_codes': len(titles)}
+
+
+def _read_dumps(dump_dir: str) -> Iterable[Dict[str, Any]]:
+    for path in sorted(glob.glob(os.path.join(dump_dir, '**', '*.json'), recursive=True)):
+        with open(path) as f:
+            yield json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Build the offline O*NET crosswalk index')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    build = subcommands.add_parser('build', help='Build an index from saved crosswalk responses')
+    build.add_argument('dump_dir', help='Directory of /online/crosswalks/military JSON responses')
+    build.add_argument('--output', default=DEFAULT_INDEX_PATH)
+
+    codes = subcommands.add_parser('codes', help='Merge an index\'s military codes into the autocomplete list')
+    codes.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    codes.add_argument('--output', default=DEFAULT_CODES_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'codes':
+        index = CrosswalkIndex(args.index)
+        count = write_code_list(merge_code_lists(load_code_list(args.output), index.military_codes()), args.output)
+        print(f"Wrote {count} military codes to {args.output}")
+        return
+
+    counts = build_index(_read_dumps(args.dump_dir), args.output)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"Wrote {counts['entries']} crosswalk entries and {counts['military_codes']} "
+          f"military codes to {args.output} ({size_kb:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -15,7 +15,7 @@ from aws_xray_sdk.core import patch_all
 # Patch all AWS SDK calls and HTTP calls for X-Ray tracing
 patch_all()
 
-from .models import VeteranRequest, RecommendationResponse, Career
+from .models import VeteranRequest, RecommendationResponse, Career, parse_veteran_request
 from .onet_client import ONetClient
 from .bedrock_client import BedrockClient
 
@@ -54,8 +54,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     
     try:
         # Parse request
-        body = json.loads(event.get('body', '{}'))
-        veteran_request = VeteranRequest(**body)
+        veteran_request = parse_veteran_request(event.get('body'))
         
         # Generate session ID
         session_id = str(uuid.uuid4())
@@ -65,9 +64,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Get O*NET data for the military code with branch filter
         logger.info(f"Fetching O*NET data for code: {veteran_request.code}, branch: {veteran_request.branch}")
+        state = veteran_request.homeState if not veteran_request.relocate else veteran_request.relocateState
         onet_data = onet_client.get_career_data(
             veteran_request.code,
-            veteran_request.homeState if not veteran_request.relocate else veteran_request.relocateState,
+            state,
             veteran_request.branch
         )
         
@@ -79,10 +79,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         metrics.add_metadata(key="branch", value=veteran_request.branch)
         
         # Return the O*NET data directly without AI processing
+        profile = veteran_request.model_dump(mode='json')
         response_data = {
             'session_id': session_id,
-            'profile': veteran_request.dict(),
+            'profile': profile,
             'onet_careers': onet_data,  # Full O*NET military crosswalk response
+            'wages': onet_client.get_career_wages(onet_data, state),  # BLS OES annual wages by SOC
+            'ranked_careers': onet_client.get_ranked_careers(onet_data, profile),
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -127,7 +130,7 @@ def store_profile_session(session_id: str, request: VeteranRequest, onet_data: D
     item = {
         'session_id': session_id,
         'timestamp': timestamp,
-        'veteran_profile': request.dict(),
+        'veteran_profile': request.model_dump(mode='json'),
         'onet_careers': onet_data,
         'created_at': datetime.utcnow().isoformat(),
         'ttl': timestamp + (90 * 24 * 60 * 60)  # 90 days TTL
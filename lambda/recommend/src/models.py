@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Union
 from enum import Enum
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, model_validator
+from pydantic_core import from_json
 
 
 class Branch(str, Enum):
@@ -84,11 +85,11 @@ class VeteranRequest(BaseModel):
     skills: Optional[List[str]] = Field(default_factory=list)
     clearance: Optional[str] = None
     
-    @validator('relocateState')
-    def validate_relocate_state(cls, v, values):
-        if values.get('relocate') and not v:
+    @model_validator(mode='after')
+    def validate_relocate_state(self) -> 'VeteranRequest':
+        if self.relocate and not self.relocateState:
             raise ValueError('relocateState is required when relocate is true')
-        return v
+        return self
 
 
 class Career(BaseModel):
@@ -99,8 +100,7 @@ class Career(BaseModel):
     match_reason: str = Field(..., alias="matchReason")
     next_step: str = Field(..., alias="nextStep")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class RecommendationResponse(BaseModel):
@@ -108,8 +108,47 @@ class RecommendationResponse(BaseModel):
     recommendations: List[Career]
     timestamp: datetime
     
-    class Config:
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True)
+
+
+# Validators are compiled once here, at import, and reused by every invocation
+_veteran_requests = TypeAdapter(List[VeteranRequest])
+
+
+def parse_veteran_request(body: Union[str, bytes, None]) -> VeteranRequest:
+    """
+    Validate a raw JSON request body straight into a VeteranRequest
+
+    pydantic-core parses and validates in one pass, without building an
+    intermediate dict. Raises ValidationError (a ValueError) on bad input.
+    """
+    return VeteranRequest.model_validate_json(body or '{}')
+
+
+class BatchValidation(NamedTuple):
+    requests: List[VeteranRequest]
+    errors: Dict[int, List[Dict[str, Any]]]     # input index -> pydantic error details
+
+
+def validate_veteran_requests(body: Union[str, bytes]) -> BatchValidation:
+    """
+    Validate a JSON array of veteran profiles, e.g. a bulk import
+
+    A clean batch is validated in one call. Otherwise the valid items are
+    still returned, and the errors are grouped by their index in the input.
+    """
+    try:
+        return BatchValidation(_veteran_requests.validate_json(body), {})
+    except ValidationError as e:
+        errors: Dict[int, List[Dict[str, Any]]] = {}
+        for error in e.errors(include_url=False):
+            if error['loc'] and isinstance(error['loc'][0], int):
+                errors.setdefault(error['loc'][0], []).append(error)
+        if not errors:
+            raise  # Not a JSON array at all
+
+    items = from_json(body)
+    return BatchValidation(
+        [VeteranRequest.model_validate(item) for index, item in enumerate(items) if index not in errors],
+        errors
+    )
\ No newline at end of file
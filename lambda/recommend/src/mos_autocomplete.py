@@ -0,0 +1,186 @@
+"""
+In-memory autocomplete over known military occupation codes
+
+Codes (MOS, AFSC, Navy ratings, Marine MOS) are loaded into a trie once per
+container so the recommend form can validate and suggest codes without an
+O*NET round trip. Queries match code prefixes, codes within one edit of the
+query (typos like `25V` for `25B`), and prefixes of words in the title.
+
+The code list ships as data/military_codes.json, so suggestions work without
+the crosswalk index. When an index is packaged its military_codes rows are
+merged on top. To refresh the bundled list from an index build:
+
+    python -m src.crosswalk_index codes --index data/crosswalk_index.sqlite
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+Entry = Tuple[str, str, str]  # (code, branch, title)
+
+DEFAULT_CODES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'military_codes.json'
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def load_code_list(path: str = DEFAULT_CODES_PATH) -> List[Entry]:
+    """Bundled (code, branch, title) rows; empty if the file is missing"""
+    try:
+        with open(path) as f:
+            return [(row['code'], row['branch'], row['title']) for row in json.load(f)]
+    except FileNotFoundError:
+        print(f"Military code list {path} not found")
+        return []
+
+
+def merge_code_lists(*sources: Iterable[Entry]) -> List[Entry]:
+    """Union of code lists by (code, branch); later sources win on title"""
+    merged: Dict[Tuple[str, str], str] = {}
+    for rows in sources:
+        for code, branch, title in rows:
+            merged[(code.upper(), branch)] = title
+    return [(code, branch, title) for (code, branch), title in sorted(merged.items())]
+
+
+def write_code_list(rows: Iterable[Entry], path: str = DEFAULT_CODES_PATH) -> int:
+    """Write rows in the bundled format, one per line so diffs stay readable"""
+    rows = list(rows)
+    with open(path, 'w') as f:
+        f.write('[\n' + ',\n'.join(
+            '  ' + json.dumps({'code': code, 'branch': branch, 'title': title}) for code, branch, title in rows
+        ) + '\n]\n')
+    return len(rows)
+
+
+class _Node:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.entries: List[Entry] = []
+
+
+class _Trie:
+
+    def __init__(self):
+        self.root = _Node()
+
+    def insert(self, key: str, entry: Entry) -> None:
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+        node.entries.append(entry)
+
+    def find(self, key: str) -> Optional[_Node]:
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def within_one_edit(self, query: str) -> Set[str]:
+        """Keys at Levenshtein distance <= 1 from query"""
+        found: Set[str] = set()
+        self._walk(self.root, query, 0, 1, '', found)
+        return found
+
+    def _walk(self, node: _Node, query: str, i: int, edits: int, prefix: str, found: Set[str]) -> None:
+        if i == len(query):
+            if node.entries:
+                found.add(prefix)
+            if edits:
+                for ch, child in node.children.items():
+                    if child.entries:
+                        found.add(prefix + ch)  # insertion at the end
+            return
+
+        child = node.children.get(query[i])
+        if child is not None:
+            self._walk(child, query, i + 1, edits, prefix + query[i], found)
+
+        if edits:
+            self._walk(node, query, i + 1, 0, prefix, found)  # deletion
+            for ch, child in node.children.items():
+                if ch != query[i]:
+                    self._walk(child, query, i + 1, 0, prefix + ch, found)  # substitution
+                self._walk(child, query, i, 0, prefix + ch, found)  # insertion
+
+
+def _collect(node: _Node, limit: int) -> List[Entry]:
+    """Entries under node, shortest keys first"""
+    results: List[Entry] = []
+    level = [node]
+    while level and len(results) < limit:
+        next_level = []
+        for current in level:
+            results.extend(current.entries)
+            next_level.extend(current.children[ch] for ch in sorted(current.children))
+        level = next_level
+    return results
+
+
+class MosAutocomplete:
+    """Prefix and edit-distance-1 lookup over (code, branch, title) rows"""
+
+    def __init__(self, rows: Iterable[Entry]):
+        self._codes = _Trie()
+        self._title_words = _Trie()
+        self.size = 0
+
+        for code, branch, title in rows:
+            entry = (code.upper(), branch, title)
+            self._codes.insert(entry[0], entry)
+            for word in set(_WORD_RE.findall(title.lower())):
+                self._title_words.insert(word, entry)
+            self.size += 1
+
+    def suggest(self, query: str, branch: Optional[str] = None, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        Suggestions ordered exact match, code prefix, one-edit typo, then title word
+
+        Args:
+            query: Partial code or title text as typed
+            branch: Optional O*NET branch to restrict results to
+            limit: Maximum number of suggestions
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        code_query = query.upper()
+        seen: Set[Tuple[str, str]] = set()
+        suggestions: List[Dict[str, str]] = []
+
+        def add(entries: Iterable[Entry], match: str) -> None:
+            for code, entry_branch, title in entries:
+                if len(suggestions) >= limit:
+                    return
+                if branch and entry_branch != branch:
+                    continue
+                if (code, entry_branch) in seen:
+                    continue
+                seen.add((code, entry_branch))
+                suggestions.append({'code': code, 'branch': entry_branch, 'title': title, 'match': match})
+
+        node = self._codes.find(code_query)
+        if node is not None:
+            add(node.entries, 'exact')
+            add(_collect(node, limit * 4), 'prefix')
+
+        if len(code_query) >= 2:
+            for key in sorted(self._codes.within_one_edit(code_query)):
+                add(self._codes.find(key).entries, 'fuzzy')
+
+        if len(query) >= 3:
+            words = _WORD_RE.findall(query.lower())
+            if words:
+                node = self._title_words.find(words[-1])
+                if node is not None:
+                    add(_collect(node, limit * 4), 'title')
+
+        return suggestions
@@ -1,17 +1,148 @@
 import os
 import json
 import base64
-from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from functools import lru_cache
 
 import boto3
 import requests
-from aws_lambda_powertools import Logger, Tracer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from aws_lambda_powertools import Logger, Tracer, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
 from botocore.exceptions import ClientError
 
+from . import aws_clients
+from .cache import S3CacheTier, TieredCache, TTLCache
+from .career_ranking import get_occupation_features, rank_careers
+from .circuit_breaker import CircuitBreaker
+from .report_prefetch import MAX_CAREER_CANDIDATES, career_soc_codes
+from .single_flight import onet_flights
+from .wage_table import get_wage_table, wages_by_soc
+
 logger = Logger()
 tracer = Tracer()
+metrics = Metrics()
+
+# Process-wide career data cache, shared by every ONetClient in the container.
+# Misses and errors are cached briefly so a bad code or an O*NET outage is not
+# retried on every request, but recovers within a minute.
+CAREER_DATA_TTL_SECONDS = int(os.environ.get('ONET_CACHE_TTL_SECONDS', str(6 * 3600)))
+CAREER_DATA_NEGATIVE_TTL_SECONDS = int(os.environ.get('ONET_NEGATIVE_CACHE_TTL_SECONDS', '60'))
+CAREER_DATA_CACHE_BYTES = int(os.environ.get('ONET_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+
+career_data_cache = TTLCache(
+    maxsize=4096,
+    ttl_seconds=CAREER_DATA_TTL_SECONDS,
+    max_bytes=CAREER_DATA_CACHE_BYTES
+)
+
+# Behind the local cache, CACHE_BUCKET holds every container's results. Entries
+# past the fresh window are served at once and refreshed in the background, so
+# a slow or failing O*NET only delays codes no container has looked up yet.
+S3_CACHE_PREFIX = 'cache/career-data/'
+S3_FRESH_SECONDS = int(os.environ.get('ONET_S3_FRESH_SECONDS', str(7 * 24 * 3600)))
+S3_STALE_SECONDS = int(os.environ.get('ONET_S3_STALE_SECONDS', str(90 * 24 * 3600)))
+
+CACHE_SOURCE_METRICS = {
+    'local': "ONetCacheHit",
+    'shared': "ONetS3CacheHit",
+    'stale': "ONetS3StaleHit",
+    'origin': "ONetCacheMiss"
+}
+
+
+def career_data_key(military_code: str, branch: str) -> str:
+    return f"{military_code.strip().upper()}/{branch}"
+
+
+@lru_cache(maxsize=1)
+def cache_bucket() -> Optional[str]:
+    """CACHE_BUCKET, or the stack's default bucket name; resolved once per container"""
+    bucket = os.environ.get('CACHE_BUCKET')
+    if bucket:
+        return bucket
+    try:
+        account = aws_clients.client('sts').get_caller_identity()['Account']
+        return f'vetroi-onet-cache-{account}'
+    except Exception as e:
+        logger.warning(f"O*NET S3 cache disabled, no bucket: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+def career_data_tiers() -> TieredCache:
+    bucket = cache_bucket()
+    return TieredCache(
+        'onet',
+        local=career_data_cache,
+        shared=S3CacheTier(aws_clients.client('s3'), bucket, S3_CACHE_PREFIX) if bucket else None,
+        fresh_seconds=S3_FRESH_SECONDS,
+        stale_seconds=S3_STALE_SECONDS,
+        write_behind=True
+    )
+
+
+def is_negative(career_data: Dict[str, Any]) -> bool:
+    """No matches or an error fallback"""
+    return 'error' in career_data or not career_data.get('total')
+
+
+# HTTP behaviour for O*NET calls. Retries cover connection errors and 5xx/429
+# on GET only, with jittered exponential backoff; Retry-After is not honoured
+# because the API Gateway timeout is shorter than O*NET's typical value.
+CONNECT_TIMEOUT_SECONDS = float(os.environ.get('ONET_CONNECT_TIMEOUT_SECONDS', '3.05'))
+READ_TIMEOUT_SECONDS = float(os.environ.get('ONET_READ_TIMEOUT_SECONDS', '8'))
+POOL_MAXSIZE = int(os.environ.get('ONET_POOL_MAXSIZE', '10'))
+MAX_RETRIES = int(os.environ.get('ONET_MAX_RETRIES', '2'))
+BACKOFF_FACTOR = 0.25
+BACKOFF_JITTER = 0.25
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Consecutive failed lookups (after retries) before callers are sent straight to fallbacks
+onet_breaker = CircuitBreaker(
+    'onet',
+    failure_threshold=int(os.environ.get('ONET_BREAKER_THRESHOLD', '5')),
+    reset_seconds=float(os.environ.get('ONET_BREAKER_RESET_SECONDS', '30'))
+)
+
+
+def build_session() -> requests.Session:
+    """requests Session with a sized keep-alive pool and idempotent retries"""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json', 'User-Agent': 'VetROI/1.0'})
+    return session
+
+
+@lru_cache(maxsize=1)
+def http_session() -> requests.Session:
+    """One pool per container, shared by every ONetClient"""
+    return build_session()
+
+
+# Careers returned by get_ranked_careers
+RANKED_CAREERS = 10
+
+
+@lru_cache(maxsize=4)
+def _onet_credentials(secret_name: str) -> Tuple[str, str]:
+    """O*NET basic-auth credentials, read from Secrets Manager once per container"""
+    response = boto3.client('secretsmanager').get_secret_value(SecretId=secret_name)
+    secret = json.loads(response['SecretString'])
+    return secret['username'], secret['password']
 
 
 class ONetClient:
@@ -20,33 +151,29 @@ class ONetClient:
     def __init__(self):
         self.base_url = os.environ.get('ONET_API_URL', 'https://services.onetcenter.org/ws')
         self.secret_name = os.environ.get('ONET_SECRET_NAME', 'ONET')
-        self.session = requests.Session()
+        self.session = http_session()
+        self.timeout = (CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS)
         self._setup_auth()
     
     @tracer.capture_method
     def _setup_auth(self):
         """Set up authentication for O*NET API"""
         try:
-            # Get credentials from Secrets Manager
-            secrets_client = boto3.client('secretsmanager')
-            response = secrets_client.get_secret_value(SecretId=self.secret_name)
-            secret = json.loads(response['SecretString'])
-            
-            # Set up basic auth
-            username = secret['username']
-            password = secret['password']
-            self.session.auth = (username, password)
+            # Credentials are cached per container, so new clients skip Secrets Manager
+            self.session.auth = _onet_credentials(self.secret_name)
             
         except ClientError as e:
             logger.error(f"Failed to retrieve O*NET credentials: {e}")
             raise
     
     @tracer.capture_method
-    @lru_cache(maxsize=128)
     def get_career_data(self, military_code: str, state: str, branch: str = 'all') -> Dict[str, Any]:
         """
         Get career data from O*NET for a military occupation code
         
+        Results are cached process-wide on (military_code, branch); the
+        crosswalk does not depend on state.
+        
         Args:
             military_code: Military occupation code (MOS/AFSC/Rate)
             state: US state code for salary data
@@ -55,6 +182,38 @@ class ONetClient:
         Returns:
             Dictionary containing O*NET career data
         """
+        key = career_data_key(military_code, branch)
+        tiers = career_data_tiers()
+        career_data = tiers.get_or_load(
+            key,
+            lambda: self._load_career_data(military_code, state, branch),
+            cacheable=lambda result: not is_negative(result)
+        )
+        
+        source = tiers.last_source
+        negative = is_negative(career_data)
+        if source == 'origin' and negative:
+            # Kept out of S3; cached locally just long enough to absorb retries
+            tiers.local.set(key, career_data, ttl_seconds=CAREER_DATA_NEGATIVE_TTL_SECONDS)
+        
+        metric = "ONetCacheNegativeHit" if source == 'local' and negative else CACHE_SOURCE_METRICS[source]
+        metrics.add_metric(name=metric, unit=MetricUnit.Count, value=1)
+        if source != 'local':
+            metrics.add_metric(name="ONetCacheBytes", unit=MetricUnit.Bytes, value=tiers.local.total_bytes)
+        return career_data
+    
+    def _load_career_data(self, military_code: str, state: str, branch: str) -> Dict[str, Any]:
+        """Crosswalk lookup with no-match, error and open-circuit fallbacks"""
+        if not onet_breaker.allow():
+            metrics.add_metric(name="ONetCircuitOpen", unit=MetricUnit.Count, value=1)
+            return {
+                **self._get_fallback_careers(state),
+                'keyword': military_code,
+                'branch': branch,
+                'total': 0,
+                'error': 'O*NET unavailable'
+            }
+        
         try:
             # Get the full O*NET military crosswalk data
             crosswalk_data = self._military_to_onet(military_code, branch)
@@ -85,6 +244,13 @@ class ONetClient:
     
     @tracer.capture_method
     def _military_to_onet(self, military_code: str, branch: str = 'all') -> Optional[Dict[str, Any]]:
+        """Crosswalk military code to O*NET SOC codes, sharing identical in-flight lookups"""
+        return onet_flights.do(
+            ('military', military_code.strip().upper(), branch),
+            lambda: self._fetch_military_crosswalk(military_code, branch)
+        )
+    
+    def _fetch_military_crosswalk(self, military_code: str, branch: str = 'all') -> Optional[Dict[str, Any]]:
         """Crosswalk military code to O*NET SOC codes with branch filtering"""
         try:
             # Call O*NET military crosswalk endpoint with branch parameter
@@ -109,7 +275,7 @@ class ONetClient:
                 subsegment.put_metadata('url', url)
                 subsegment.put_metadata('params', params)
                 
-                response = self.session.get(url, params=params, headers=headers)
+                response = self._get(url, params=params, headers=headers)
                 
                 subsegment.put_metadata('status_code', response.status_code)
                 subsegment.put_metadata('response_time_ms', response.elapsed.total_seconds() * 1000)
@@ -145,6 +311,20 @@ class ONetClient:
                 'error': str(e)
             }
     
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET with timeouts and retries; the outcome after retries feeds the circuit breaker"""
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            onet_breaker.record_failure()
+            raise
+        
+        if response.status_code in RETRY_STATUSES:
+            onet_breaker.record_failure()
+        else:
+            onet_breaker.record_success()
+        return response
+    
     @tracer.capture_method
     def _get_occupation_details(self, soc_code: str, state: str) -> Optional[Dict[str, Any]]:
         """Get detailed occupation data including salary for state"""
@@ -157,7 +337,7 @@ class ONetClient:
                 subsegment.put_metadata('soc_code', soc_code)
                 subsegment.put_metadata('url', url)
                 
-                response = self.session.get(url)
+                response = self._get(url)
                 
                 subsegment.put_metadata('status_code', response.status_code)
                 subsegment.put_metadata('response_time_ms', response.elapsed.total_seconds() * 1000)
@@ -175,7 +355,7 @@ class ONetClient:
                 'soc': soc_code,
                 'title': occupation_data.get('title', 'Unknown'),
                 'description': occupation_data.get('description', ''),
-                'median_salary': salary_data.get('median', 50000),
+                'median_salary': salary_data.get('median'),
                 'tasks': occupation_data.get('tasks', [])[:3],  # Top 3 tasks
                 'skills': occupation_data.get('skills', [])[:5],  # Top 5 skills
             }
@@ -184,71 +364,31 @@ class ONetClient:
             logger.error(f"Error getting occupation details: {e}")
             return None
     
+    def get_career_wages(self, career_data: Dict[str, Any], state: str) -> Dict[str, Dict[str, Any]]:
+        """Annual wages in state (national where the state has none) for every career in a crosswalk"""
+        return wages_by_soc(get_wage_table(), career_soc_codes(career_data, MAX_CAREER_CANDIDATES), state)
+    
+    def get_ranked_careers(self, career_data: Dict[str, Any], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Top crosswalk careers for a veteran profile with explanations; empty without features"""
+        features = get_occupation_features()
+        if features is None:
+            return []
+        soc_codes = career_soc_codes(career_data, MAX_CAREER_CANDIDATES)
+        ranked = rank_careers(soc_codes, profile, features, get_wage_table(), RANKED_CAREERS)
+        return [career._asdict() for career in ranked]
+    
     def _get_state_salary(self, soc_code: str, state: str) -> Dict[str, int]:
-        """Get state-specific salary data"""
-        # Mock implementation - real would query BLS or O*NET wage data
-        base_salaries = {
-            "11-1011.00": 130000,  # Chief Executives
-            "15-1211.00": 95000,   # Computer Systems Analysts
-            "29-2041.00": 48000,   # Emergency Medical Technicians
-            "33-3051.01": 52000,   # Police Patrol Officers
-        }
-        
-        # State cost-of-living adjustment (mock)
-        state_multipliers = {
-            "CA": 1.3, "NY": 1.25, "TX": 0.95, "FL": 0.90,
-            "WA": 1.15, "CO": 1.1, "VA": 1.05
-        }
-        
-        base = base_salaries.get(soc_code, 50000)
-        multiplier = state_multipliers.get(state, 1.0)
+        """Get state-specific salary data from the BLS OES wage table"""
+        wages = wages_by_soc(get_wage_table(), [soc_code], state).get(soc_code)
+        if not wages:
+            return {}
         
         return {
-            'median': int(base * multiplier),
-            'percentile_25': int(base * multiplier * 0.8),
-            'percentile_75': int(base * multiplier * 1.2)
+            'median': wages['median'],
+            'percentile_25': wages['p25'],
+            'percentile_75': wages['p75']
         }
     
-    def _get_cached_data(self, military_code: str, state: str) -> Optional[Dict[str, Any]]:
-        """Get cached O*NET data from S3"""
-        try:
-            s3 = boto3.client('s3')
-            bucket = os.environ.get('CACHE_BUCKET', f'vetroi-onet-cache-{boto3.client("sts").get_caller_identity()["Account"]}')
-            key = f"cache/{military_code}/{state}.json"
-            
-            response = s3.get_object(Bucket=bucket, Key=key)
-            return json.loads(response['Body'].read())
-            
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchKey':
-                return None
-            logger.error(f"Error reading cache: {e}")
-            return None
-    
-    def _cache_data(self, military_code: str, state: str, data: list):
-        """Cache O*NET data to S3"""
-        try:
-            s3 = boto3.client('s3')
-            bucket = os.environ.get('CACHE_BUCKET', f'vetroi-onet-cache-{boto3.client("sts").get_caller_identity()["Account"]}')
-            key = f"cache/{military_code}/{state}.json"
-            
-            cache_data = {
-                'military_code': military_code,
-                'state': state,
-                'careers': data,
-                'cached_at': datetime.utcnow().isoformat()
-            }
-            
-            s3.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=json.dumps(cache_data),
-                ContentType='application/json'
-            )
-            
-        except Exception as e:
-            logger.error(f"Error caching data: {e}")
-    
     def _get_fallback_careers(self, state: str) -> Dict[str, Any]:
         """Get fallback careers when O*NET is unavailable"""
         return {
@@ -0,0 +1,119 @@
+"""
+Warm-container O*NET connection state for the recommend Lambda
+
+Secrets Manager credentials and the urllib3 keep-alive pool live at module
+scope, so a warm container reuses them across invocations instead of paying a
+Secrets Manager round trip and a fresh TLS handshake on every request.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import urllib3
+
+from . import aws_clients
+from .stage_timing import timed_stage
+
+ONET_BASE_URL = os.environ.get('ONET_API_URL', 'https://services.onetcenter.org/ws')
+ONET_SECRET_NAME = os.environ.get('ONET_SECRET_NAME', 'ONET')
+CREDENTIAL_TTL_SECONDS = int(os.environ.get('ONET_CREDENTIAL_TTL_SECONDS', '3600'))
+POOL_MAXSIZE = int(os.environ.get('ONET_POOL_MAXSIZE', '10'))
+DEFAULT_TIMEOUT_SECONDS = 10.0
+
+
+class CredentialProvider:
+    """Caches the O*NET basic-auth header with a TTL and explicit invalidation"""
+
+    def __init__(self, secret_name: str, ttl_seconds: int, clock: Callable[[], float] = time.monotonic):
+        self.secret_name = secret_name
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._client = None
+        self._auth_header: Optional[str] = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_auth_header(self) -> str:
+        """Return the cached Authorization header, fetching the secret when expired"""
+        with self._lock:
+            if self._auth_header and self.clock() < self._expires_at:
+                self.hits += 1
+                return self._auth_header
+
+            self.misses += 1
+            self._auth_header = self._fetch_auth_header()
+            self._expires_at = self.clock() + self.ttl_seconds
+            return self._auth_header
+
+    def invalidate(self) -> None:
+        """Drop the cached header so the next call re-reads Secrets Manager"""
+        with self._lock:
+            self._auth_header = None
+            self._expires_at = 0.0
+            self.invalidations += 1
+
+    @timed_stage('Secrets')
+    def _fetch_auth_header(self) -> str:
+        if self._client is None:
+            self._client = aws_clients.client('secretsmanager')
+
+        response = self._client.get_secret_value(SecretId=self.secret_name)
+        secret = json.loads(response['SecretString'])
+
+        credentials = f"{secret['username']}:{secret['password']}"
+        return f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+
+credentials = CredentialProvider(ONET_SECRET_NAME, CREDENTIAL_TTL_SECONDS)
+
+# One keep-alive pool per container; urllib3 keeps up to POOL_MAXSIZE idle
+# connections per host so warm invocations skip the TLS handshake.
+http = urllib3.PoolManager(maxsize=POOL_MAXSIZE, block=False)
+
+
+@timed_stage('ONet')
+def onet_get(path: str, fields: Optional[Dict[str, Any]] = None,
+             timeout: float = DEFAULT_TIMEOUT_SECONDS) -> urllib3.BaseHTTPResponse:
+    """
+    GET an O*NET Web Services path using the cached credentials and shared pool
+
+    A 401 means the secret was rotated under us, so the cached header is
+    invalidated and the request retried once with freshly fetched credentials.
+    """
+    url = f"{ONET_BASE_URL}{path}"
+
+    for attempt in range(2):
+        headers = {
+            'Accept': 'application/json',
+            'User-Agent': 'VetROI/1.0',
+            'Authorization': credentials.get_auth_header()
+        }
+
+        response = http.request('GET', url, fields=fields, headers=headers, timeout=timeout)
+
+        if response.status != 401 or attempt > 0:
+            return response
+
+        print("O*NET returned 401, refreshing cached credentials")
+        credentials.invalidate()
+
+    return response
+
+
+def connection_stats() -> Dict[str, int]:
+    """Credential cache and connection pool counters for this container"""
+    pool = http.connection_from_url(ONET_BASE_URL)
+    return {
+        'credential_hits': credentials.hits,
+        'credential_misses': credentials.misses,
+        'credential_invalidations': credentials.invalidations,
+        'pool_requests': pool.num_requests,
+        'pool_connections_opened': pool.num_connections
+    }
@@ -0,0 +1,147 @@
+"""
+Field projection for recommend and career-detail responses
+
+A projection is a comma-separated list of dotted paths, e.g.
+
+    session_id,onet_careers.match.occupations.occupation.code
+
+Lists are traversed transparently, so a path selects the field from every
+element, and `*` matches any key of a mapping (career_reports keyed by SOC).
+Specs are compiled once into nested selector closures and cached; applying one
+builds a pruned copy before json.dumps, so unrequested fields are never
+serialized. Named presets cover the frontend's list and summary views.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+_SEGMENT_RE = re.compile(r"^(\*|[A-Za-z0-9_\-]+)$")
+
+# Everything below a selected node is kept
+ALL = True
+
+PRESETS = {
+    # Career list: MOS title plus code/title/tags for each matched occupation
+    'list': (
+        'session_id,timestamp,onet_careers.keyword,onet_careers.total,'
+        'onet_careers.match.code,onet_careers.match.title,'
+        'onet_careers.match.occupations.occupation.code,'
+        'onet_careers.match.occupations.occupation.title,'
+        'onet_careers.match.occupations.occupation.tags,'
+        'career_reports.*.code,career_reports.*.career.title,career_reports.*.career.tags,'
+        'career_reports.*.job_outlook.salary,career_report_errors,'
+        'wages.*.median,wages.*.p25,wages.*.p75,'
+        'ranked_careers.soc,ranked_careers.score,ranked_careers.reasons'
+    ),
+    # Career card: what the job is, outlook and pay, typical education
+    'summary': (
+        'code,career.title,career.what_they_do,career.tags,'
+        'job_outlook.outlook,job_outlook.bright_outlook,job_outlook.salary,'
+        'education.education_usually_needed'
+    ),
+}
+
+
+Selector = Callable[[Any], Any]
+
+
+class Projection:
+    """Selector tree ({key: subtree or ALL}) compiled into nested closures"""
+
+    __slots__ = ('spec', 'tree', '_select')
+
+    def __init__(self, spec: str, tree: Dict[str, Any]):
+        self.spec = spec
+        self.tree = tree
+        self._select = _compile_tree(tree)
+
+    def apply(self, data: Any) -> Any:
+        return self._select(data)
+
+
+def _compile_tree(tree: Any) -> Optional[Selector]:
+    """None means keep the whole value"""
+    if tree is ALL:
+        return None
+
+    if '*' in tree:
+        child = _compile_tree(tree['*'])
+
+        def select(data: Any) -> Any:
+            if isinstance(data, list):
+                return [select(item) for item in data]
+            if not isinstance(data, dict) or child is None:
+                return data
+            return {key: child(value) for key, value in data.items()}
+
+        return select
+
+    children = [(key, _compile_tree(subtree)) for key, subtree in tree.items()]
+
+    def select(data: Any) -> Any:
+        if isinstance(data, list):
+            return [select(item) for item in data]
+        if not isinstance(data, dict):
+            return data
+        selected = {}
+        for key, child in children:
+            if key in data:
+                value = data[key]
+                selected[key] = value if child is None else child(value)
+        return selected
+
+    return select
+
+
+@lru_cache(maxsize=64)
+def compile_projection(spec: str) -> Projection:
+    """Compile a preset name or comma-separated path list; raises ValueError on bad paths"""
+    paths = PRESETS.get(spec, spec)
+
+    tree: Dict[str, Any] = {}
+    for path in filter(None, (part.strip() for part in paths.split(','))):
+        segments = path.split('.')
+        for segment in segments:
+            if not _SEGMENT_RE.match(segment):
+                raise ValueError(f'Invalid field path: {path}')
+
+        node = tree
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if child is ALL:
+                break
+            node = node.setdefault(segment, {})
+        else:
+            node[segments[-1]] = ALL
+
+    if not tree:
+        raise ValueError('fields must name at least one field')
+
+    # A wildcard cannot be combined with named keys at the same level
+    _check_wildcards(tree, spec)
+    return Projection(spec, tree)
+
+
+def _check_wildcards(tree: Dict[str, Any], spec: str) -> None:
+    if '*' in tree and len(tree) > 1:
+        raise ValueError(f"'*' cannot be mixed with named fields at the same level: {spec}")
+    for subtree in tree.values():
+        if subtree is not ALL:
+            _check_wildcards(subtree, spec)
+
+
+def fields_spec(fields: Any) -> Optional[str]:
+    """Spec string from a request's fields value (string or list of strings); raises ValueError on other types"""
+    if fields is None or isinstance(fields, str):
+        return fields
+    if isinstance(fields, list) and all(isinstance(path, str) for path in fields):
+        return ','.join(fields)
+    raise ValueError('fields must be a string or a list of strings')
+
+
+def project(data: Any, fields: Optional[str]) -> Any:
+    """Apply the projection named or listed in fields; no fields returns data unchanged"""
+    if not fields:
+        return data
+    return compile_projection(fields).apply(data)
@@ -0,0 +1,70 @@
+"""
+Bedrock Converse prompt caching for Sentra
+
+The system prompt is sent as a static block that is identical for every
+veteran, then a cache point, then the per-veteran block. With a cache point
+after the previous turns as well, a multi-turn session re-reads both prefixes
+from Bedrock's cache instead of re-processing them.
+
+Cache points are only added for models that accept them; Bedrock rejects
+the block otherwise. A prefix shorter than the model's minimum (1,024 tokens
+for Claude) is processed normally and simply reports no cache reads.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+CACHE_POINT = {'cachePoint': {'type': 'default'}}
+
+# Model ID fragments with Converse prompt caching
+CACHING_MODELS = (
+    'anthropic.claude-3-5-haiku',
+    'anthropic.claude-3-7-sonnet',
+    'anthropic.claude-sonnet-4',
+    'anthropic.claude-opus-4',
+    'amazon.nova-micro',
+    'amazon.nova-lite',
+    'amazon.nova-pro',
+)
+
+
+def supports_caching(model_id: str) -> bool:
+    return any(fragment in model_id for fragment in CACHING_MODELS)
+
+
+def system_blocks(static_prefix: str, dynamic_suffix: str, model_id: str) -> List[Dict[str, Any]]:
+    """Converse system blocks: static prefix, cache point when supported, dynamic suffix"""
+    blocks: List[Dict[str, Any]] = [{'text': static_prefix}]
+    if supports_caching(model_id):
+        blocks.append(CACHE_POINT)
+    if dynamic_suffix:
+        blocks.append({'text': dynamic_suffix})
+    return blocks
+
+
+def mark_history_cache_point(messages: List[Dict[str, Any]], model_id: str) -> List[Dict[str, Any]]:
+    """Add a cache point after the last prior turn so the next message reuses system + history"""
+    if messages and supports_caching(model_id):
+        last = messages[-1]
+        messages[-1] = {**last, 'content': [*last['content'], CACHE_POINT]}
+    return messages
+
+
+def log_cache_usage(usage: Dict[str, Any], route: str, stop_reason: Optional[str] = None,
+                    prompt_features: Optional[Sequence[int]] = None) -> None:
+    """
+    One structured log line per Bedrock call with token and cache counts
+
+    prompt_features (see token_budget.token_features) lets the token
+    estimator be recalibrated from these lines without logging prompt text.
+    """
+    print(json.dumps({
+        'event': 'bedrock_usage',
+        'route': route,
+        'inputTokens': usage.get('inputTokens'),
+        'outputTokens': usage.get('outputTokens'),
+        'cacheReadInputTokens': usage.get('cacheReadInputTokens', 0),
+        'cacheWriteInputTokens': usage.get('cacheWriteInputTokens', 0),
+        'stopReason': stop_reason,
+        'promptFeatures': list(prompt_features) if prompt_features is not None else None
+    }))
@@ -0,0 +1,82 @@
+"""
+Concurrent prefetch of O*NET career reports for a crosswalk result
+
+Lets /recommend embed the top-N `/mnm/careers/{soc}/report` payloads in its
+response, so total latency is close to the slowest single report instead of
+the sum of the frontend's sequential /career/{soc} round trips.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+PREFETCH_WORKERS = int(os.environ.get('REPORT_PREFETCH_WORKERS', '8'))
+MAX_PREFETCH_REPORTS = int(os.environ.get('MAX_PREFETCH_REPORTS', '10'))
+# Upper bound on SOC codes priced and ranked per crosswalk; O*NET returns far fewer
+MAX_CAREER_CANDIDATES = 200
+
+# Shared across warm invocations; sized to the O*NET keep-alive pool
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='report-prefetch')
+
+
+def _occupations(crosswalk: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    # /veterans/military lists careers at the top level
+    yield from crosswalk.get('career', [])
+    # /online/crosswalks/military nests them under each military match
+    for match in crosswalk.get('match', []):
+        yield from match.get('occupations', {}).get('occupation', [])
+
+
+def career_soc_codes(crosswalk: Dict[str, Any], limit: int) -> List[str]:
+    """
+    Distinct SOC codes from a crosswalk response, in the order O*NET ranked them
+
+    Accepts both the `/veterans/military` shape (`career[]`) and the
+    `/online/crosswalks/military` shape (`match[].occupations.occupation[]`).
+    """
+    codes: List[str] = []
+    for occupation in _occupations(crosswalk):
+        code = occupation.get('code')
+        if code and code not in codes:
+            codes.append(code)
+            if len(codes) >= limit:
+                break
+    return codes
+
+
+def prefetch_reports(soc_codes: List[str], fetch: Callable[[str], Dict[str, Any]],
+                     deadline_seconds: float) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Fetch reports concurrently with partial-result semantics
+
+    Args:
+        soc_codes: SOC codes to fetch
+        fetch: Returns the report for one SOC code, raising on failure
+        deadline_seconds: Overall budget; reports not done by then are skipped
+
+    Returns:
+        (reports by SOC code, error reason by SOC code)
+    """
+    started = time.perf_counter()
+    futures = {_executor.submit(fetch, soc_code): soc_code for soc_code in soc_codes}
+    done, pending = wait(futures, timeout=deadline_seconds)
+
+    reports: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    for future in done:
+        soc_code = futures[future]
+        try:
+            reports[soc_code] = future.result()
+        except Exception as e:
+            errors[soc_code] = str(e)
+
+    for future in pending:
+        # Already-running fetches finish in the background; their results are dropped
+        future.cancel()
+        errors[futures[future]] = 'timeout'
+
+    print(f"Prefetched {len(reports)}/{len(soc_codes)} career reports in "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms")
+    return reports, errors
@@ -0,0 +1,93 @@
+"""
+Method + path router for the recommend Lambda
+
+Route patterns are compiled once at import and matched against the end of the
+request path, so the same table serves REST API events (`path` without the
+stage) and HTTP API events (`rawPath`, possibly with a stage prefix).
+"""
+
+import base64
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Handler = Callable[['Request', Any], Dict[str, Any]]
+
+_PARAM_RE = re.compile(r"\{(\w+)\}")
+
+
+class Request:
+    """Normalized view of an API Gateway v1 or v2 proxy event; the body is parsed at most once"""
+
+    __slots__ = ('event', 'method', 'path', 'query', 'headers', 'path_params', 'route', '_body')
+
+    def __init__(self, event: Dict[str, Any]):
+        request_context = event.get('requestContext') or {}
+
+        self.event = event
+        self.method = (
+            event.get('httpMethod') or
+            request_context.get('http', {}).get('method') or
+            request_context.get('httpMethod') or
+            ''
+        ).upper()
+        self.path = event.get('path') or event.get('rawPath') or ''
+        self.query = event.get('queryStringParameters') or {}
+        self.headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+        self.path_params = dict(event.get('pathParameters') or {})
+        self.route = None   # 'METHOD /pattern' once dispatched
+        self._body = None
+
+    @property
+    def body(self) -> Dict[str, Any]:
+        """JSON body as a dict; raises ValueError when it is not valid JSON"""
+        if self._body is None:
+            raw = self.event.get('body') or '{}'
+            if self.event.get('isBase64Encoded'):
+                raw = base64.b64decode(raw)
+            try:
+                parsed = json.loads(raw)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f'Invalid JSON body: {e}')
+            self._body = parsed if isinstance(parsed, dict) else {}
+        return self._body
+
+
+def compile_pattern(pattern: str) -> 're.Pattern[str]':
+    """'/career/{soc}' -> regex matching '.../career/<soc>' with an optional trailing slash"""
+    parts = []
+    last = 0
+    stripped = pattern.strip('/')
+    for match in _PARAM_RE.finditer(stripped):
+        parts.append(re.escape(stripped[last:match.start()]))
+        parts.append(f"(?P<{match.group(1)}>[^/]+)")
+        last = match.end()
+    parts.append(re.escape(stripped[last:]))
+    return re.compile(f"(?:^|/){''.join(parts)}/?$")
+
+
+class Router:
+    """Dispatches requests to the first route registered for the method whose pattern matches"""
+
+    def __init__(self, default: Optional[Handler] = None):
+        self.default = default
+        self._routes: Dict[str, List[Tuple['re.Pattern[str]', Handler, str]]] = {}
+
+    def add(self, method: str, pattern: str, handler: Handler) -> None:
+        method = method.upper()
+        self._routes.setdefault(method, []).append((compile_pattern(pattern), handler, f'{method} {pattern}'))
+
+    def dispatch(self, request: Request, context: Any) -> Dict[str, Any]:
+        """Call the matching handler; LookupError if nothing matches and there is no default"""
+        handler, params, request.route = self._match(request.method, request.path)
+        if handler is None:
+            raise LookupError(f'No route for {request.method} {request.path}')
+        request.path_params.update(params)
+        return handler(request, context)
+
+    def _match(self, method: str, path: str) -> Tuple[Optional[Handler], Dict[str, str], str]:
+        for regex, handler, name in self._routes.get(method, ()):
+            match = regex.search(path)
+            if match:
+                return handler, match.groupdict(), name
+        return self.default, {}, 'default'
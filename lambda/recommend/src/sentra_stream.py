@@ -0,0 +1,148 @@
+"""
+Token streaming for Sentra replies via Bedrock converse_stream
+
+Text deltas are forwarded to a sink as they arrive. The Python managed
+runtime cannot stream an HTTP response body, so there are two sinks:
+
+- WebSocketSink posts deltas to an API Gateway WebSocket connection
+  (SENTRA_WEBSOCKET_ENDPOINT plus the client's connectionId); the client
+  sees tokens as they are generated.
+- NDJSONSink collects the same events as newline-delimited JSON for the
+  HTTP route, so the client-side protocol does not depend on the transport.
+
+The WebSocket sink is dormant: no deployed template defines a Sentra
+WebSocket API, sets SENTRA_WEBSOCKET_ENDPOINT or grants
+execute-api:ManageConnections, so every reply currently goes out as NDJSON.
+Enabling it takes all three, the endpoint being the API's
+https://{api-id}.execute-api.{region}.amazonaws.com/{stage} callback URL.
+
+Time to first token is emitted as a CloudWatch embedded-metric log line.
+"""
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from . import aws_clients
+
+SENTRA_WEBSOCKET_ENDPOINT = os.environ.get('SENTRA_WEBSOCKET_ENDPOINT')
+METRICS_NAMESPACE = os.environ.get('POWERTOOLS_METRICS_NAMESPACE', 'VetROI')
+
+# WebSocket frames are batched to this many characters to bound post_to_connection calls
+WEBSOCKET_FLUSH_CHARS = 64
+
+
+class StreamResult:
+    """Assembled reply plus timing and usage reported by Bedrock"""
+
+    __slots__ = ('text', 'stop_reason', 'usage', 'ttft_ms', 'total_ms')
+
+    def __init__(self, text: str, stop_reason: Optional[str], usage: Dict[str, int],
+                 ttft_ms: Optional[float], total_ms: float):
+        self.text = text
+        self.stop_reason = stop_reason
+        self.usage = usage
+        self.ttft_ms = ttft_ms
+        self.total_ms = total_ms
+
+
+class NDJSONSink:
+    """Buffers stream events as newline-delimited JSON"""
+
+    content_type = 'application/x-ndjson'
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def send(self, event: Dict[str, Any]) -> None:
+        self.lines.append(json.dumps(event))
+
+    def close(self) -> None:
+        pass
+
+    def body(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+
+class WebSocketSink:
+    """Posts stream events to one API Gateway WebSocket connection, coalescing small deltas"""
+
+    def __init__(self, connection_id: str, endpoint_url: str = SENTRA_WEBSOCKET_ENDPOINT,
+                 flush_chars: int = WEBSOCKET_FLUSH_CHARS):
+        self.connection_id = connection_id
+        self.flush_chars = flush_chars
+        self._client = aws_clients.client('apigatewaymanagementapi', endpoint_url=endpoint_url)
+        self._pending = ''
+        self.posts = 0
+
+    def send(self, event: Dict[str, Any]) -> None:
+        if event['type'] == 'delta':
+            self._pending += event['text']
+            if len(self._pending) >= self.flush_chars:
+                self._flush()
+            return
+
+        self._flush()
+        self._post(event)
+
+    def close(self) -> None:
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            text, self._pending = self._pending, ''
+            self._post({'type': 'delta', 'text': text})
+
+    def _post(self, event: Dict[str, Any]) -> None:
+        self._client.post_to_connection(ConnectionId=self.connection_id, Data=json.dumps(event).encode('utf-8'))
+        self.posts += 1
+
+
+def stream_reply(bedrock_client: Any, send: Callable[[Dict[str, Any]], None], **converse_args: Any) -> StreamResult:
+    """Run converse_stream, forwarding each text delta to send() and assembling the full reply"""
+    started = time.perf_counter()
+    response = bedrock_client.converse_stream(**converse_args)
+
+    parts = []
+    ttft_ms = None
+    stop_reason = None
+    usage: Dict[str, int] = {}
+
+    for event in response['stream']:
+        if 'contentBlockDelta' in event:
+            text = event['contentBlockDelta'].get('delta', {}).get('text')
+            if text:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                parts.append(text)
+                send({'type': 'delta', 'text': text})
+        elif 'messageStop' in event:
+            stop_reason = event['messageStop'].get('stopReason')
+        elif 'metadata' in event:
+            usage = event['metadata'].get('usage', {})
+
+    return StreamResult(''.join(parts), stop_reason, usage, ttft_ms, (time.perf_counter() - started) * 1000)
+
+
+def emit_stream_metrics(result: StreamResult, transport: str) -> None:
+    """CloudWatch embedded metric format: one log line, no API call"""
+    metrics = [{'Name': 'SentraStreamDuration', 'Unit': 'Milliseconds'}]
+    values = {'SentraStreamDuration': round(result.total_ms, 1)}
+    if result.ttft_ms is not None:
+        metrics.append({'Name': 'SentraTimeToFirstToken', 'Unit': 'Milliseconds'})
+        values['SentraTimeToFirstToken'] = round(result.ttft_ms, 1)
+
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Transport']],
+                'Metrics': metrics
+            }]
+        },
+        'Transport': transport,
+        'OutputTokens': result.usage.get('outputTokens'),
+        **values
+    }))
@@ -0,0 +1,154 @@
+"""
+Session persistence for the recommend Lambda
+
+Many sessions share the same crosswalk, so the O*NET payload is stored once
+under the SHA-256 of its canonical JSON, zlib-compressed, in S3
+(SESSION_BLOB_BUCKET). Session items keep only the profile and that hash.
+Without a bucket the compressed blob is kept inline on the item instead,
+which still keeps items far from the 400 KB limit.
+
+Writes run on a small background pool so they overlap with the rest of the
+request; the handler flushes the pool before returning, because a frozen
+container would otherwise drop them.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import aws_clients
+
+SESSION_BLOB_BUCKET = os.environ.get('SESSION_BLOB_BUCKET')
+SESSION_BLOB_PREFIX = os.environ.get('SESSION_BLOB_PREFIX', 'crosswalks/')
+
+
+def encode_crosswalk(onet_data: Dict[str, Any]) -> Tuple[str, bytes]:
+    """(sha256 of the canonical JSON, zlib-compressed JSON)"""
+    canonical = json.dumps(onet_data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(canonical).hexdigest(), zlib.compress(canonical, 6)
+
+
+def decode_crosswalk(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+class CrosswalkBlobStore:
+    """Content-addressed crosswalk blobs in S3; each hash is uploaded at most once per container"""
+
+    def __init__(self, bucket: str, prefix: str = SESSION_BLOB_PREFIX):
+        self.bucket = bucket
+        self.prefix = prefix
+        self._written = set()
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.skipped = 0
+
+    def key(self, digest: str) -> str:
+        return f"{self.prefix}{digest}.json.zz"
+
+    def put(self, digest: str, blob: bytes) -> None:
+        with self._lock:
+            if digest in self._written:
+                self.skipped += 1
+                return
+
+        # Same hash, same bytes: a concurrent duplicate upload is harmless
+        aws_clients.client('s3').put_object(
+            Bucket=self.bucket,
+            Key=self.key(digest),
+            Body=blob,
+            ContentType='application/json',
+            ContentEncoding='deflate'
+        )
+
+        with self._lock:
+            self._written.add(digest)
+            self.uploads += 1
+
+    def get(self, digest: str) -> Dict[str, Any]:
+        response = aws_clients.client('s3').get_object(Bucket=self.bucket, Key=self.key(digest))
+        return decode_crosswalk(response['Body'].read())
+
+
+blob_store = CrosswalkBlobStore(SESSION_BLOB_BUCKET) if SESSION_BLOB_BUCKET else None
+
+
+def session_item(session_id: str, timestamp: int, profile: Dict[str, Any],
+                 onet_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the session item, uploading the crosswalk blob first so the reference never dangles"""
+    digest, blob = encode_crosswalk(onet_data)
+
+    item = {
+        'session_id': session_id,
+        'timestamp': timestamp,
+        'veteran_profile': profile,
+        'onet_careers_hash': digest
+    }
+
+    if blob_store is not None:
+        blob_store.put(digest, blob)
+        item['onet_careers_ref'] = f"s3://{blob_store.bucket}/{blob_store.key(digest)}"
+    else:
+        item['onet_careers_blob'] = blob
+
+    return item
+
+
+def load_crosswalk(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Crosswalk for a session item in any of its stored shapes (legacy inline JSON included)"""
+    if 'onet_careers' in item:
+        return item['onet_careers']
+
+    if 'onet_careers_blob' in item:
+        blob = item['onet_careers_blob']
+        # boto3 returns DynamoDB binary attributes wrapped in Binary
+        return decode_crosswalk(getattr(blob, 'value', blob))
+
+    if 'onet_careers_hash' in item and blob_store is not None:
+        return blob_store.get(item['onet_careers_hash'])
+
+    return {}
+
+
+class BackgroundWriter:
+    """Runs writes off the request path and waits for them before the invocation ends"""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='session-write')
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        # Run in a copy of the caller's context so the write is timed on its request
+        future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        with self._lock:
+            # Writers that are never flushed would otherwise hold every finished future
+            self._pending = [pending for pending in self._pending if not pending.done()]
+            self._pending.append(future)
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        """Wait for submitted writes; returns how many were still unfinished at the timeout"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        _, not_done = wait(pending, timeout=timeout)
+
+        if not_done:
+            with self._lock:
+                self._pending.extend(not_done)
+        return len(not_done)
+
+
+session_writes = BackgroundWriter()
+
+# Rolling-summary folds make a model call, so requests never flush this writer:
+# a fold still running at return finishes when the container next thaws, or is
+# lost with it and retried by the next message. One worker keeps a conversation's
+# folds in order within a container.
+summary_folds = BackgroundWriter(max_workers=1)
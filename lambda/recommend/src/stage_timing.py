@@ -0,0 +1,145 @@
+"""
+Per-stage latency for the recommend Lambda as CloudWatch embedded metrics
+
+Each invocation runs inside `request_timer(route)`. Within it, the
+`stage(name)` context manager or the `@timed_stage(name)` decorator records how
+long a step took. When the request ends, one EMF log line is printed with a
+`<Stage>Duration` metric per stage plus `RequestDuration`. A stage that ran
+more than once, such as one per prefetched report, reports a list of values.
+The line is dimensioned by Route, CacheHit and ColdStart.
+
+CloudWatch computes percentiles from the raw values, so nothing is aggregated
+in the Lambda and no API call is made.
+
+The active timer is held in a context variable. Work submitted through
+session_writes copies the context, so background stages finished by the time
+the request ends are recorded too. Building the EMF line closes the timer:
+a background stage still running then (a session write past its flush
+timeout) is not reported. Outside a request timer (tests, scripts), stages
+record nothing.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+METRICS_NAMESPACE = os.environ.get('POWERTOOLS_METRICS_NAMESPACE', 'VetROI')
+
+# Full breakdown, plus a per-route rollup across cache and cold-start states
+DIMENSIONS = [['Route', 'CacheHit', 'ColdStart'], ['Route']]
+
+_current: contextvars.ContextVar[Optional['RequestTimer']] = contextvars.ContextVar('stage_timer', default=None)
+_cold_start = True
+
+
+class RequestTimer:
+    """Stage durations (ms) for one invocation"""
+
+    __slots__ = ('route', 'cache_hit', 'cold_start', 'started', 'stages', 'closed', '_lock')
+
+    def __init__(self, route: str, cold_start: bool):
+        self.route = route
+        self.cache_hit: Optional[bool] = None
+        self.cold_start = cold_start
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Add one duration; ignored once the EMF line has been built"""
+        with self._lock:
+            if not self.closed:
+                self.stages.setdefault(name, []).append(round(duration_ms, 3))
+
+    def emf(self) -> Dict[str, Any]:
+        """The EMF log line for the stages recorded so far; closes the timer"""
+        with self._lock:
+            self.closed = True
+            values: Dict[str, Any] = {
+                f'{name}Duration': durations[0] if len(durations) == 1 else durations
+                for name, durations in self.stages.items()
+            }
+        values['RequestDuration'] = round((time.perf_counter() - self.started) * 1000, 3)
+
+        return {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': DIMENSIONS,
+                    'Metrics': [{'Name': name, 'Unit': 'Milliseconds'} for name in values]
+                }]
+            },
+            'Route': self.route,
+            'CacheHit': 'none' if self.cache_hit is None else str(self.cache_hit).lower(),
+            'ColdStart': str(self.cold_start).lower(),
+            **values
+        }
+
+
+@contextmanager
+def request_timer(route: str) -> Iterator[RequestTimer]:
+    """Time one invocation and print its EMF line when it ends, including on error"""
+    global _cold_start
+    timer = RequestTimer(route, _cold_start)
+    _cold_start = False
+
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        # Metrics must never replace the request's own response or exception
+        try:
+            print(json.dumps(timer.emf()))
+        except Exception as e:
+            print(f"Stage timing EMF failed: {e}")
+
+
+class stage:
+    """`with stage('Wages'):` records the block's duration on the current request"""
+
+    __slots__ = ('name', 'timer', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> 'stage':
+        self.timer = _current.get()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        if self.timer is not None:
+            self.timer.record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def timed_stage(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of `stage`; every call is recorded under name"""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timer = _current.get()
+            if timer is None:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.record(name, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorate
+
+
+def set_cache_hit(hit: bool) -> None:
+    """Mark whether the request's main lookup was served from a cache"""
+    timer = _current.get()
+    if timer is not None:
+        timer.cache_hit = hit
@@ -0,0 +1,295 @@
+"""
+Columnar BLS OES wage table shipped with the deployment package
+
+Annual wages for every detailed SOC code × state (plus `US` national) are
+stored as one dense int32 matrix in a single file, memory-mapped on load.
+A lookup is two dict probes and one struct unpack from the mapping; only pages
+actually read become resident, so the table costs almost nothing on a cold
+start however many occupations it covers.
+
+Build it offline from the BLS OES "all data" flat files, exported to CSV
+(national and state files can be passed together):
+
+    python -m src.wage_table build oes_national.csv oes_state.csv --output data/wage_table.bin
+
+File layout: 8-byte magic, uint32 header length, JSON header (columns, SOC
+codes, areas, byte order, build metadata), padding to 8 bytes, then the
+matrix in row-major (soc, area, column) order. 0 marks a suppressed value.
+"""
+
+import argparse
+import array
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+DEFAULT_TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'wage_table.bin'
+)
+NATIONAL = 'US'
+MAGIC = b'VWAGES01'
+_PREFIX = struct.Struct('<8sI')
+
+# BLS publishes wages at or above this as '#'; stored as the cap itself
+TOP_CODED_ANNUAL = 239_200
+
+# CSV column per field, as named in the OES flat files
+SOURCE_COLUMNS = {
+    'employment': 'TOT_EMP',
+    'mean': 'A_MEAN',
+    'p10': 'A_PCT10',
+    'p25': 'A_PCT25',
+    'median': 'A_MEDIAN',
+    'p75': 'A_PCT75',
+    'p90': 'A_PCT90',
+}
+
+
+class Wages(NamedTuple):
+    employment: Optional[int]
+    mean: Optional[int]
+    p10: Optional[int]
+    p25: Optional[int]
+    median: Optional[int]
+    p75: Optional[int]
+    p90: Optional[int]
+
+
+COLUMNS = Wages._fields
+
+# Wages._make without its length check; rows always have len(COLUMNS) values
+_new_wages = tuple.__new__
+
+
+def normalize_soc(soc_code: str) -> str:
+    """BLS SOC for an O*NET-SOC code: 29-2042.00 and 29-2042.01 both map to 29-2042"""
+    return soc_code.strip()[:7]
+
+
+class WageTable:
+    """Read-only lookups against a memory-mapped wage table file"""
+
+    def __init__(self, path: str):
+        started = time.perf_counter()
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a wage table")
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_length])
+        if header['byteorder'] != sys.byteorder or tuple(header['columns']) != COLUMNS:
+            raise ValueError(f"{path} was built for a different byte order or column set")
+
+        self.metadata = header['metadata']
+        self.socs: List[str] = header['socs']
+        self.areas: List[str] = header['areas']
+        self._soc_rows = {soc: i * len(self.areas) for i, soc in enumerate(self.socs)}
+        self._area_index = {area: j for j, area in enumerate(self.areas)}
+        self._width = len(COLUMNS)
+        self._data_offset = _data_offset(header_length)
+        self._unpack_row = struct.Struct(f'={len(COLUMNS)}i').unpack_from
+
+        self.load_ms = (time.perf_counter() - started) * 1000
+
+    def lookup(self, soc_code: str, area: str = NATIONAL) -> Optional[Wages]:
+        """Wages for one SOC code in a state (postal code) or `US`; None if not published"""
+        row = self._soc_rows.get(normalize_soc(soc_code))
+        column = self._area_index.get(area)
+        if row is None or column is None:
+            return None
+        return self._wages((row + column) * self._width)
+
+    def lookup_many(self, soc_codes: Iterable[str], state: str,
+                    national_fallback: bool = True) -> Dict[str, Optional[Wages]]:
+        """
+        Wages for every SOC code in one pass, keyed by the code as given
+
+        With national_fallback, codes the state does not publish (suppressed or
+        absent) get the national figures instead.
+        """
+        soc_rows = self._soc_rows
+        state_column = self._area_index.get(state)
+        national_column = self._area_index.get(NATIONAL) if national_fallback else None
+
+        results: Dict[str, Optional[Wages]] = {}
+        for soc_code in soc_codes:
+            row = soc_rows.get(normalize_soc(soc_code))
+            wages = None
+            if row is not None:
+                if state_column is not None:
+                    wages = self._wages((row + state_column) * self._width)
+                if (wages is None or wages.median is None) and national_column is not None:
+                    wages = self._wages((row + national_column) * self._width) or wages
+            results[soc_code] = wages
+        return results
+
+    def area_column(self, area: str, column: str = 'median',
+                    national_fallback: bool = True) -> Dict[str, int]:
+        """One column for every SOC code in an area, keyed by BLS SOC; suppressed cells omitted"""
+        index = COLUMNS.index(column)
+        areas = [self._area_index.get(area)]
+        if national_fallback:
+            areas.append(self._area_index.get(NATIONAL))
+
+        values: Dict[str, int] = {}
+        for soc, row in self._soc_rows.items():
+            for area_column in areas:
+                if area_column is None:
+                    continue
+                value = self._unpack_row(self._mmap, self._data_offset + 4 * (row + area_column) * self._width)[index]
+                if value:
+                    values[soc] = value
+                    break
+        return values
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _wages(self, offset: int) -> Optional[Wages]:
+        values = self._unpack_row(self._mmap, self._data_offset + 4 * offset)
+        if all(values):
+            return _new_wages(Wages, values)
+        if not any(values):
+            return None
+        return _new_wages(Wages, [value or None for value in values])
+
+
+def wages_by_soc(table: Optional[WageTable], soc_codes: Iterable[str], state: str) -> Dict[str, Dict[str, Any]]:
+    """JSON-ready wages for the given SOC codes, omitting codes with no published data"""
+    if table is None:
+        return {}
+    return {
+        soc_code: wages._asdict()
+        for soc_code, wages in table.lookup_many(soc_codes, state).items()
+        if wages is not None
+    }
+
+
+def _data_offset(header_length: int) -> int:
+    return (_PREFIX.size + header_length + 7) // 8 * 8
+
+
+def load_table(path: Optional[str] = None) -> Optional[WageTable]:
+    """Open the shipped table, returning None when the package was built without one"""
+    path = path or os.environ.get('WAGE_TABLE_PATH', DEFAULT_TABLE_PATH)
+    if not os.path.exists(path):
+        print(f"Wage table not found at {path}, salaries unavailable")
+        return None
+
+    try:
+        table = WageTable(path)
+    except (OSError, ValueError) as e:
+        print(f"Failed to open wage table {path}: {e}")
+        return None
+
+    print(f"Loaded wage table {path} in {table.load_ms:.2f} ms "
+          f"({len(table.socs)} SOC codes x {len(table.areas)} areas, "
+          f"OES {table.metadata.get('source', 'unknown')})")
+    return table
+
+
+@lru_cache(maxsize=1)
+def get_wage_table() -> Optional[WageTable]:
+    """The shipped table, opened once per container"""
+    return load_table()
+
+
+def parse_wage(value: Optional[str]) -> int:
+    """OES cell to whole dollars; '*', '**' and blanks are suppressed (0), '#' is top-coded"""
+    value = (value or '').strip().replace(',', '')
+    if value == '#':
+        return TOP_CODED_ANNUAL
+    try:
+        return int(float(value))
+    except ValueError:
+        return 0
+
+
+def build_table(rows: Iterable[Dict[str, str]], output_path: str, source: str = '') -> Dict[str, int]:
+    """
+    Write a table file from OES flat-file rows
+
+    Only detailed occupations at national (AREA_TYPE 1) and state (AREA_TYPE 2)
+    level are kept; metro and nonmetro rows are skipped.
+    """
+    cells: Dict[tuple, Sequence[int]] = {}
+    for row in rows:
+        row = {key.upper(): value for key, value in row.items() if key}
+        if row.get('O_GROUP', 'detailed').strip().lower() != 'detailed':
+            continue
+        if row.get('AREA_TYPE', '').strip() not in ('1', '2'):
+            continue
+
+        soc = normalize_soc(row.get('OCC_CODE', ''))
+        area = row.get('PRIM_STATE', '').strip().upper()
+        if len(soc) != 7 or not area:
+            continue
+        cells[(soc, area)] = [parse_wage(row.get(SOURCE_COLUMNS[column])) for column in COLUMNS]
+
+    socs = sorted({soc for soc, _ in cells})
+    areas = [NATIONAL] + sorted({area for _, area in cells} - {NATIONAL})
+    area_index = {area: j for j, area in enumerate(areas)}
+    soc_index = {soc: i for i, soc in enumerate(socs)}
+
+    width = len(COLUMNS)
+    values = array.array('i', bytes(4 * len(socs) * len(areas) * width))
+    for (soc, area), cell in cells.items():
+        offset = (soc_index[soc] * len(areas) + area_index[area]) * width
+        values[offset:offset + width] = array.array('i', cell)
+
+    header = json.dumps({
+        'columns': list(COLUMNS),
+        'socs': socs,
+        'areas': areas,
+        'byteorder': sys.byteorder,
+        'metadata': {
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'source': source,
+            'top_coded_annual': TOP_CODED_ANNUAL
+        }
+    }, separators=(',', ':')).encode('utf-8')
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, len(header)))
+        f.write(header)
+        f.write(b'\0' * (_data_offset(len(header)) - _PREFIX.size - len(header)))
+        values.tofile(f)
+
+    return {'socs': len(socs), 'areas': len(areas), 'cells': len(cells)}
+
+
+def _read_csv(paths: Sequence[str]) -> Iterable[Dict[str, str]]:
+    for path in paths:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Build the BLS OES wage table')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    build = subcommands.add_parser('build', help='Build a table from OES flat files exported to CSV')
+    build.add_argument('csv_files', nargs='+', help='OES national and/or state CSV files')
+    build.add_argument('--output', default=DEFAULT_TABLE_PATH)
+    build.add_argument('--source', default='', help='Release recorded in the table, e.g. "May 2024"')
+
+    args = parser.parse_args(argv)
+
+    counts = build_table(_read_csv(args.csv_files), args.output, args.source)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"Wrote {counts['cells']} wage rows ({counts['socs']} SOC codes x {counts['areas']} areas) "
+          f"to {args.output} ({size_kb:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# lambda/shared is SharedLibrariesLayer, on the path at /opt/python when deployed
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+
+from test_onet_format import sample_onet_response  # noqa: E402
+
+
+class FakeONetServer:
+    """
+    Local stand-in for O*NET Web Services
+
+    Serves crosswalk and career report JSON on 127.0.0.1, counts requests per
+    path, and can inject latency or a queue of error statuses.
+    """
+
+    def __init__(self):
+        self.latency_seconds = 0.0
+        self.error_statuses = []
+        self.requests = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append(self.path)
+                    status = server.error_statuses.pop(0) if server.error_statuses else 200
+
+                if server.latency_seconds:
+                    time.sleep(server.latency_seconds)
+
+                body = json.dumps(server.payload_for(self.path) if status == 200 else {'error': status}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_port}/ws"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def payload_for(self, path):
+        if '/report' in path:
+            soc_code = path.split('/careers/')[1].split('/')[0]
+            return {'code': soc_code, 'career': {'title': f'Occupation {soc_code}'}}
+
+        return {
+            'keyword': '68W',
+            'total': 1,
+            'match': [{
+                'code': '68W',
+                'title': 'Combat Medic Specialist (Army - Enlisted)',
+                'occupations': {'occupation': [
+                    {'code': '29-2042.00', 'title': 'Emergency Medical Technicians'},
+                    {'code': '29-2061.00', 'title': 'Licensed Practical and Licensed Vocational Nurses'}
+                ]}
+            }]
+        }
+
+    def count(self, fragment):
+        with self._lock:
+            return sum(1 for path in self.requests if fragment in path)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def fake_onet():
+    server = FakeONetServer().start()
+    yield server
+    server.stop()
+
+
+class FakeConversationsTable:
+    """In-memory VetROI_Conversations supporting the key conditions the window loader uses"""
+
+    def __init__(self):
+        self.items = {}
+        self.queries = []
+
+    def put_item(self, Item):
+        self.items[(Item['conversation_id'], Item['timestamp'])] = dict(Item)
+
+    def get_item(self, Key):
+        item = self.items.get((Key['conversation_id'], Key['timestamp']))
+        return {'Item': item} if item else {}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues, ScanIndexForward=True,
+              Limit=None, ExclusiveStartKey=None, **kwargs):
+        self.queries.append(KeyConditionExpression)
+        values = ExpressionAttributeValues
+        low, high = values.get(':after', float('-inf')), values.get(':before', float('inf'))
+        inclusive = 'BETWEEN' in KeyConditionExpression
+
+        timestamps = sorted(
+            ts for cid, ts in self.items
+            if cid == values[':cid'] and (low <= ts <= high if inclusive else ts > low)
+        )
+        if not ScanIndexForward:
+            timestamps.reverse()
+        if ExclusiveStartKey:
+            timestamps = timestamps[timestamps.index(ExclusiveStartKey['timestamp']) + 1:]
+
+        page = timestamps[:Limit] if Limit else timestamps
+        response = {'Items': [self.items[(values[':cid'], ts)] for ts in page]}
+        if Limit and len(timestamps) > Limit:
+            response['LastEvaluatedKey'] = {'conversation_id': values[':cid'], 'timestamp': page[-1]}
+        return response
+
+    def batch_writer(self):
+        return self._BatchWriter(self)
+
+    class _BatchWriter:
+
+        def __init__(self, table):
+            self.table = table
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def put_item(self, Item):
+            self.table.put_item(Item)
+
+
+@pytest.fixture
+def conversations_table():
+    return FakeConversationsTable()
+
+
+
+@pytest.fixture
+def veterans_military_response():
+    """A real /veterans/military response: careers in a top-level career[] list"""
+    return copy.deepcopy(sample_onet_response)
@@ -0,0 +1,192 @@
+import io
+import json
+
+import pytest
+
+from src import bedrock_client
+from src.bedrock_client import (
+    PROMPT_VERSION, RECOMMENDATION_CACHE_TTL_SECONDS, BedrockClient, normalize_profile, profile_fingerprint,
+    recommendation_cache
+)
+from src.cache import S3CacheTier, TieredCache, TTLCache
+from src.models import VeteranRequest
+
+ONET_DATA = {'career': [{'code': '29-2042.00', 'title': 'Emergency Medical Technicians', 'match_type': 'most_duties',
+                         'preparation_needed': 'Medium-skill', 'tags': {'bright_outlook': True}}]}
+
+CAREERS = [{'title': 'Emergency Medical Technician', 'soc': '29-2042.00', 'summary': 'Respond to emergencies.',
+            'medianSalary': 41210, 'matchReason': 'Combat medic training', 'nextStep': 'Get NREMT certified'}]
+
+
+class FakeS3:
+    """In-memory S3 client supporting the calls S3CacheTier makes"""
+
+    class NoSuchKey(Exception):
+        response = {'Error': {'Code': 'NoSuchKey'}}
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.NoSuchKey(Key)
+        body, metadata = self.objects[Key]
+        return {'Body': io.BytesIO(body), 'Metadata': metadata}
+
+    def put_object(self, Bucket, Key, Body, Metadata, **kwargs):
+        self.objects[Key] = (Body, Metadata)
+
+
+class FakeClock:
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBedrockRuntime:
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def invoke_model(self, **kwargs):
+        self.calls.append(kwargs)
+        body = json.dumps({'content': [{'text': self.reply}]}).encode('utf-8')
+        return {'body': io.BytesIO(body)}
+
+
+def veteran(**overrides):
+    fields = {'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False, 'education': 'associate',
+              'skills': ['Triage', 'Leadership'], 'clearance': 'Secret'}
+    fields.update(overrides)
+    return VeteranRequest(**fields)
+
+
+def shared_tiers(s3, clock=None, fresh_seconds=3600):
+    """A container's tiers over the shared fake bucket, with the deployed local TTL"""
+    clock = clock or FakeClock()
+    return TieredCache(
+        'recommendations',
+        local=TTLCache(ttl_seconds=recommendation_cache.ttl_seconds, clock=clock),
+        shared=S3CacheTier(s3, 'cache-bucket', 'cache/recommendations/'),
+        fresh_seconds=fresh_seconds,
+        stale_seconds=fresh_seconds,
+        clock=clock
+    )
+
+
+@pytest.fixture
+def s3():
+    return FakeS3()
+
+
+@pytest.fixture
+def tiers(s3, monkeypatch):
+    tiers = shared_tiers(s3)
+    monkeypatch.setattr(bedrock_client, 'recommendation_tiers', lambda: tiers)
+    return tiers
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    return FakeBedrockRuntime(json.dumps(CAREERS))
+
+
+@pytest.fixture
+def client(runtime):
+    client = BedrockClient()
+    client.client = runtime
+    client.model_id = 'anthropic.claude-3-sonnet-20240229'
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    bedrock_client.metrics.clear_metrics()
+    yield
+    bedrock_client.metrics.clear_metrics()
+
+
+class TestProfileFingerprint:
+
+    def test_equivalent_profiles_share_a_fingerprint(self):
+        first = veteran(code='68w', skills=['Triage', 'Leadership', 'triage'])
+        second = veteran(code=' 68W', skills=['leadership', 'Triage'], relocateState='CA')
+
+        assert normalize_profile(first) == normalize_profile(second)
+        assert profile_fingerprint(first, 'onet') == profile_fingerprint(second, 'onet')
+
+    def test_prompt_inputs_change_the_fingerprint(self):
+        base = profile_fingerprint(veteran(), 'onet')
+
+        assert profile_fingerprint(veteran(relocate=True, relocateState='CA'), 'onet') != base
+        assert profile_fingerprint(veteran(education='bachelor'), 'onet') != base
+        assert profile_fingerprint(veteran(clearance=None), 'onet') != base
+        assert profile_fingerprint(veteran(), 'other onet data') != base
+
+
+class TestRecommendationCache:
+
+    def test_identical_profiles_call_bedrock_once(self, client, runtime, tiers):
+        first = client.generate_recommendations(veteran(), ONET_DATA)
+        second = client.generate_recommendations(veteran(skills=['leadership', 'triage']), ONET_DATA)
+
+        assert len(runtime.calls) == 1
+        assert first == second
+        assert second[0].median_salary == 41210
+        assert bedrock_client.metrics.metric_set['BedrockCallsAvoided']['Value'] == [1.0]
+        assert bedrock_client.metrics.metric_set['BedrockCacheMiss']['Value'] == [1.0]
+
+    def test_other_containers_read_the_shared_tier(self, client, runtime, s3, tiers, monkeypatch):
+        client.generate_recommendations(veteran(), ONET_DATA)
+        monkeypatch.setattr(bedrock_client, 'recommendation_tiers', lambda: shared_tiers(s3))
+
+        careers = client.generate_recommendations(veteran(), ONET_DATA)
+
+        assert len(runtime.calls) == 1
+        assert careers[0].soc == '29-2042.00'
+        [key] = s3.objects
+        assert key.startswith(f"cache/recommendations/{client.model_id}/v{PROMPT_VERSION}/")
+
+    def test_shared_hit_older_than_the_local_ttl_is_then_served_from_memory(self, client, runtime, s3,
+                                                                              monkeypatch):
+        clock = FakeClock()
+        warm = shared_tiers(s3, clock, RECOMMENDATION_CACHE_TTL_SECONDS)
+        monkeypatch.setattr(bedrock_client, 'recommendation_tiers', lambda: warm)
+        client.generate_recommendations(veteran(), ONET_DATA)
+
+        # A new container, two hours later: past the 1 h local TTL, well inside the S3 fresh window
+        clock.now += 2 * 3600
+        cold = shared_tiers(s3, clock, RECOMMENDATION_CACHE_TTL_SECONDS)
+        monkeypatch.setattr(bedrock_client, 'recommendation_tiers', lambda: cold)
+
+        client.generate_recommendations(veteran(), ONET_DATA)
+        assert cold.last_source == 'shared'
+        clock.now += 60
+        client.generate_recommendations(veteran(), ONET_DATA)
+
+        assert cold.last_source == 'local'
+        assert cold.counts['shared_hits'] == 1
+        assert len(runtime.calls) == 1
+
+    def test_model_and_onet_data_are_part_of_the_key(self, client, runtime, tiers):
+        client.generate_recommendations(veteran(), ONET_DATA)
+        client.generate_recommendations(veteran(), {'career': []})
+        client.model_id = 'anthropic.claude-3-haiku-20240307'
+        client.generate_recommendations(veteran(), ONET_DATA)
+
+        assert len(runtime.calls) == 3
+
+    def test_unparseable_answers_fall_back_and_are_not_cached(self, client, runtime, tiers):
+        runtime.reply = 'I cannot help with that.'
+
+        careers = client.generate_recommendations(veteran(), ONET_DATA)
+        client.generate_recommendations(veteran(), ONET_DATA)
+
+        assert len(careers) == 5
+        assert len(runtime.calls) == 2
+        assert len(tiers.local) == 0
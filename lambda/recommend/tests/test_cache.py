@@ -0,0 +1,200 @@
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.cache import DynamoDBCacheTier, TieredCache, TTLCache
+
+
+class FakeTable:
+    """In-memory stand-in for a boto3 DynamoDB Table"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key):
+        item = self.items.get(Key['cache_key'])
+        return {'Item': item} if item else {}
+
+    def put_item(self, Item):
+        self.items[Item['cache_key']] = Item
+
+
+class FakeClock:
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def shared_table():
+    return FakeTable()
+
+
+def build_cache(clock, table):
+    return TieredCache(
+        'test',
+        local=TTLCache(maxsize=2, ttl_seconds=60, clock=clock),
+        shared=DynamoDBCacheTier(table, retention_seconds=1000),
+        fresh_seconds=100,
+        stale_seconds=1000,
+        clock=clock
+    )
+
+
+def wait_for_refreshes(cache, count):
+    deadline = time.time() + 2
+    while cache.counts['refreshes'] < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestTieredCache:
+
+    def test_miss_loads_once_then_hits_local(self, clock, shared_table):
+        """A miss populates both tiers and the next read never calls the loader"""
+        cache = build_cache(clock, shared_table)
+        loader = Mock(return_value={'total': 3})
+
+        assert cache.get_or_load('11B#army', loader) == {'total': 3}
+        assert cache.get_or_load('11B#army', loader) == {'total': 3}
+
+        loader.assert_called_once()
+        assert '11B#army' in shared_table.items
+        assert cache.counts['misses'] == 1
+        assert cache.counts['local_hits'] == 1
+        assert cache.hit_ratio() == 0.5
+
+    def test_other_container_reads_shared_tier(self, clock, shared_table):
+        """A second container with a cold LRU is served from the shared tier"""
+        build_cache(clock, shared_table).get_or_load('68W#army', lambda: {'total': 25})
+
+        other = build_cache(clock, shared_table)
+        loader = Mock()
+
+        assert other.get_or_load('68W#army', loader) == {'total': 25}
+        loader.assert_not_called()
+        assert other.last_source == 'shared'
+
+    def test_shared_entry_older_than_local_ttl_is_kept_locally(self, clock, shared_table):
+        """A fresh shared entry older than the local TTL is still served from memory afterwards"""
+        build_cache(clock, shared_table).get_or_load('68W#army', lambda: {'total': 25})
+
+        clock.now += 80      # past the 60 s local TTL, inside the 100 s fresh window
+        other = build_cache(clock, shared_table)
+        assert other.get_or_load('68W#army', Mock()) == {'total': 25}
+        assert other.last_source == 'shared'
+
+        clock.now += 10
+        assert other.get_or_load('68W#army', Mock()) == {'total': 25}
+        assert other.last_source == 'local'
+        assert other.last_age_seconds == 90
+        assert other.counts['shared_hits'] == 1
+
+        clock.now += 15      # the shared entry is no longer fresh, so neither is the local copy
+        assert other.local.get('68W#army') is None
+
+    def test_stale_entry_served_while_refreshing(self, clock, shared_table):
+        """Entries past the fresh window are served immediately and refreshed in the background"""
+        build_cache(clock, shared_table).get_or_load('25B#army', lambda: {'version': 1})
+
+        clock.now += 500
+        other = build_cache(clock, shared_table)
+
+        assert other.get_or_load('25B#army', lambda: {'version': 2}) == {'version': 1}
+        assert other.last_source == 'stale'
+        assert other.last_age_seconds == 500
+
+        wait_for_refreshes(other, 1)
+        assert other.get_or_load('25B#army', Mock()) == {'version': 2}
+
+    def test_expired_entry_reloads_synchronously(self, clock, shared_table):
+        """Entries past the stale window are treated as misses"""
+        build_cache(clock, shared_table).get_or_load('0311#marine_corps', lambda: {'version': 1})
+
+        clock.now += 5000
+        other = build_cache(clock, shared_table)
+
+        assert other.get_or_load('0311#marine_corps', lambda: {'version': 2}) == {'version': 2}
+        assert other.counts['misses'] == 1
+
+    def test_uncacheable_results_are_not_stored(self, clock, shared_table):
+        """Error fallbacks are returned but never cached"""
+        cache = build_cache(clock, shared_table)
+        loader = Mock(return_value={'total': 0, 'error': 'timeout'})
+
+        cache.get_or_load('IT#navy', loader, cacheable=lambda result: 'error' not in result)
+        cache.get_or_load('IT#navy', loader, cacheable=lambda result: 'error' not in result)
+
+        assert loader.call_count == 2
+        assert shared_table.items == {}
+
+    def test_shared_tier_failure_falls_back_to_loader(self, clock):
+        """A broken shared tier degrades to the local LRU instead of failing the request"""
+        broken = Mock()
+        broken.get.side_effect = Exception('throttled')
+        broken.put.side_effect = Exception('throttled')
+        cache = TieredCache('test', local=TTLCache(clock=clock), shared=broken, clock=clock)
+
+        assert cache.get_or_load('11B#army', lambda: {'total': 1}) == {'total': 1}
+        assert cache.counts['shared_errors'] == 2
+
+
+class TestTTLCache:
+
+    def test_evicts_least_recently_used(self, clock):
+        lru = TTLCache(maxsize=2, ttl_seconds=60, clock=clock)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        assert lru.get('b') is None
+        assert lru.get('a').value == 1
+        assert lru.get('c').value == 3
+
+    def test_entries_expire(self, clock):
+        lru = TTLCache(ttl_seconds=60, clock=clock)
+        lru.set('a', 1)
+
+        clock.now += 61
+
+        assert lru.get('a') is None
+
+    def test_per_entry_ttl_overrides_default(self, clock):
+        lru = TTLCache(ttl_seconds=3600, clock=clock)
+        lru.set('miss', {'total': 0}, ttl_seconds=60)
+        lru.set('hit', {'total': 3})
+
+        clock.now += 61
+
+        assert lru.get('miss') is None
+        assert lru.get('hit').value == {'total': 3}
+
+    def test_bounded_by_bytes(self, clock):
+        lru = TTLCache(maxsize=100, clock=clock, max_bytes=100, sizeof=len)
+        lru.set('a', 'x' * 40)
+        lru.set('b', 'x' * 40)
+        lru.get('a')
+        lru.set('c', 'x' * 40)
+
+        assert lru.get('b') is None
+        assert lru.total_bytes == 80
+
+        lru.set('a', 'x' * 10)
+        assert lru.total_bytes == 50
+
+    def test_value_larger_than_bound_is_not_stored(self, clock):
+        lru = TTLCache(clock=clock, max_bytes=100, sizeof=len)
+        lru.set('a', 'x' * 50)
+        lru.set('big', 'x' * 500)
+
+        assert lru.get('big') is None
+        assert lru.get('a').value == 'x' * 50
+        assert lru.total_bytes == 50
@@ -0,0 +1,219 @@
+import json
+
+import pytest
+
+import lambda_function
+from src import onet_client
+from src.career_ranking import OccupationFeatures, build_features, load_features, main, rank_careers
+from src.wage_table import WageTable, build_table
+
+SKILLS = ['Active Listening', 'Critical Thinking', 'Programming', 'Troubleshooting']
+
+
+def job_zone_row(soc, zone):
+    return {'O*NET-SOC Code': soc, 'Title': f'Occupation {soc}', 'Job Zone': str(zone)}
+
+
+def skill_rows(soc, important):
+    return [
+        {'O*NET-SOC Code': soc, 'Element Name': name, 'Scale ID': scale,
+         'Data Value': '4.0' if name in important else '2.0'}
+        for name in SKILLS for scale in ('IM', 'LV')
+    ]
+
+
+def wage_row(soc, state, median):
+    return {'AREA_TYPE': '2', 'PRIM_STATE': state, 'OCC_CODE': soc, 'O_GROUP': 'detailed',
+            'TOT_EMP': '1000', 'A_MEAN': median, 'A_PCT10': median, 'A_PCT25': median,
+            'A_MEDIAN': median, 'A_PCT75': median, 'A_PCT90': median}
+
+
+@pytest.fixture
+def features(tmp_path):
+    path = str(tmp_path / 'features.json')
+    build_features(
+        [job_zone_row('29-2042.00', 2), job_zone_row('29-1141.00', 4), job_zone_row('15-1232.00', 3),
+         job_zone_row('43-4051.00', 2)],
+        skill_rows('29-2042.00', {'Active Listening', 'Critical Thinking'})
+        + skill_rows('29-1141.00', {'Active Listening', 'Critical Thinking'})
+        + skill_rows('15-1232.00', {'Troubleshooting', 'Programming'})
+        + skill_rows('43-4051.00', {'Active Listening'}),
+        path
+    )
+    return OccupationFeatures.load(path)
+
+
+@pytest.fixture
+def wage_table(tmp_path):
+    path = str(tmp_path / 'wages.bin')
+    build_table([wage_row('29-2042', 'TX', '40000'), wage_row('29-1141', 'TX', '80000'),
+                 wage_row('15-1232', 'TX', '55000'), wage_row('43-4051', 'TX', '38000')], path)
+    return WageTable(path)
+
+
+def profile(**overrides):
+    return {'education': 'high_school', 'homeState': 'TX', 'relocate': False, 'skills': [], **overrides}
+
+
+class TestRankCareers:
+
+    def test_without_profile_signals_onet_order_is_kept(self, features):
+        socs = ['43-4051.00', '29-2042.00']
+
+        ranked = rank_careers(socs, profile(), features)
+
+        assert [career.soc for career in ranked] == socs
+
+    def test_job_zone_beyond_education_is_demoted(self, features):
+        ranked = rank_careers(['29-1141.00', '29-2042.00'], profile(), features)
+
+        assert ranked[0].soc == '29-2042.00'
+        assert 'usually needs more than a high_school education' in ranked[1].reasons[1]
+
+    def test_bachelor_reaches_the_higher_paid_occupation(self, features, wage_table):
+        ranked = rank_careers(['29-2042.00', '29-1141.00'], profile(education='bachelor'), features, wage_table)
+
+        assert ranked[0].soc == '29-1141.00'
+        assert 'Median pay $80,000 in TX' in ranked[0].reasons
+
+    def test_skill_overlap_is_scored_and_explained(self, features):
+        ranked = rank_careers(['43-4051.00', '15-1232.00', '29-2042.00'],
+                              profile(education='associate', skills=['programming', 'Troubleshooting', 'Welding']),
+                              features)
+
+        assert ranked[0].soc == '15-1232.00'
+        assert ranked[0].contributions['skills'] == pytest.approx(0.15)
+        assert 'Uses 2 of the 2 O*NET skills matching your listed skills: Programming, Troubleshooting' \
+            in ranked[0].reasons
+
+    def test_clearance_bonus(self, features):
+        uncleared = rank_careers(['15-1232.00'], profile(clearance='none'), features)[0]
+        cleared = rank_careers(['15-1232.00'], profile(clearance='Secret'), features)[0]
+
+        assert cleared.score - uncleared.score == pytest.approx(0.05)
+        assert uncleared.contributions['clearance'] == 0
+
+    def test_contributions_add_up_to_score(self, features, wage_table):
+        ranked = rank_careers(['29-2042.00', '29-1141.00', '15-1232.00'],
+                              profile(skills=['Active Listening'], clearance='TS/SCI'), features, wage_table)
+
+        for career in ranked:
+            assert sum(career.contributions.values()) == pytest.approx(career.score, abs=1e-3)
+
+    def test_top_k_and_unknown_occupations(self, features):
+        socs = ['99-9999.00'] + [f'11-{1000 + i}.00' for i in range(40)] + ['29-2042.00']
+
+        ranked = rank_careers(socs, profile(), features, top_k=5)
+
+        assert len(ranked) == 5
+        assert ranked[0].soc == '99-9999.00'
+        assert rank_careers([], profile(), features) == []
+
+
+ONET_SKILLS = ['Active Listening', 'Coordination', 'Critical Thinking', 'Equipment Maintenance',
+               'Judgment and Decision Making', 'Management of Material Resources',
+               'Management of Personnel Resources', 'Programming', 'Repairing', 'Time Management',
+               'Troubleshooting']
+
+
+@pytest.fixture
+def onet_features(tmp_path):
+    def rows(soc, important):
+        return [{'O*NET-SOC Code': soc, 'Element Name': name, 'Scale ID': 'IM',
+                 'Data Value': '4.0' if name in important else '2.0'} for name in ONET_SKILLS]
+
+    path = str(tmp_path / 'features.json')
+    build_features(
+        [job_zone_row('11-3071.00', 3), job_zone_row('49-3023.00', 3), job_zone_row('15-1252.00', 3)],
+        rows('11-3071.00', {'Coordination', 'Management of Material Resources', 'Management of Personnel Resources',
+                            'Time Management', 'Judgment and Decision Making'})
+        + rows('49-3023.00', {'Equipment Maintenance', 'Repairing', 'Troubleshooting'})
+        + rows('15-1252.00', {'Programming', 'Critical Thinking', 'Troubleshooting'}),
+        path
+    )
+    return OccupationFeatures.load(path)
+
+
+class TestFreeTextSkills:
+
+    def names(self, features, mask):
+        return {name for i, name in enumerate(features.skills) if mask >> i & 1}
+
+    def test_aliases_map_resume_terms_to_onet_skills(self, onet_features):
+        assert self.names(onet_features, onet_features.skill_mask(['Leadership'])) == {
+            'Management of Personnel Resources', 'Coordination', 'Judgment and Decision Making'}
+        assert 'Management of Material Resources' in self.names(onet_features, onet_features.skill_mask(['logistics']))
+        assert self.names(onet_features, onet_features.skill_mask(['Software development'])) == {'Programming'}
+
+    def test_shared_word_stems_match(self, onet_features):
+        assert self.names(onet_features, onet_features.skill_mask(['equipment repair'])) == {
+            'Equipment Maintenance', 'Repairing'}
+        assert self.names(onet_features, onet_features.skill_mask(['  time   MANAGEMENT '])) == {'Time Management'}
+
+    def test_unrelated_text_matches_nothing(self, onet_features):
+        assert onet_features.skill_mask(['underwater basket weaving', 'skills', '']) == 0
+
+    def test_free_text_skills_drive_the_ranking(self, onet_features):
+        ranked = rank_careers(['49-3023.00', '11-3071.00', '15-1252.00'],
+                              profile(education='associate', skills=['Leadership', 'logistics', 'convoy operations']),
+                              onet_features)
+
+        assert ranked[0].soc == '11-3071.00'
+        assert ranked[0].contributions['skills'] > 0
+        assert any(reason.startswith('Uses 5 of the 5 O*NET skills') for reason in ranked[0].reasons)
+
+
+class TestFeaturesFile:
+
+    def test_missing_file_keeps_onet_order(self, tmp_path):
+        assert load_features(str(tmp_path / 'missing.json')) is None
+
+    def test_build_command(self, tmp_path):
+        zones = tmp_path / 'Job Zones.txt'
+        zones.write_text('O*NET-SOC Code\tTitle\tJob Zone\n29-2042.00\tEMTs\t3\n')
+        skills = tmp_path / 'Skills.txt'
+        skills.write_text('O*NET-SOC Code\tElement Name\tScale ID\tData Value\n'
+                          '29-2042.00\tActive Listening\tIM\t3.75\n29-2042.00\tProgramming\tIM\t1.25\n')
+        output = str(tmp_path / 'features.json')
+
+        main(['build', str(zones), str(skills), '--output', output])
+
+        features = OccupationFeatures.load(output)
+        assert features.job_zones[features.row('29-2042.00')] == 3
+        assert features.skill_names(features.skill_masks[features.row('29-2042.00')]) == ['Active Listening']
+
+
+class TestRecommendRanking:
+
+    def test_recommend_includes_ranked_careers(self, features, monkeypatch):
+        crosswalk = {'keyword': '68W', 'total': 1, 'match': [{
+            'code': '68W',
+            'occupations': {'occupation': [{'code': '29-1141.00'}, {'code': '29-2042.00'}]}
+        }]}
+        monkeypatch.setattr(lambda_function, 'get_occupation_features', lambda: features)
+        monkeypatch.setattr(lambda_function, 'get_onet_crosswalk_data', lambda code, branch: crosswalk)
+        monkeypatch.setattr(lambda_function, 'store_session', lambda *args: None)
+
+        response = lambda_function.lambda_handler({
+            'httpMethod': 'POST',
+            'path': '/recommend',
+            'body': json.dumps({'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False,
+                                'education': 'high_school', 'topK': 1})
+        }, None)
+
+        body = json.loads(response['body'])
+        assert [career['soc'] for career in body['ranked_careers']] == ['29-2042.00']
+        assert body['onet_careers'] == crosswalk
+
+
+class TestONetClientRanking:
+
+    def test_ranks_veterans_military_careers(self, features, veterans_military_response, monkeypatch):
+        monkeypatch.setattr(onet_client, '_onet_credentials', lambda secret_name: ('user', 'secret'))
+        monkeypatch.setattr(onet_client, 'get_occupation_features', lambda: features)
+
+        ranked = onet_client.ONetClient().get_ranked_careers(veterans_military_response, profile())
+
+        assert sorted(career['soc'] for career in ranked) == ['29-1141.00', '29-2042.00', '29-2061.00']
+        assert ranked[0]['soc'] == '29-2042.00'
+        assert ranked[0]['reasons']
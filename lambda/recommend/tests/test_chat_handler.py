@@ -0,0 +1,139 @@
+import json
+import os
+
+import pytest
+
+# boto3 resources are created at import; the namespace is set by the template in deployment
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('POWERTOOLS_METRICS_NAMESPACE', 'VetROI')
+
+from src import chat_handler  # noqa: E402
+from src.conversation_window import SUMMARY_TIMESTAMP  # noqa: E402
+from src.session_store import summary_folds  # noqa: E402
+
+PROFILE = {'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False, 'education': 'associate'}
+
+
+class LambdaContext:
+    function_name = 'chat'
+    memory_limit_in_mb = 512
+    invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:chat'
+    aws_request_id = 'request-1'
+
+
+class FakeSessionsTable:
+
+    def __init__(self, item):
+        self.item = item
+        self.reads = []
+        self.updates = []
+
+    def get_item(self, Key, ProjectionExpression=None):
+        self.reads.append(ProjectionExpression)
+        return {'Item': dict(self.item)}
+
+    def update_item(self, Key, UpdateExpression):
+        self.updates.append(UpdateExpression)
+        if UpdateExpression == 'REMOVE conversation_history':
+            self.item.pop('conversation_history', None)
+
+
+class FakeBedrockClient:
+    calls = []
+    summaries = []
+
+    def generate_chat_response(self, veteran_profile, onet_careers, user_message, conversation_history,
+                               summary=''):
+        self.calls.append({'message': user_message, 'history': conversation_history, 'summary': summary})
+        return f'reply to {user_message}'
+
+    def summarize_conversation(self, previous_summary, turns, max_tokens):
+        self.summaries.append(len(turns))
+        return f'{previous_summary} +{len(turns)} turns'.strip()
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    sessions = FakeSessionsTable({'session_id': 's1', 'veteran_profile': PROFILE, 'onet_careers': {}})
+    monkeypatch.setattr(chat_handler, 'table', sessions)
+    return sessions
+
+
+@pytest.fixture
+def turns(conversations_table, monkeypatch):
+    monkeypatch.setattr(chat_handler, 'turns_table', conversations_table)
+    return conversations_table
+
+
+@pytest.fixture
+def bedrock(monkeypatch):
+    FakeBedrockClient.calls, FakeBedrockClient.summaries = [], []
+    monkeypatch.setattr(chat_handler, 'BedrockClient', FakeBedrockClient)
+    return FakeBedrockClient
+
+
+def chat(message):
+    response = chat_handler.lambda_handler({
+        'httpMethod': 'POST',
+        'body': json.dumps({'session_id': 's1', 'message': message})
+    }, LambdaContext())
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+class TestChatTurnStore:
+
+    def test_turns_are_separate_items_not_session_growth(self, sessions, turns, bedrock):
+        chat('hello')
+        chat('what pays best?')
+
+        stored = sorted(turns.items.values(), key=lambda item: item['timestamp'])
+        assert [item['user_message'] for item in stored] == ['hello', 'what pays best?']
+        assert stored[1]['assistant_message'] == 'reply to what pays best?'
+        assert sessions.updates == []
+        assert 'conversation_history' not in sessions.item
+
+    def test_history_comes_from_the_turn_store(self, sessions, turns, bedrock):
+        chat('hello')
+        chat('tell me more')
+
+        assert bedrock.calls[1]['history'] == [
+            {'role': 'user', 'content': 'hello'},
+            {'role': 'assistant', 'content': 'reply to hello'}
+        ]
+
+    def test_long_chats_are_bounded_and_compacted(self, sessions, turns, bedrock, monkeypatch):
+        monkeypatch.setattr(chat_handler, 'CHAT_HISTORY_TOKEN_BUDGET', 300)
+        for ts in range(1, 41):
+            turns.put_item(Item=chat_handler.turn_item('s1', ts, 'question ' * 20, 'answer ' * 40))
+
+        chat('and now?')
+        # Folds are not flushed by the request
+        summary_folds.flush()
+
+        assert len(bedrock.calls[0]['history']) < 20
+        assert bedrock.summaries == [20]
+        summary = turns.items[('s1', SUMMARY_TIMESTAMP)]
+        assert summary['summary'] == '+20 turns'
+
+        chat('one more')
+        summary_folds.flush()
+
+        assert bedrock.calls[1]['summary'] == '+20 turns'
+        assert bedrock.summaries[1] > 0
+
+    def test_inline_history_is_migrated_once(self, sessions, turns, bedrock):
+        sessions.item['conversation_history'] = [
+            {'role': 'user', 'content': 'old question', 'timestamp': '2025-06-01T12:00:00'},
+            {'role': 'assistant', 'content': 'old answer', 'timestamp': '2025-06-01T12:00:00'},
+        ]
+
+        chat('new question')
+        chat('another')
+
+        assert sessions.updates == ['REMOVE conversation_history']
+        assert bedrock.calls[0]['history'][:2] == [
+            {'role': 'user', 'content': 'old question'},
+            {'role': 'assistant', 'content': 'old answer'}
+        ]
+        assert ('s1', 1748779200000) in turns.items
@@ -0,0 +1,72 @@
+import pytest
+
+from src.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('test', failure_threshold=3, reset_seconds=30, clock=clock)
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.record_failure()
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        fail(breaker, 2)
+        assert breaker.allow()
+
+        fail(breaker, 1)
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.trips == 1
+        assert breaker.rejected == 1
+
+    def test_success_resets_the_count(self, breaker):
+        fail(breaker, 2)
+        breaker.record_success()
+        fail(breaker, 2)
+
+        assert breaker.state == CLOSED
+
+    def test_single_probe_after_reset_period(self, breaker, clock):
+        fail(breaker, 3)
+        clock.now += 30
+
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self, breaker, clock):
+        fail(breaker, 3)
+        clock.now += 30
+        breaker.allow()
+
+        fail(breaker, 1)
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        clock.now += 30
+        assert breaker.allow()
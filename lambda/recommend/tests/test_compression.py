@@ -0,0 +1,104 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+import lambda_function
+from vetroi_shared import compression
+from vetroi_shared.compression import choose_encoding, compress_event_response, compress_response
+
+
+def json_response(payload):
+    return {'statusCode': 200, 'headers': {'Content-Type': 'application/json'}, 'body': json.dumps(payload)}
+
+
+LARGE = {'occupations': [{'code': f'29-20{i:02d}.00', 'title': 'Emergency Medical Technicians'} for i in range(100)]}
+
+
+class FakeResponse:
+
+    def __init__(self, payload):
+        self.status = 200
+        self.data = json.dumps(payload).encode()
+
+
+class TestChooseEncoding:
+
+    @pytest.fixture(autouse=True)
+    def without_brotli(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+
+    @pytest.mark.parametrize('header, expected', [
+        ('gzip, deflate, br', 'gzip'),
+        ('br', None),
+        ('gzip;q=0', None),
+        ('*', 'gzip'),
+        ('identity', None),
+        ('', None),
+        (None, None),
+    ])
+    def test_negotiation(self, header, expected):
+        assert choose_encoding(header) == expected
+
+    def test_prefers_brotli_when_available(self, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', object())
+        assert choose_encoding('gzip, br') == 'br'
+        assert choose_encoding('gzip, br;q=0.5') == 'gzip'
+
+
+class TestCompressResponse:
+
+    def test_large_body_is_gzipped_and_base64_encoded(self):
+        response = compress_response(json_response(LARGE), 'gzip')
+
+        assert response['isBase64Encoded'] is True
+        assert response['headers']['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(base64.b64decode(response['body']))) == LARGE
+
+    def test_small_body_is_left_alone(self):
+        response = compress_response(json_response({'ok': True}), 'gzip')
+
+        assert response['body'] == '{"ok": true}'
+        assert 'isBase64Encoded' not in response
+        assert response['headers']['Vary'] == 'Accept-Encoding'
+
+    def test_no_accept_encoding_is_left_alone(self):
+        response = compress_response(json_response(LARGE), None)
+
+        assert json.loads(response['body']) == LARGE
+        assert 'Content-Encoding' not in response['headers']
+
+
+class TestCompressEventResponse:
+
+    def test_http_api_event_is_compressed(self):
+        event = {'version': '2.0', 'headers': {'accept-encoding': 'gzip'}}
+
+        assert compress_event_response(json_response(LARGE), event)['headers']['Content-Encoding'] == 'gzip'
+
+    def test_rest_api_event_is_left_alone(self):
+        """A REST API without binaryMediaTypes would pass the base64 body through as text"""
+        event = {'httpMethod': 'GET', 'headers': {'Accept-Encoding': 'gzip'}}
+
+        response = compress_event_response(json_response(LARGE), event)
+
+        assert json.loads(response['body']) == LARGE
+        assert 'isBase64Encoded' not in response
+
+
+class TestHandlerCompression:
+
+    def test_career_detail_honours_accept_encoding(self, monkeypatch):
+        monkeypatch.setattr(lambda_function, 'onet_get', lambda path, timeout=10.0: FakeResponse(LARGE))
+
+        response = lambda_function.lambda_handler({
+            'version': '2.0',
+            'rawPath': '/prod/career/29-2042.00',
+            'requestContext': {'http': {'method': 'GET'}},
+            'headers': {'accept-encoding': 'gzip, deflate'}
+        }, None)
+
+        assert response['statusCode'] == 200
+        assert response['headers']['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(base64.b64decode(response['body']))) == LARGE
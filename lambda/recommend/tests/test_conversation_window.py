@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+
+import pytest
+
+import lambda_function
+from src import aws_clients
+from src.conversation_window import SUMMARY_TIMESTAMP, fold_older_turns, load_window, window_messages
+from src.session_store import summary_folds
+from vetroi_shared.token_budget import estimate_tokens
+
+BUDGET = 600
+SUMMARY_MAX_TOKENS = 100
+
+
+def add_turn(table, ts, words=20):
+    table.put_item(Item={
+        'conversation_id': 'c1',
+        'timestamp': ts,
+        'user_message': f'question {ts} ' + 'word ' * words,
+        'assistant_message': f'answer {ts} ' + 'word ' * (words * 3)
+    })
+
+
+def fake_summarize(previous, turns, max_tokens):
+    return (previous + ' ' + ' '.join(f"[{t['timestamp']}]" for t in turns)).strip()
+
+
+@pytest.fixture
+def table(conversations_table):
+    return conversations_table
+
+
+class TestLoadWindow:
+
+    def test_short_conversation_is_loaded_whole(self, table):
+        for ts in range(1, 4):
+            add_turn(table, ts)
+
+        window = load_window(table, 'c1', BUDGET)
+
+        assert [t['timestamp'] for t in window.turns] == [1, 2, 3]
+        assert window.truncated is False
+        assert window_messages(window)[0]['role'] == 'user'
+
+    def test_keeps_newest_turns_within_budget_across_pages(self, table):
+        for ts in range(1, 51):
+            add_turn(table, ts)
+
+        window = load_window(table, 'c1', BUDGET, page_size=2)
+
+        assert window.truncated is True
+        assert window.turns[-1]['timestamp'] == 50
+        assert window.tokens <= BUDGET
+        assert len(table.queries) > 1
+
+    def test_summary_item_is_not_a_turn(self, table):
+        add_turn(table, 1)
+        table.put_item(Item={'conversation_id': 'c1', 'timestamp': SUMMARY_TIMESTAMP,
+                             'summary': 'earlier', 'summarized_through': 0})
+
+        window = load_window(table, 'c1', BUDGET)
+
+        assert window.summary == 'earlier'
+        assert [t['timestamp'] for t in window.turns] == [1]
+
+
+class TestRollingSummary:
+
+    def test_fold_is_incremental(self, table):
+        for ts in range(1, 31):
+            add_turn(table, ts)
+
+        window = load_window(table, 'c1', BUDGET)
+        folded = fold_older_turns(table, 'c1', window, fake_summarize, SUMMARY_MAX_TOKENS, max_turns=50)
+        summary = table.get_item(Key={'conversation_id': 'c1', 'timestamp': 0})['Item']
+
+        assert folded == window.oldest_timestamp - 1
+        assert summary['summarized_through'] == window.oldest_timestamp - 1
+
+        add_turn(table, 31)
+        window = load_window(table, 'c1', BUDGET)
+        summarized = []
+
+        def record(previous, turns, max_tokens):
+            summarized.extend(t['timestamp'] for t in turns)
+            return previous
+
+        fold_older_turns(table, 'c1', window, record, SUMMARY_MAX_TOKENS)
+
+        # Only the turns that dropped out since the last fold are summarized
+        assert summarized == list(range(summary['summarized_through'] + 1, window.oldest_timestamp))
+
+    def test_fold_is_capped_per_call(self, table):
+        for ts in range(1, 101):
+            add_turn(table, ts)
+
+        window = load_window(table, 'c1', BUDGET)
+
+        assert fold_older_turns(table, 'c1', window, fake_summarize, SUMMARY_MAX_TOKENS, max_turns=20) == 20
+
+    def test_prompt_size_stays_flat_over_hundreds_of_turns(self, table):
+        """Per-turn prompt tokens stop growing once the window fills"""
+        prompt_tokens = []
+
+        for ts in range(1, 301):
+            window = load_window(table, 'c1', BUDGET)
+            history = window.summary + json.dumps(window_messages(window))
+            prompt_tokens.append(estimate_tokens(history))
+
+            add_turn(table, ts)
+            fold_older_turns(table, 'c1', window, lambda prev, turns, n: 'summary ' * 50, SUMMARY_MAX_TOKENS)
+
+        steady = prompt_tokens[20:]
+        assert max(steady) <= BUDGET * 1.5
+        assert max(steady) - min(steady) < BUDGET / 2
+        assert prompt_tokens[299] <= prompt_tokens[50] * 1.2
+
+
+def sentra_message(message='What next?'):
+    return lambda_function.lambda_handler({
+        'httpMethod': 'POST',
+        'path': '/sentra/conversation',
+        'body': json.dumps({'sessionId': 's1', 'conversationId': 'c1', 'message': message,
+                            'veteranContext': {'veteranProfile': {}}})
+    }, None)
+
+
+class TestSentraHistory:
+
+    def test_long_conversation_sends_bounded_history(self, table, monkeypatch):
+        for ts in range(1, 201):
+            add_turn(table, ts)
+
+        calls = []
+
+        class FakeBedrock:
+            def converse(self, **kwargs):
+                calls.append(kwargs)
+                return {'output': {'message': {'content': [{'text': 'Summary of goals.'}]}}}
+
+        monkeypatch.setattr(aws_clients, 'table', lambda name, **kwargs: table)
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: FakeBedrock())
+        monkeypatch.setattr(lambda_function, 'SENTRA_HISTORY_TOKEN_BUDGET', BUDGET)
+
+        response = sentra_message()
+        summary_folds.flush()
+
+        assert response['statusCode'] == 200
+        reply_call = next(call for call in calls if 'system' in call)
+        assert len(reply_call['messages']) < 20
+        assert table.get_item(Key={'conversation_id': 'c1', 'timestamp': 0})['Item']['summary'] == 'Summary of goals.'
+
+    def test_slow_summary_does_not_hold_the_reply(self, table, monkeypatch):
+        for ts in range(1, 201):
+            add_turn(table, ts)
+
+        release = threading.Event()
+
+        class SlowSummaryBedrock:
+            def converse(self, **kwargs):
+                if 'system' not in kwargs:
+                    # The summarize call, stalled well past SESSION_FLUSH_SECONDS
+                    release.wait(10)
+                return {'output': {'message': {'content': [{'text': 'Summary of goals.'}]}}}
+
+        monkeypatch.setattr(aws_clients, 'table', lambda name, **kwargs: table)
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: SlowSummaryBedrock())
+        monkeypatch.setattr(lambda_function, 'SENTRA_HISTORY_TOKEN_BUDGET', BUDGET)
+
+        started = time.monotonic()
+        response = sentra_message()
+        elapsed = time.monotonic() - started
+
+        try:
+            assert response['statusCode'] == 200
+            assert elapsed < 1
+            assert 'Item' not in table.get_item(Key={'conversation_id': 'c1', 'timestamp': SUMMARY_TIMESTAMP})
+        finally:
+            release.set()
+
+        # The fold completes later, e.g. when the next invocation thaws the container
+        assert summary_folds.flush(5) == 0
+        assert table.get_item(Key={'conversation_id': 'c1', 'timestamp': SUMMARY_TIMESTAMP})['Item']['summary'] \
+            == 'Summary of goals.'
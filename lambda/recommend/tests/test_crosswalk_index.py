@@ -0,0 +1,87 @@
+import json
+import pytest
+
+from src.crosswalk_index import CrosswalkIndex, build_index, load_index, main
+
+
+def crosswalk_response(keyword, branch, match_code, title, socs):
+    return {
+        'keyword': keyword,
+        'branch': branch,
+        'total': 1,
+        'match': [{
+            'code': match_code,
+            'title': title,
+            'branch': branch,
+            'occupations': {
+                'occupation': [{'code': soc, 'title': f'Occupation {soc}'} for soc in socs]
+            }
+        }]
+    }
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = str(tmp_path / 'crosswalk_index.sqlite')
+    build_index([
+        crosswalk_response('68W', 'army', '68W', 'Combat Medic Specialist (Army - Enlisted)',
+                           ['29-2042.00', '29-2061.00']),
+        crosswalk_response('68w', 'navy', '68W', 'Hypothetical Navy Match', ['31-9092.00']),
+        {'keyword': '99Z', 'branch': 'army', 'total': 0, 'match': [], 'error': 'timeout'}
+    ], path)
+    return path
+
+
+class TestCrosswalkIndex:
+
+    def test_lookup_returns_frontend_shape(self, index_path):
+        """Indexed payloads keep the nested match[].occupations.occupation[] shape"""
+        result = CrosswalkIndex(index_path).lookup(' 68w ', 'army')
+
+        occupations = result['match'][0]['occupations']['occupation']
+        assert [o['code'] for o in occupations] == ['29-2042.00', '29-2061.00']
+
+    def test_all_branches_entry_is_merged(self, index_path):
+        """Codes dumped per branch also answer unfiltered lookups"""
+        result = CrosswalkIndex(index_path).lookup('68W')
+
+        assert result['branch'] == 'all'
+        assert result['total'] == 2
+        assert {m['branch'] for m in result['match']} == {'army', 'navy'}
+
+    def test_unknown_and_error_entries_miss(self, index_path):
+        """Error dumps are skipped so the live fallback still runs"""
+        index = CrosswalkIndex(index_path)
+
+        assert index.lookup('99Z', 'army') is None
+        assert index.lookup('11B', 'army') is None
+
+    def test_military_codes_table(self, index_path):
+        codes = CrosswalkIndex(index_path).military_codes()
+
+        assert ('68W', 'army', 'Combat Medic Specialist (Army - Enlisted)') in codes
+
+    def test_missing_file_disables_index(self, tmp_path):
+        assert load_index(str(tmp_path / 'missing.sqlite')) is None
+
+    def test_build_command(self, tmp_path):
+        dumps = tmp_path / 'dumps'
+        dumps.mkdir()
+        (dumps / '25B-army.json').write_text(json.dumps(
+            crosswalk_response('25B', 'army', '25B', 'Information Technology Specialist', ['15-1232.00'])
+        ))
+        output = str(tmp_path / 'out.sqlite')
+
+        main(['build', str(dumps), '--output', output])
+
+        assert CrosswalkIndex(output).lookup('25B', 'army')['total'] == 1
+
+    def test_codes_command_merges_into_the_bundled_list(self, index_path, tmp_path):
+        output = tmp_path / 'military_codes.json'
+        output.write_text(json.dumps([{'code': '11B', 'branch': 'army', 'title': 'Infantryman'}]))
+
+        main(['codes', '--index', index_path, '--output', str(output)])
+
+        rows = {(row['code'], row['branch']): row['title'] for row in json.loads(output.read_text())}
+        assert rows[('11B', 'army')] == 'Infantryman'
+        assert rows[('68W', 'army')] == 'Combat Medic Specialist (Army - Enlisted)'
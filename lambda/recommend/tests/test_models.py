@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from src.models import Career, USState, VeteranRequest, parse_veteran_request, validate_veteran_requests
+
+PROFILE = {'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False, 'education': 'associate'}
+
+
+class TestParseVeteranRequest:
+
+    def test_raw_json_bytes(self):
+        request = parse_veteran_request(json.dumps({**PROFILE, 'skills': ['Triage']}).encode('utf-8'))
+
+        assert request.homeState is USState.TX
+        assert request.skills == ['Triage']
+
+    def test_matches_dict_validation(self):
+        assert parse_veteran_request(json.dumps(PROFILE)) == VeteranRequest(**PROFILE)
+
+    @pytest.mark.parametrize('body', ['{not json', '', None, json.dumps({**PROFILE, 'branch': 'army_reserve'})])
+    def test_bad_bodies_are_value_errors(self, body):
+        with pytest.raises(ValueError):
+            parse_veteran_request(body)
+
+    def test_relocate_requires_a_state(self):
+        with pytest.raises(ValueError, match='relocateState is required'):
+            parse_veteran_request(json.dumps({**PROFILE, 'relocate': True}))
+
+        request = parse_veteran_request(json.dumps({**PROFILE, 'relocate': True, 'relocateState': 'CA'}))
+        assert request.relocateState is USState.CA
+
+    def test_career_accepts_field_names_and_aliases(self):
+        by_alias = Career(title='EMT', soc='29-2042.00', summary='s', medianSalary=1, matchReason='m', nextStep='n')
+        by_name = Career(title='EMT', soc='29-2042.00', summary='s', median_salary=1, match_reason='m', next_step='n')
+
+        assert by_alias == by_name
+
+
+class TestValidateVeteranRequests:
+
+    def test_clean_batch(self):
+        result = validate_veteran_requests(json.dumps([PROFILE, {**PROFILE, 'code': '11B'}]))
+
+        assert [request.code for request in result.requests] == ['68W', '11B']
+        assert result.errors == {}
+
+    def test_invalid_items_are_reported_by_index(self):
+        batch = [PROFILE, {**PROFILE, 'homeState': 'XX'}, {**PROFILE, 'code': '25B'}, {**PROFILE, 'relocate': True}]
+
+        result = validate_veteran_requests(json.dumps(batch))
+
+        assert [request.code for request in result.requests] == ['68W', '25B']
+        assert sorted(result.errors) == [1, 3]
+        assert result.errors[1][0]['loc'] == (1, 'homeState')
+
+    def test_non_array_is_rejected(self):
+        with pytest.raises(ValueError):
+            validate_veteran_requests(json.dumps(PROFILE))
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import lambda_function
+from src.mos_autocomplete import MosAutocomplete, load_code_list, merge_code_lists
+
+
+@pytest.fixture
+def autocomplete():
+    return MosAutocomplete([
+        ('25B', 'army', 'Information Technology Specialist'),
+        ('25C', 'army', 'Radio Operator-Maintainer'),
+        ('25U', 'army', 'Signal Support Systems Specialist'),
+        ('68W', 'army', 'Combat Medic Specialist'),
+        ('1A1X1', 'air_force', 'Flight Engineer'),
+        ('0311', 'marine_corps', 'Rifleman'),
+        ('HM', 'navy', 'Hospital Corpsman'),
+    ])
+
+
+class TestMosAutocomplete:
+
+    def test_exact_match_first(self, autocomplete):
+        suggestions = autocomplete.suggest('25b')
+
+        assert suggestions[0] == {'code': '25B', 'branch': 'army',
+                                  'title': 'Information Technology Specialist', 'match': 'exact'}
+
+    def test_prefix_match(self, autocomplete):
+        codes = [s['code'] for s in autocomplete.suggest('25') if s['match'] == 'prefix']
+
+        assert codes == ['25B', '25C', '25U']
+
+    def test_one_edit_typos(self, autocomplete):
+        """Substitution, deletion and insertion typos all resolve"""
+        assert autocomplete.suggest('68V')[0]['code'] == '68W'
+        assert autocomplete.suggest('1A1XX1')[0]['code'] == '1A1X1'
+        assert autocomplete.suggest('031')[0]['code'] == '0311'
+
+    def test_branch_filter(self, autocomplete):
+        assert autocomplete.suggest('25', branch='navy') == []
+        assert [s['code'] for s in autocomplete.suggest('H', branch='navy')] == ['HM']
+
+    def test_title_word_prefix(self, autocomplete):
+        suggestions = autocomplete.suggest('medic')
+
+        assert suggestions[0]['code'] == '68W'
+        assert suggestions[0]['match'] == 'title'
+
+    def test_limit_and_empty_query(self, autocomplete):
+        assert len(autocomplete.suggest('2', limit=2)) == 2
+        assert autocomplete.suggest('   ') == []
+
+
+class TestBundledCodes:
+
+    def test_every_branch_is_covered(self):
+        rows = load_code_list()
+
+        assert {branch for _, branch, _ in rows} == {
+            'army', 'navy', 'marine_corps', 'air_force', 'space_force', 'coast_guard'
+        }
+        assert ('68W', 'army', 'Combat Medic Specialist') in rows
+
+    def test_index_rows_override_bundled_titles(self):
+        merged = merge_code_lists([('68W', 'army', 'Combat Medic Specialist')],
+                                  [('68w', 'army', 'Combat Medic Specialist (Army - Enlisted)'),
+                                   ('68W', 'navy', 'Hypothetical Navy Match')])
+
+        assert merged == [('68W', 'army', 'Combat Medic Specialist (Army - Enlisted)'),
+                          ('68W', 'navy', 'Hypothetical Navy Match')]
+
+    def test_handler_suggests_without_a_crosswalk_index(self, monkeypatch):
+        monkeypatch.setattr(lambda_function, 'get_crosswalk_index', lambda: None)
+        lambda_function.get_mos_autocomplete.cache_clear()
+
+        response = lambda_function.lambda_handler({
+            'httpMethod': 'GET',
+            'path': '/autocomplete',
+            'queryStringParameters': {'q': '68w', 'branch': 'army'}
+        }, None)
+        lambda_function.get_mos_autocomplete.cache_clear()
+
+        assert response['statusCode'] == 200
+        suggestions = json.loads(response['body'])['suggestions']
+        assert suggestions[0] == {'code': '68W', 'branch': 'army', 'title': 'Combat Medic Specialist',
+                                  'match': 'exact'}
@@ -0,0 +1,232 @@
+import time
+
+import pytest
+
+from src import onet_client
+from src.cache import S3CacheTier, TieredCache, TTLCache
+from src.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from src.onet_client import (
+    CAREER_DATA_NEGATIVE_TTL_SECONDS, CAREER_DATA_TTL_SECONDS, MAX_RETRIES, S3_FRESH_SECONDS, ONetClient
+)
+
+BREAKER_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 30
+
+# Enough 5xx responses to fail one lookup after all of its retries
+FAILED_LOOKUP = [503] * (MAX_RETRIES + 1)
+
+
+class FakeS3:
+    """In-memory S3 client supporting the calls S3CacheTier makes"""
+
+    class NoSuchKey(Exception):
+        response = {'Error': {'Code': 'NoSuchKey'}}
+
+    class Body:
+        def __init__(self, data):
+            self.data = data
+
+        def read(self):
+            return self.data
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NoSuchKey(Key)
+        body, metadata = self.objects[(Bucket, Key)]
+        return {'Body': self.Body(body), 'Metadata': metadata}
+
+    def put_object(self, Bucket, Key, Body, Metadata, **kwargs):
+        self.objects[(Bucket, Key)] = (Body, Metadata)
+
+
+class FakeClock:
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def s3():
+    return FakeS3()
+
+
+def build_tiers(clock, s3):
+    return TieredCache(
+        'onet',
+        local=TTLCache(ttl_seconds=CAREER_DATA_TTL_SECONDS, clock=clock, max_bytes=1_000_000),
+        shared=S3CacheTier(s3, 'onet-cache', 'cache/career-data/'),
+        fresh_seconds=S3_FRESH_SECONDS,
+        stale_seconds=10 * S3_FRESH_SECONDS,
+        clock=clock,
+        write_behind=True
+    )
+
+
+def wait_for(condition):
+    deadline = time.time() + 2
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def client_factory(fake_onet, clock, s3, monkeypatch):
+    tiers = build_tiers(clock, s3)
+    monkeypatch.setenv('ONET_API_URL', fake_onet.base_url)
+    monkeypatch.setattr(onet_client, '_onet_credentials', lambda secret_name: ('user', 'secret'))
+    monkeypatch.setattr(onet_client, 'career_data_tiers', lambda: tiers)
+    monkeypatch.setattr(onet_client, 'http_session', onet_client.build_session)
+    monkeypatch.setattr(onet_client, 'BACKOFF_FACTOR', 0.01)
+    monkeypatch.setattr(onet_client, 'onet_breaker', CircuitBreaker(
+        'onet', failure_threshold=BREAKER_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS, clock=clock
+    ))
+    onet_client.metrics.clear_metrics()
+    return ONetClient
+
+
+class TestCareerDataCache:
+
+    def test_shared_across_client_instances(self, client_factory, fake_onet):
+        first = client_factory().get_career_data('68w', 'TX', 'army')
+        second = client_factory().get_career_data('68W ', 'CA', 'army')
+
+        assert second is first
+        assert fake_onet.count('/veterans/military') == 1
+        assert onet_client.metrics.metric_set['ONetCacheHit']['Value'] == [1.0]
+        assert onet_client.career_data_tiers().local.total_bytes > 0
+
+    def test_branch_is_part_of_the_key(self, client_factory, fake_onet):
+        client_factory().get_career_data('68W', 'TX', 'army')
+        client_factory().get_career_data('68W', 'TX', 'navy')
+
+        assert fake_onet.count('/veterans/military') == 2
+
+    def test_errors_are_cached_briefly(self, client_factory, fake_onet, clock):
+        fake_onet.error_statuses = list(FAILED_LOOKUP)
+
+        assert 'error' in client_factory().get_career_data('68W', 'TX', 'army')
+        assert 'error' in client_factory().get_career_data('68W', 'TX', 'army')
+        assert fake_onet.count('/veterans/military') == len(FAILED_LOOKUP)
+        assert onet_client.metrics.metric_set['ONetCacheNegativeHit']['Value'] == [1.0]
+
+        clock.now += CAREER_DATA_NEGATIVE_TTL_SECONDS
+
+        assert client_factory().get_career_data('68W', 'TX', 'army')['total'] == 1
+        assert fake_onet.count('/veterans/military') == len(FAILED_LOOKUP) + 1
+
+
+class TestS3CacheTier:
+
+    def test_new_container_is_served_from_s3(self, client_factory, fake_onet, clock, s3, monkeypatch):
+        client_factory().get_career_data('68W', 'TX', 'army')
+        assert wait_for(lambda: s3.objects)
+
+        # A cold container shares the bucket but not the local cache
+        monkeypatch.setattr(onet_client, 'career_data_tiers', lambda tiers=build_tiers(clock, s3): tiers)
+
+        assert client_factory().get_career_data('68W', 'TX', 'army')['total'] == 1
+        assert fake_onet.count('/veterans/military') == 1
+        assert onet_client.metrics.metric_set['ONetS3CacheHit']['Value'] == [1.0]
+
+    def test_s3_hit_older_than_the_local_ttl_is_then_served_from_memory(self, client_factory, fake_onet, clock,
+                                                                         s3, monkeypatch):
+        client_factory().get_career_data('68W', 'TX', 'army')
+        assert wait_for(lambda: s3.objects)
+
+        # A cold container after the local TTL, still inside the S3 fresh window
+        clock.now += CAREER_DATA_TTL_SECONDS + 3600
+        cold = build_tiers(clock, s3)
+        monkeypatch.setattr(onet_client, 'career_data_tiers', lambda: cold)
+
+        client_factory().get_career_data('68W', 'TX', 'army')
+        assert cold.last_source == 'shared'
+        clock.now += 60
+        client_factory().get_career_data('68W', 'TX', 'army')
+
+        assert cold.last_source == 'local'
+        assert cold.counts['shared_hits'] == 1
+        assert fake_onet.count('/veterans/military') == 1
+
+    def test_stale_entry_is_served_during_an_outage(self, client_factory, fake_onet, clock, s3, monkeypatch):
+        client_factory().get_career_data('68W', 'TX', 'army')
+        assert wait_for(lambda: s3.objects)
+
+        clock.now += S3_FRESH_SECONDS + 1
+        cold = build_tiers(clock, s3)
+        monkeypatch.setattr(onet_client, 'career_data_tiers', lambda: cold)
+        fake_onet.error_statuses = list(FAILED_LOOKUP)
+        stored = dict(s3.objects)
+
+        assert client_factory().get_career_data('68W', 'TX', 'army')['total'] == 1
+        assert cold.last_source == 'stale'
+        assert wait_for(lambda: fake_onet.count('/veterans/military') == 1 + len(FAILED_LOOKUP))
+        # The failed refresh neither replaced nor removed the stale object
+        assert s3.objects == stored
+
+    def test_negative_results_stay_out_of_s3(self, client_factory, fake_onet, s3):
+        fake_onet.error_statuses = list(FAILED_LOOKUP)
+
+        client_factory().get_career_data('68W', 'TX', 'army')
+
+        assert s3.objects == {}
+
+    def test_objects_are_compressed_with_freshness_metadata(self, clock, s3):
+        tier = S3CacheTier(s3, 'onet-cache', 'cache/')
+        tier.put('68W/army', {'total': 1, 'career': ['x'] * 200}, clock.now)
+
+        body, metadata = s3.objects[('onet-cache', 'cache/68W/army.json.gz')]
+        assert len(body) < 200
+        entry = tier.get('68W/army')
+        assert entry.value == {'total': 1, 'career': ['x'] * 200}
+        assert entry.stored_at == clock.now
+        assert tier.get('11B/army') is None
+
+
+class TestResilientHTTP:
+
+    def test_transient_5xx_is_retried(self, client_factory, fake_onet):
+        fake_onet.error_statuses = [503, 502]
+
+        assert client_factory().get_career_data('68W', 'TX', 'army')['total'] == 1
+        assert fake_onet.count('/veterans/military') == 3
+        assert onet_client.onet_breaker.state == CLOSED
+
+    def test_slow_onet_times_out_instead_of_hanging(self, client_factory, fake_onet, monkeypatch):
+        monkeypatch.setattr(onet_client, 'READ_TIMEOUT_SECONDS', 0.1)
+        fake_onet.latency_seconds = 0.5
+        started = time.monotonic()
+
+        result = client_factory().get_career_data('68W', 'TX', 'army')
+
+        assert 'error' in result
+        assert time.monotonic() - started < 2
+        assert onet_client.onet_breaker.failures == 1
+
+    def test_breaker_trips_to_fallback_careers_and_recovers(self, client_factory, fake_onet, clock):
+        fake_onet.error_statuses = FAILED_LOOKUP * BREAKER_THRESHOLD
+        for code in ('11B', '25B', '68W')[:BREAKER_THRESHOLD]:
+            client_factory().get_career_data(code, 'TX', 'army')
+        calls = len(fake_onet.requests)
+
+        assert onet_client.onet_breaker.state == OPEN
+
+        fallback = client_factory().get_career_data('0311', 'TX', 'marine_corps')
+        assert fallback['careers'][0]['title'] == 'Project Manager'
+        assert len(fake_onet.requests) == calls
+        assert onet_client.metrics.metric_set['ONetCircuitOpen']['Value'] == [1.0]
+
+        clock.now += BREAKER_RESET_SECONDS
+
+        assert client_factory().get_career_data('0311', 'TX', 'army')['total'] == 1
+        assert onet_client.onet_breaker.state == CLOSED
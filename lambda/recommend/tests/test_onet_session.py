@@ -0,0 +1,106 @@
+import base64
+import json
+
+import pytest
+
+from src import aws_clients, onet_session
+from src.onet_session import CredentialProvider, connection_stats, onet_get
+
+TTL_SECONDS = 3600
+
+
+class FakeSecretsManager:
+    """Returns a new password on every read, as a rotated secret would"""
+
+    def __init__(self):
+        self.reads = 0
+
+    def get_secret_value(self, SecretId):
+        self.reads += 1
+        return {'SecretString': json.dumps({'username': 'vetroi', 'password': f'secret-{self.reads}'})}
+
+
+class FakeClock:
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def password(header):
+    return base64.b64decode(header.split(' ', 1)[1]).decode().split(':', 1)[1]
+
+
+@pytest.fixture
+def secrets(monkeypatch):
+    secrets = FakeSecretsManager()
+    monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: secrets)
+    return secrets
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def provider(secrets, clock, monkeypatch):
+    provider = CredentialProvider('ONET', TTL_SECONDS, clock=clock)
+    monkeypatch.setattr(onet_session, 'credentials', provider)
+    return provider
+
+
+class TestCredentialProvider:
+
+    def test_cached_until_the_ttl_expires(self, provider, secrets, clock):
+        first = provider.get_auth_header()
+        clock.now += TTL_SECONDS - 1
+        assert provider.get_auth_header() == first
+        assert secrets.reads == 1
+
+        clock.now += 1
+        assert password(provider.get_auth_header()) == 'secret-2'
+        assert secrets.reads == 2
+        assert (provider.hits, provider.misses) == (1, 2)
+
+    def test_invalidate_forces_a_fetch(self, provider, secrets):
+        provider.get_auth_header()
+        provider.invalidate()
+
+        assert password(provider.get_auth_header()) == 'secret-2'
+        assert provider.invalidations == 1
+
+
+class TestOnetGet:
+
+    @pytest.fixture(autouse=True)
+    def point_at_fake_onet(self, fake_onet, monkeypatch):
+        monkeypatch.setattr(onet_session, 'ONET_BASE_URL', fake_onet.base_url)
+
+    def test_401_refreshes_credentials_and_retries_once(self, provider, secrets, fake_onet):
+        fake_onet.error_statuses = [401]
+
+        response = onet_get('/veterans/military/', fields={'keyword': '68W'})
+
+        assert response.status == 200
+        assert fake_onet.count('/veterans/military/') == 2
+        assert secrets.reads == 2
+        assert provider.invalidations == 1
+
+    def test_second_401_is_returned_without_another_retry(self, provider, secrets, fake_onet):
+        fake_onet.error_statuses = [401, 401, 401]
+
+        assert onet_get('/veterans/military/', fields={'keyword': '68W'}).status == 401
+        assert fake_onet.count('/veterans/military/') == 2
+        assert secrets.reads == 2
+
+    def test_requests_share_one_keep_alive_connection(self, provider, secrets, fake_onet):
+        for _ in range(3):
+            assert onet_get('/veterans/military/', fields={'keyword': '68W'}).status == 200
+
+        stats = connection_stats()
+        assert stats['pool_requests'] == 3
+        assert stats['pool_connections_opened'] == 1
+        assert secrets.reads == 1
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+import lambda_function
+from src.projection import PRESETS, compile_projection, fields_spec, project
+
+CROSSWALK = {
+    'keyword': '68W',
+    'total': 1,
+    'match': [{
+        'code': '68W',
+        'title': 'Combat Medic Specialist (Army - Enlisted)',
+        'occupations': {'occupation': [
+            {'code': '29-2042.00', 'title': 'Emergency Medical Technicians',
+             'href': 'https://services.onetcenter.org/ws/online/occupations/29-2042.00/',
+             'tags': {'bright_outlook': True, 'green': False}},
+            {'code': '29-2061.00', 'title': 'Licensed Practical and Licensed Vocational Nurses',
+             'href': 'https://services.onetcenter.org/ws/online/occupations/29-2061.00/',
+             'tags': {'bright_outlook': False, 'green': False}}
+        ]}
+    }]
+}
+
+
+class TestProjection:
+
+    def test_lists_are_traversed(self):
+        projected = project(CROSSWALK, 'match.occupations.occupation.code')
+
+        assert projected == {'match': [{'occupations': {'occupation': [
+            {'code': '29-2042.00'}, {'code': '29-2061.00'}
+        ]}}]}
+
+    def test_selected_node_keeps_its_subtree(self):
+        projected = project(CROSSWALK, 'match.occupations.occupation.tags,match.occupations.occupation.tags.green')
+
+        assert projected['match'][0]['occupations']['occupation'][0] == {'tags': {'bright_outlook': True, 'green': False}}
+
+    def test_wildcard_matches_any_key(self):
+        reports = {'29-2042.00': {'code': '29-2042.00', 'career': {'title': 'EMT', 'what_they_do': '...'}}}
+
+        assert project({'career_reports': reports}, 'career_reports.*.career.title') == {
+            'career_reports': {'29-2042.00': {'career': {'title': 'EMT'}}}
+        }
+
+    def test_missing_fields_are_skipped(self):
+        assert project(CROSSWALK, 'keyword,nonexistent.path') == {'keyword': '68W'}
+
+    def test_no_fields_returns_data_unchanged(self):
+        assert project(CROSSWALK, None) is CROSSWALK
+
+    def test_presets_compile(self):
+        for name in PRESETS:
+            assert compile_projection(name).tree
+
+    def test_compiled_specs_are_reused(self):
+        assert compile_projection('keyword,total') is compile_projection('keyword,total')
+
+    @pytest.mark.parametrize('spec', ['', ',', 'match..code', 'match.code[0]', 'a.*,a.b'])
+    def test_invalid_specs_raise(self, spec):
+        with pytest.raises(ValueError):
+            compile_projection(spec)
+
+    def test_fields_spec_accepts_strings_and_lists_of_strings(self):
+        assert fields_spec('list') == 'list'
+        assert fields_spec(['session_id', 'onet_careers.total']) == 'session_id,onet_careers.total'
+        assert fields_spec(None) is None
+
+    @pytest.mark.parametrize('fields', [5, {'a': 1}, ['session_id', 5], ('session_id',)])
+    def test_fields_spec_rejects_other_types(self, fields):
+        with pytest.raises(ValueError):
+            fields_spec(fields)
+
+
+class TestHandlerProjection:
+
+    @pytest.fixture(autouse=True)
+    def offline(self, monkeypatch):
+        monkeypatch.setattr(lambda_function, 'get_onet_crosswalk_data', lambda code, branch=None: CROSSWALK)
+        monkeypatch.setattr(lambda_function, 'store_session', lambda *args: None)
+
+    def recommend(self, **extra):
+        body = {'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False, 'education': 'bachelor', **extra}
+        return lambda_function.lambda_handler({'httpMethod': 'POST', 'path': '/recommend', 'body': json.dumps(body)}, None)
+
+    def test_list_preset_drops_profile_and_hrefs(self):
+        response = self.recommend(fields='list')
+        data = json.loads(response['body'])
+
+        assert response['statusCode'] == 200
+        assert 'profile' not in data
+        assert data['onet_careers']['match'][0]['occupations']['occupation'][0] == {
+            'code': '29-2042.00', 'title': 'Emergency Medical Technicians',
+            'tags': {'bright_outlook': True, 'green': False}
+        }
+        assert len(response['body']) < len(self.recommend()['body'])
+
+    def test_invalid_fields_is_a_bad_request(self):
+        response = self.recommend(fields='onet_careers..match')
+
+        assert response['statusCode'] == 400
+
+    @pytest.mark.parametrize('fields', [5, {'a': 1}, ['session_id', None]])
+    def test_fields_of_the_wrong_type_is_a_bad_request(self, fields):
+        response = self.recommend(fields=fields)
+
+        assert response['statusCode'] == 400
+        assert 'fields must be a string or a list of strings' in response['body']
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import lambda_function
+from src import aws_clients
+from src.prompt_cache import CACHE_POINT, mark_history_cache_point, supports_caching, system_blocks
+
+CACHING_MODEL = 'us.anthropic.claude-3-7-sonnet-20250219-v1:0'
+NON_CACHING_MODEL = 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'
+
+
+class TestSystemBlocks:
+
+    def test_cache_point_sits_between_static_and_dynamic(self):
+        blocks = system_blocks('static', 'dynamic', CACHING_MODEL)
+
+        assert blocks == [{'text': 'static'}, CACHE_POINT, {'text': 'dynamic'}]
+
+    def test_no_cache_point_for_models_without_caching(self):
+        assert not supports_caching(NON_CACHING_MODEL)
+        assert system_blocks('static', 'dynamic', NON_CACHING_MODEL) == [{'text': 'static'}, {'text': 'dynamic'}]
+
+    def test_history_cache_point_is_added_to_last_message_only(self):
+        messages = [
+            {'role': 'user', 'content': [{'text': 'hi'}]},
+            {'role': 'assistant', 'content': [{'text': 'hello'}]}
+        ]
+        original_last = messages[-1]
+
+        marked = mark_history_cache_point(messages, CACHING_MODEL)
+
+        assert marked[-1]['content'] == [{'text': 'hello'}, CACHE_POINT]
+        assert marked[0]['content'] == [{'text': 'hi'}]
+        assert original_last['content'] == [{'text': 'hello'}]
+
+
+class TestSentraPromptCaching:
+
+    @pytest.fixture
+    def bedrock(self, monkeypatch):
+        calls = []
+
+        class FakeBedrock:
+            def converse(self, **kwargs):
+                calls.append(kwargs)
+                return {
+                    'output': {'message': {'content': [{'text': 'Welcome back.'}]}},
+                    'usage': {'inputTokens': 40, 'outputTokens': 5, 'cacheReadInputTokens': 1500}
+                }
+
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: FakeBedrock())
+        monkeypatch.setattr(lambda_function, 'store_conversation_turn', lambda *args: None)
+        monkeypatch.setattr(lambda_function, 'SENTRA_MODEL_ID', CACHING_MODEL)
+        return calls
+
+    def converse(self, profile):
+        return lambda_function.lambda_handler({
+            'httpMethod': 'POST',
+            'path': '/sentra/conversation',
+            'body': json.dumps({'sessionId': 's1', 'message': 'hello',
+                                'veteranContext': {'veteranProfile': profile}})
+        }, None)
+
+    def test_static_prefix_is_identical_across_veterans(self, bedrock, capsys):
+        self.converse({'branch': 'army', 'mos': '68W'})
+        self.converse({'branch': 'navy', 'mos': 'HM'})
+
+        first, second = (call['system'] for call in bedrock)
+        assert first[0] == second[0] == {'text': lambda_function.SENTRA_STATIC_PROMPT}
+        assert first[1] == second[1] == CACHE_POINT
+        assert first[2] != second[2]
+        assert '"cacheReadInputTokens": 1500' in capsys.readouterr().out
@@ -0,0 +1,93 @@
+import json
+import time
+
+import pytest
+
+import lambda_function
+from src.report_prefetch import MAX_PREFETCH_REPORTS, career_soc_codes, prefetch_reports
+
+
+def crosswalk_with(soc_codes):
+    return {
+        'keyword': '68W',
+        'total': 1,
+        'match': [{
+            'code': '68W',
+            'title': 'Combat Medic Specialist',
+            'occupations': {'occupation': [{'code': soc, 'title': f'Occupation {soc}'} for soc in soc_codes]}
+        }]
+    }
+
+
+class TestCareerSocCodes:
+
+    def test_veterans_military_shape(self, veterans_military_response):
+        assert career_soc_codes(veterans_military_response, 200) == ['29-2042.00', '29-2061.00', '29-1141.00']
+
+    def test_crosswalk_shape_is_deduplicated_across_matches(self):
+        crosswalk = crosswalk_with(['29-2042.00', '29-2061.00'])
+        crosswalk['match'].append(crosswalk_with(['29-2061.00', '31-9092.00'])['match'][0])
+
+        assert career_soc_codes(crosswalk, 200) == ['29-2042.00', '29-2061.00', '31-9092.00']
+
+    def test_limit(self, veterans_military_response):
+        assert career_soc_codes(veterans_military_response, 2) == ['29-2042.00', '29-2061.00']
+        assert career_soc_codes({}, 10) == []
+
+
+class TestPrefetchReports:
+
+    def test_deadline_returns_partial_results(self):
+        def fetch(soc_code):
+            if soc_code == 'slow':
+                time.sleep(1)
+            if soc_code == 'broken':
+                raise Exception('O*NET API returned status 503')
+            return {'code': soc_code}
+
+        started = time.perf_counter()
+        reports, errors = prefetch_reports(['fast', 'slow', 'broken'], fetch, deadline_seconds=0.2)
+
+        assert time.perf_counter() - started < 0.9
+        assert reports == {'fast': {'code': 'fast'}}
+        assert errors == {'slow': 'timeout', 'broken': 'O*NET API returned status 503'}
+
+
+class TestRecommendPrefetch:
+
+    @pytest.fixture
+    def recommend(self, monkeypatch):
+        fetched = []
+        crosswalk = crosswalk_with([f'29-{2000 + i}.00' for i in range(MAX_PREFETCH_REPORTS + 5)])
+        monkeypatch.setattr(lambda_function, 'get_crosswalk_index', lambda: None)
+        monkeypatch.setattr(lambda_function, 'fetch_onet_crosswalk', lambda code, params: crosswalk)
+        monkeypatch.setattr(lambda_function, 'store_session', lambda *args: None)
+        monkeypatch.setattr(lambda_function, 'fetch_career_report',
+                            lambda soc_code: fetched.append(soc_code) or {'code': soc_code})
+        lambda_function.get_crosswalk_cache.cache_clear()
+
+        def recommend(prefetch_reports):
+            response = lambda_function.lambda_handler({
+                'httpMethod': 'POST',
+                'path': '/recommend',
+                'body': json.dumps({'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False,
+                                    'education': 'high_school', 'prefetchReports': prefetch_reports})
+            }, None)
+            lambda_function.get_crosswalk_cache.cache_clear()
+            assert response['statusCode'] == 200
+            return json.loads(response['body']), fetched
+
+        return recommend
+
+    def test_prefetch_count_is_capped(self, recommend):
+        body, fetched = recommend(MAX_PREFETCH_REPORTS * 5)
+
+        assert len(fetched) == MAX_PREFETCH_REPORTS
+        assert len(body['career_reports']) == MAX_PREFETCH_REPORTS
+        assert body['career_report_errors'] == {}
+
+    def test_not_prefetched_unless_asked(self, recommend):
+        body, fetched = recommend(0)
+
+        assert fetched == []
+        assert 'career_reports' not in body
@@ -0,0 +1,79 @@
+import base64
+import json
+
+import pytest
+
+from src.router import Request, Router
+
+
+def echo(name):
+    return lambda request, context: {'handler': name, 'params': request.path_params, 'route': request.route}
+
+
+@pytest.fixture
+def router():
+    router = Router(default=echo('default'))
+    router.add('POST', '/recommend', echo('recommend'))
+    router.add('GET', '/career/{soc}', echo('career'))
+    router.add('GET', '/autocomplete', echo('autocomplete'))
+    return router
+
+
+class TestRouter:
+
+    def test_pattern_params(self, router):
+        result = router.dispatch(Request({'httpMethod': 'GET', 'path': '/career/29-2042.00/'}), None)
+
+        assert result == {'handler': 'career', 'params': {'soc': '29-2042.00'}, 'route': 'GET /career/{soc}'}
+
+    def test_method_mismatch_falls_back_to_default(self, router):
+        request = Request({'httpMethod': 'GET', 'path': '/recommend'})
+
+        assert router.dispatch(request, None)['handler'] == 'default'
+        assert request.route == 'default'
+
+    def test_unknown_path_without_default_raises(self):
+        router = Router()
+        router.add('GET', '/autocomplete', echo('autocomplete'))
+
+        with pytest.raises(LookupError):
+            router.dispatch(Request({'httpMethod': 'GET', 'path': '/nowhere'}), None)
+
+    def test_partial_segments_do_not_match(self, router):
+        request = Request({'httpMethod': 'GET', 'path': '/myautocomplete'})
+
+        assert router.dispatch(request, None)['handler'] == 'default'
+
+
+class TestRequest:
+
+    def test_rest_api_v1_event(self, router):
+        request = Request({
+            'httpMethod': 'post',
+            'path': '/recommend',
+            'headers': {'Accept-Encoding': 'gzip'},
+            'queryStringParameters': None,
+            'body': json.dumps({'code': '68W'})
+        })
+
+        assert (request.method, request.query, request.headers) == ('POST', {}, {'accept-encoding': 'gzip'})
+        assert request.body == {'code': '68W'}
+        assert router.dispatch(request, None)['handler'] == 'recommend'
+
+    def test_http_api_v2_event_with_stage_prefix(self, router):
+        request = Request({
+            'version': '2.0',
+            'rawPath': '/prod/autocomplete',
+            'requestContext': {'http': {'method': 'GET'}},
+            'queryStringParameters': {'q': '68'},
+            'body': base64.b64encode(b'{"q": "68"}').decode(),
+            'isBase64Encoded': True
+        })
+
+        assert request.method == 'GET'
+        assert request.body == {'q': '68'}
+        assert router.dispatch(request, None)['handler'] == 'autocomplete'
+
+    def test_invalid_json_body_is_a_value_error(self):
+        with pytest.raises(ValueError, match='Invalid JSON body'):
+            Request({'httpMethod': 'POST', 'path': '/recommend', 'body': '{nope'}).body
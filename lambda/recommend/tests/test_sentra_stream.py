@@ -0,0 +1,127 @@
+import json
+import time
+
+import pytest
+
+import lambda_function
+from src import aws_clients
+from src.sentra_stream import WebSocketSink, stream_reply
+
+REPLY = ['Thanks for ', 'your service. ', 'Combat medics ', 'often move into ', 'EMT and nursing roles.']
+
+
+class FakeBedrockStream:
+    """Stands in for bedrock-runtime; converse_stream yields text deltas with a delay before each"""
+
+    def __init__(self, chunks=REPLY, delay_seconds=0.0, fail_after=None):
+        self.chunks = chunks
+        self.delay_seconds = delay_seconds
+        self.fail_after = fail_after
+        self.calls = []
+
+    def converse_stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return {'stream': self._events()}
+
+    def _events(self):
+        yield {'messageStart': {'role': 'assistant'}}
+        for i, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError('ThrottlingException')
+            time.sleep(self.delay_seconds)
+            yield {'contentBlockDelta': {'contentBlockIndex': 0, 'delta': {'text': chunk}}}
+        yield {'contentBlockStop': {'contentBlockIndex': 0}}
+        yield {'messageStop': {'stopReason': 'end_turn'}}
+        yield {'metadata': {'usage': {'inputTokens': 900, 'outputTokens': 25, 'totalTokens': 925}}}
+
+
+class FakeApiGatewayManagement:
+
+    def __init__(self):
+        self.frames = []
+
+    def post_to_connection(self, ConnectionId, Data):
+        self.frames.append((ConnectionId, json.loads(Data)))
+
+
+class TestStreamReply:
+
+    def test_deltas_are_forwarded_as_they_arrive(self):
+        received = []
+
+        result = stream_reply(FakeBedrockStream(delay_seconds=0.05), received.append)
+
+        assert [event['text'] for event in received] == REPLY
+        assert result.text == ''.join(REPLY)
+        assert result.stop_reason == 'end_turn'
+        assert result.usage['outputTokens'] == 25
+        # First token arrives long before the stream finishes
+        assert result.ttft_ms < result.total_ms / 2
+
+    def test_websocket_sink_coalesces_small_deltas(self, monkeypatch):
+        api = FakeApiGatewayManagement()
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: api)
+        sink = WebSocketSink('conn-1', endpoint_url='https://ws.example', flush_chars=20)
+
+        stream_reply(FakeBedrockStream(), sink.send)
+        sink.close()
+
+        texts = [frame['text'] for _, frame in api.frames]
+        assert ''.join(texts) == ''.join(REPLY)
+        assert len(texts) < len(REPLY)
+        assert all(connection == 'conn-1' for connection, _ in api.frames)
+
+
+class TestSentraStreamingRoute:
+
+    @pytest.fixture
+    def bedrock(self, monkeypatch):
+        fake = FakeBedrockStream()
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: fake)
+        return fake
+
+    @pytest.fixture
+    def stored_turns(self, monkeypatch):
+        turns = []
+        monkeypatch.setattr(lambda_function, 'store_conversation_turn', lambda *args: turns.append(args))
+        return turns
+
+    def post(self, **body):
+        return lambda_function.lambda_handler({
+            'httpMethod': 'POST',
+            'path': '/sentra/conversation',
+            'body': json.dumps({'sessionId': 's1', 'veteranContext': {'veteranProfile': {}}, **body})
+        }, None)
+
+    def test_ndjson_events_and_turn_persisted_once(self, bedrock, stored_turns, capsys):
+        response = self.post(message='What jobs fit a 68W?', stream=True)
+
+        assert response['headers']['Content-Type'] == 'application/x-ndjson'
+        events = [json.loads(line) for line in response['body'].splitlines()]
+        assert events[0]['type'] == 'start'
+        assert ''.join(e['text'] for e in events if e['type'] == 'delta') == ''.join(REPLY)
+        assert events[-1]['type'] == 'done'
+
+        assert len(stored_turns) == 1
+        assert stored_turns[0][2:] == ('What jobs fit a 68W?', ''.join(REPLY))
+        assert 'SentraTimeToFirstToken' in capsys.readouterr().out
+
+    def test_stream_failure_is_reported_and_not_persisted(self, bedrock, stored_turns):
+        bedrock.fail_after = 2
+
+        response = self.post(message='hello', stream=True)
+
+        assert response['statusCode'] == 500
+        assert stored_turns == []
+
+    def test_websocket_transport(self, monkeypatch, stored_turns):
+        bedrock, api = FakeBedrockStream(), FakeApiGatewayManagement()
+        clients = {'bedrock-runtime': bedrock, 'apigatewaymanagementapi': api}
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: clients[service_name])
+        monkeypatch.setattr(lambda_function, 'SENTRA_WEBSOCKET_ENDPOINT', 'https://ws.example/prod')
+
+        response = self.post(message='hello', stream=True, connectionId='conn-1')
+
+        assert json.loads(response['body'])['streamed'] is True
+        assert [frame['type'] for _, frame in api.frames][0] == 'start'
+        assert [frame['type'] for _, frame in api.frames][-1] == 'done'
@@ -0,0 +1,132 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import lambda_function
+from src import aws_clients, session_store
+from src.session_store import BackgroundWriter, CrosswalkBlobStore, encode_crosswalk, load_crosswalk, session_item
+
+CROSSWALK = {
+    'keyword': '68W',
+    'total': 1,
+    'match': [{'code': '68W', 'occupations': {'occupation': [{'code': '29-2042.00', 'title': 'EMTs'}]}}]
+}
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client"""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = 0
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[(Bucket, Key)] = Body
+        self.puts += 1
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+class FakeSessionsTable:
+
+    def __init__(self, delay_seconds=0.0):
+        self.delay_seconds = delay_seconds
+        self.items = []
+
+    def put_item(self, Item):
+        time.sleep(self.delay_seconds)
+        self.items.append(Item)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: fake)
+    return fake
+
+
+@pytest.fixture
+def blob_store(s3, monkeypatch):
+    store = CrosswalkBlobStore('vetroi-sessions')
+    monkeypatch.setattr(session_store, 'blob_store', store)
+    return store
+
+
+class TestSessionItem:
+
+    def test_hash_ignores_key_order(self):
+        reordered = json.loads(json.dumps(CROSSWALK, sort_keys=True))
+
+        assert encode_crosswalk(CROSSWALK)[0] == encode_crosswalk(reordered)[0]
+
+    def test_item_references_blob_instead_of_embedding_crosswalk(self, blob_store, s3):
+        item = session_item('s1', 1_700_000_000, {'code': '68W'}, CROSSWALK)
+
+        assert 'onet_careers' not in item
+        assert item['onet_careers_ref'] == f"s3://vetroi-sessions/crosswalks/{item['onet_careers_hash']}.json.zz"
+        assert load_crosswalk(item) == CROSSWALK
+
+    def test_identical_crosswalks_are_uploaded_once(self, blob_store, s3):
+        first = session_item('s1', 1, {}, CROSSWALK)
+        second = session_item('s2', 2, {}, CROSSWALK)
+
+        assert first['onet_careers_hash'] == second['onet_careers_hash']
+        assert s3.puts == 1
+        assert blob_store.skipped == 1
+
+    def test_without_bucket_blob_is_inline_and_compressed(self, monkeypatch):
+        monkeypatch.setattr(session_store, 'blob_store', None)
+
+        item = session_item('s1', 1, {}, CROSSWALK)
+
+        assert len(item['onet_careers_blob']) < len(json.dumps(CROSSWALK))
+        assert load_crosswalk(item) == CROSSWALK
+
+    def test_legacy_items_still_load(self):
+        assert load_crosswalk({'onet_careers': CROSSWALK}) == CROSSWALK
+
+
+class TestBackgroundWriter:
+
+    def test_flush_waits_for_pending_writes(self):
+        writer = BackgroundWriter()
+        written = []
+
+        writer.submit(lambda: (time.sleep(0.1), written.append(1)))
+
+        assert writer.flush(timeout=2) == 0
+        assert written == [1]
+
+    def test_flush_reports_writes_past_the_timeout(self):
+        writer = BackgroundWriter()
+        release = threading.Event()
+
+        writer.submit(release.wait)
+
+        assert writer.flush(timeout=0.05) == 1
+        release.set()
+        assert writer.flush(timeout=2) == 0
+
+
+class TestRecommendSessionWrite:
+
+    def test_session_write_overlaps_and_is_flushed_before_return(self, blob_store, monkeypatch):
+        table = FakeSessionsTable(delay_seconds=0.2)
+        monkeypatch.setattr(aws_clients, 'table', lambda name, **kwargs: table)
+        monkeypatch.setattr(lambda_function, 'get_onet_crosswalk_data', lambda code, branch=None: CROSSWALK)
+
+        body = {'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False, 'education': 'bachelor'}
+        response = lambda_function.lambda_handler(
+            {'httpMethod': 'POST', 'path': '/recommend', 'body': json.dumps(body)}, None
+        )
+
+        assert response['statusCode'] == 200
+        assert len(table.items) == 1
+        item = table.items[0]
+        assert item['session_id'] == json.loads(response['body'])['session_id']
+        assert 'onet_careers' not in item
+        assert load_crosswalk(item) == CROSSWALK
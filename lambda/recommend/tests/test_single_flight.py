@@ -0,0 +1,95 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+import lambda_function
+from src import onet_session
+from src.single_flight import SingleFlight, onet_flights
+
+CALLERS = 8
+
+
+@pytest.fixture
+def onet(fake_onet, monkeypatch):
+    """Point the recommend handler at the fake O*NET with a cold cache"""
+    monkeypatch.setattr(onet_session, 'ONET_BASE_URL', fake_onet.base_url)
+    monkeypatch.setattr(onet_session.credentials, 'get_auth_header', lambda: 'Basic dGVzdDp0ZXN0')
+    monkeypatch.setattr(lambda_function, 'get_crosswalk_index', lambda: None)
+    lambda_function.get_crosswalk_cache().local.clear()
+    fake_onet.latency_seconds = 0.3
+    return fake_onet
+
+
+def run_concurrently(fn, callers=CALLERS):
+    barrier = threading.Barrier(callers)
+
+    def call():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        return [f.result() for f in [pool.submit(call) for _ in range(callers)]]
+
+
+class TestSingleFlight:
+
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        def slow_lookup():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'total': 25}
+
+        results = run_concurrently(lambda: flights.do('68W#army', slow_lookup))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flights.stats() == {'executed': 1, 'coalesced': CALLERS - 1, 'in_flight': 0}
+
+    def test_failure_is_shared_then_cleared(self):
+        flights = SingleFlight()
+
+        def failing_lookup():
+            time.sleep(0.2)
+            raise RuntimeError('O*NET unavailable')
+
+        def call():
+            try:
+                flights.do('11B#army', failing_lookup)
+            except RuntimeError as e:
+                return str(e)
+
+        assert run_concurrently(call) == ['O*NET unavailable'] * CALLERS
+        assert flights.do('11B#army', lambda: 'recovered') == 'recovered'
+
+    def test_distinct_keys_do_not_coalesce(self):
+        flights = SingleFlight()
+
+        assert flights.do('a', lambda: 1) == 1
+        assert flights.do('b', lambda: 2) == 2
+        assert flights.coalesced == 0
+
+
+class TestONetCoalescing:
+
+    def test_crosswalk_lookups_make_one_upstream_call(self, onet):
+        """N concurrent recommend lookups for the same MOS reach O*NET once"""
+        coalesced_before = onet_flights.coalesced
+
+        results = run_concurrently(lambda: lambda_function.get_onet_crosswalk_data('68W', 'army'))
+
+        assert onet.count('/online/crosswalks/military') == 1
+        assert all(result['total'] == 1 for result in results)
+        assert onet_flights.coalesced - coalesced_before == CALLERS - 1
+
+    def test_career_reports_make_one_upstream_call(self, onet):
+        """N concurrent /career/{soc} requests for the same SOC reach O*NET once"""
+        responses = run_concurrently(lambda: lambda_function.lambda_handler(
+            {'httpMethod': 'GET', 'path': '/career/29-2042.00'}, None
+        ))
+
+        assert onet.count('/mnm/careers/29-2042.00/report') == 1
+        assert all(response['statusCode'] == 200 for response in responses)
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+
+import pytest
+
+import lambda_function
+from src import stage_timing
+from src.session_store import BackgroundWriter
+from src.stage_timing import request_timer, set_cache_hit, stage, timed_stage
+
+
+def emf_lines(output):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"_aws"')]
+
+
+@pytest.fixture
+def warm(monkeypatch):
+    monkeypatch.setattr(stage_timing, '_cold_start', False)
+
+
+class TestStageTiming:
+
+    def test_stages_are_emitted_as_one_emf_line(self, warm, capsys):
+        with request_timer('POST /recommend'):
+            with stage('Crosswalk'):
+                time.sleep(0.002)
+            with stage('Serialize'):
+                pass
+            set_cache_hit(True)
+
+        [line] = emf_lines(capsys.readouterr().out)
+        assert line['Route'] == 'POST /recommend'
+        assert line['CacheHit'] == 'true'
+        assert line['ColdStart'] == 'false'
+        assert line['CrosswalkDuration'] >= 2
+        assert line['RequestDuration'] >= line['CrosswalkDuration']
+        [directive] = line['_aws']['CloudWatchMetrics']
+        assert directive['Dimensions'] == [['Route', 'CacheHit', 'ColdStart'], ['Route']]
+        assert {metric['Name'] for metric in directive['Metrics']} == {
+            'CrosswalkDuration', 'SerializeDuration', 'RequestDuration'
+        }
+
+    def test_repeated_stages_report_every_value(self, warm, capsys):
+        @timed_stage('Report')
+        def fetch(soc):
+            return soc
+
+        with request_timer('GET /career/{soc}'):
+            assert [fetch(soc) for soc in ('a', 'b', 'c')] == ['a', 'b', 'c']
+
+        [line] = emf_lines(capsys.readouterr().out)
+        assert len(line['ReportDuration']) == 3
+        assert line['CacheHit'] == 'none'
+
+    def test_only_the_first_request_is_cold(self, monkeypatch, capsys):
+        monkeypatch.setattr(stage_timing, '_cold_start', True)
+
+        for _ in range(2):
+            with request_timer('GET /autocomplete'):
+                pass
+
+        assert [line['ColdStart'] for line in emf_lines(capsys.readouterr().out)] == ['true', 'false']
+
+    def test_emitted_when_the_request_fails(self, warm, capsys):
+        with pytest.raises(RuntimeError):
+            with request_timer('POST /recommend'):
+                with stage('Crosswalk'):
+                    raise RuntimeError('boom')
+
+        [line] = emf_lines(capsys.readouterr().out)
+        assert 'CrosswalkDuration' in line
+
+    def test_background_writes_are_timed_on_their_request(self, warm, capsys):
+        writer = BackgroundWriter()
+
+        with request_timer('POST /recommend'):
+            writer.submit(timed_stage('StoreSession')(lambda: time.sleep(0.001)))
+            writer.flush(1)
+
+        [line] = emf_lines(capsys.readouterr().out)
+        assert line['StoreSessionDuration'] >= 1
+
+    def test_background_write_past_the_flush_is_dropped(self, warm, capsys):
+        writer = BackgroundWriter()
+        release = threading.Event()
+
+        with request_timer('POST /recommend') as timer:
+            writer.submit(timed_stage('StoreSession')(release.wait))
+            writer.flush(0.01)
+
+        release.set()
+        assert writer.flush(1) == 0
+        [line] = emf_lines(capsys.readouterr().out)
+        assert 'StoreSessionDuration' not in line
+        assert timer.closed and 'StoreSession' not in timer.stages
+
+    def test_emf_failure_does_not_escape_the_request(self, warm, monkeypatch, capsys):
+        def broken(timer):
+            raise RuntimeError('dictionary changed size during iteration')
+        monkeypatch.setattr(stage_timing.RequestTimer, 'emf', broken)
+
+        with request_timer('POST /recommend'):
+            pass
+
+        assert 'Stage timing EMF failed' in capsys.readouterr().out
+
+    def test_outside_a_request_nothing_is_recorded(self, capsys):
+        with stage('Crosswalk'):
+            pass
+        assert timed_stage('Report')(lambda: 7)() == 7
+        set_cache_hit(False)
+
+        assert capsys.readouterr().out == ''
+
+
+class TestRecommendStages:
+
+    def test_recommend_reports_pipeline_stages(self, warm, monkeypatch, capsys):
+        crosswalk = {'keyword': '68W', 'total': 1, 'match': []}
+        monkeypatch.setattr(lambda_function, 'get_crosswalk_index', lambda: None)
+        monkeypatch.setattr(lambda_function, 'fetch_onet_crosswalk',
+                            timed_stage('ONetCrosswalk')(lambda code, params: crosswalk))
+        monkeypatch.setattr(lambda_function, 'store_session', timed_stage('StoreSession')(lambda *args: None))
+        lambda_function.get_crosswalk_cache.cache_clear()
+
+        lambda_function.lambda_handler({
+            'httpMethod': 'POST',
+            'path': '/recommend',
+            'body': json.dumps({'branch': 'army', 'code': '68W', 'homeState': 'TX', 'relocate': False,
+                                'education': 'high_school'})
+        }, None)
+        lambda_function.get_crosswalk_cache.cache_clear()
+
+        [line] = emf_lines(capsys.readouterr().out)
+        assert line['Route'] == 'POST /recommend'
+        assert line['CacheHit'] == 'false'
+        for name in ('Crosswalk', 'ONetCrosswalk', 'StoreSession', 'Wages', 'Serialize', 'SessionFlush', 'Compress'):
+            assert f'{name}Duration' in line
@@ -0,0 +1,142 @@
+import json
+import random
+
+import pytest
+
+import lambda_function
+from src import aws_clients
+from vetroi_shared.token_budget import (
+    COEFFICIENTS, MIN_OUTPUT_TOKENS, ContextOverflowError, calibrate, estimate_from_features,
+    estimate_tokens, input_budget, message_tokens, model_limits, output_budget, token_features,
+    truncate_to_tokens
+)
+
+SONNET = 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'
+NOVA_LITE = 'us.amazon.nova-lite-v1:0'
+
+
+class TestEstimate:
+
+    def test_numbers_and_json_cost_more_than_prose_of_the_same_length(self):
+        prose = 'the veteran served as a combat medic ' * 20
+        data = json.dumps([{'soc': f'29-{2000 + i}.00', 'median': 40_000 + i} for i in range(25)])[:len(prose)]
+
+        assert estimate_tokens(data) > estimate_tokens(prose)
+
+    def test_empty_text_is_free(self):
+        assert estimate_tokens('') == 0
+
+    def test_message_tokens_count_text_blocks_only(self):
+        messages = [
+            {'role': 'user', 'content': [{'text': 'hello there'}, {'cachePoint': {'type': 'default'}}]},
+            {'role': 'assistant', 'content': [{'text': 'hi'}]}
+        ]
+
+        assert message_tokens(messages) == estimate_tokens('hello there') + estimate_tokens('hi')
+        assert message_tokens([{'text': 'system prompt'}]) == estimate_tokens('system prompt')
+
+    def test_truncate_fits_budget_on_a_word_boundary(self):
+        text = 'word ' * 1000
+
+        cut = truncate_to_tokens(text, 100)
+
+        assert estimate_tokens(cut) <= 100
+        assert cut.endswith('word')
+        assert truncate_to_tokens('short', 100) == 'short'
+
+
+class TestBudgets:
+
+    def test_output_budget_adds_headroom_within_model_cap(self):
+        assert output_budget(SONNET, 1_000, 1_000) == 1_250
+        assert output_budget(SONNET, 1_000, 50_000) == model_limits(SONNET).max_output_tokens
+        assert output_budget(NOVA_LITE, 1_000, 10) == MIN_OUTPUT_TOKENS
+
+    def test_ceiling_replaces_the_expected_size(self):
+        assert output_budget(SONNET, 1_000, 1_000, ceiling=4_096) == 4_096
+        assert output_budget(SONNET, 1_000, 1_000, ceiling=50_000) == model_limits(SONNET).max_output_tokens
+
+    def test_output_budget_shrinks_near_the_context_limit(self):
+        context = model_limits(SONNET).context_tokens
+
+        assert MIN_OUTPUT_TOKENS <= output_budget(SONNET, int(context / 1.1) - 500, 4_000) < 4_000
+
+    def test_overflow_raises(self):
+        with pytest.raises(ContextOverflowError):
+            output_budget(SONNET, model_limits(SONNET).context_tokens, 1_000)
+
+    def test_input_budget_leaves_room_for_the_reply(self):
+        budget = input_budget(SONNET, 1_000)
+
+        assert output_budget(SONNET, budget, 1_000) == 1_250
+
+
+class TestCalibrate:
+
+    def test_recovers_known_coefficients(self):
+        rng = random.Random(7)
+        truth = (0.6, 0.1, 0.4, 0.9, 1.5)
+        samples = []
+        for _ in range(200):
+            features = [rng.randint(0, 5_000) for _ in truth]
+            samples.append((features, estimate_from_features(features, truth)))
+
+        fitted = calibrate(samples)
+
+        assert fitted == pytest.approx(truth, abs=0.01)
+
+    def test_needs_enough_samples(self):
+        with pytest.raises(ValueError):
+            calibrate([(token_features('a b c'), 3)])
+
+    def test_unused_feature_stays_near_default(self):
+        rng = random.Random(3)
+        samples = []
+        for _ in range(50):
+            features = [rng.randint(1, 1_000) for _ in range(4)] + [0]
+            samples.append((features, estimate_from_features(features)))
+
+        assert calibrate(samples).non_ascii == pytest.approx(COEFFICIENTS.non_ascii)
+
+
+class TestSentraBudget:
+
+    @pytest.fixture
+    def bedrock(self, monkeypatch):
+        calls = []
+
+        class FakeBedrock:
+            def converse(self, **kwargs):
+                calls.append(kwargs)
+                return {
+                    'output': {'message': {'content': [{'text': 'Happy to help.'}]}},
+                    'usage': {'inputTokens': 900, 'outputTokens': 4},
+                    'stopReason': 'end_turn'
+                }
+
+        monkeypatch.setattr(aws_clients, 'client', lambda service_name, **kwargs: FakeBedrock())
+        monkeypatch.setattr(lambda_function, 'store_conversation_turn', lambda *args: None)
+        return calls
+
+    def converse(self, message):
+        return lambda_function.lambda_handler({
+            'httpMethod': 'POST',
+            'path': '/sentra/conversation',
+            'body': json.dumps({'sessionId': 's1', 'message': message,
+                                'veteranContext': {'veteranProfile': {'mos': '68W'}}})
+        }, None)
+
+    def test_max_tokens_keeps_the_sentra_ceiling(self, bedrock, capsys):
+        response = self.converse('What careers fit a combat medic?')
+
+        assert response['statusCode'] == 200
+        assert bedrock[0]['inferenceConfig']['maxTokens'] == lambda_function.SENTRA_MAX_OUTPUT_TOKENS == 4096
+        usage = json.loads(next(line for line in capsys.readouterr().out.splitlines() if 'bedrock_usage' in line))
+        assert usage['stopReason'] == 'end_turn'
+        assert len(usage['promptFeatures']) == len(COEFFICIENTS)
+
+    def test_oversized_message_is_rejected_before_bedrock(self, bedrock):
+        response = self.converse('12345 ' * 200_000)
+
+        assert response['statusCode'] == 413
+        assert bedrock == []
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+import lambda_function
+from src import onet_client
+from src.wage_table import TOP_CODED_ANNUAL, WageTable, build_table, load_table, main
+
+
+def oes_row(occ_code, state, median, area_type='2', group='detailed', **overrides):
+    row = {
+        'AREA_TYPE': area_type, 'PRIM_STATE': state, 'OCC_CODE': occ_code, 'O_GROUP': group,
+        'TOT_EMP': '12,340', 'A_MEAN': '52,000', 'A_PCT10': '35,000', 'A_PCT25': '41,000',
+        'A_MEDIAN': median, 'A_PCT75': '60,000', 'A_PCT90': '72,000'
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = str(tmp_path / 'wage_table.bin')
+    build_table([
+        oes_row('29-2042', 'US', '46,500', area_type='1'),
+        oes_row('29-2042', 'TX', '41,210'),
+        oes_row('29-2042', 'AK', '*', A_MEAN='*', A_PCT10='*', A_PCT25='*', A_PCT75='*', A_PCT90='*', TOT_EMP='*'),
+        oes_row('29-1229', 'US', '#', area_type='1', A_PCT75='#', A_PCT90='#'),
+        oes_row('29-0000', 'US', '80,000', area_type='1', group='major'),
+        oes_row('29-2042', 'TX', '99,999', area_type='4'),
+    ], path, source='May 2024')
+    return path
+
+
+class TestWageTable:
+
+    def test_lookup_by_onet_code(self, table_path):
+        wages = WageTable(table_path).lookup('29-2042.00', 'TX')
+
+        assert wages.median == 41_210
+        assert wages.employment == 12_340
+        assert (wages.p10, wages.p90) == (35_000, 72_000)
+
+    def test_top_coded_and_suppressed_values(self, table_path):
+        table = WageTable(table_path)
+
+        assert table.lookup('29-1229.01').median == TOP_CODED_ANNUAL
+        assert table.lookup('29-2042.00', 'AK') is None
+
+    def test_only_detailed_national_and_state_rows_are_kept(self, table_path):
+        table = WageTable(table_path)
+
+        assert table.socs == ['29-1229', '29-2042']
+        assert table.areas == ['US', 'AK', 'TX']
+        assert table.metadata['source'] == 'May 2024'
+
+    def test_batch_lookup_falls_back_to_national(self, table_path):
+        wages = WageTable(table_path).lookup_many(['29-2042.00', '29-1229.01', '11-1011.00'], 'AK')
+
+        assert wages['29-2042.00'].median == 46_500
+        assert wages['29-1229.01'].median == TOP_CODED_ANNUAL
+        assert wages['11-1011.00'] is None
+
+    def test_batch_lookup_without_fallback(self, table_path):
+        wages = WageTable(table_path).lookup_many(['29-2042.00'], 'AK', national_fallback=False)
+
+        assert wages['29-2042.00'] is None
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'not a wage table at all')
+
+        with pytest.raises(ValueError):
+            WageTable(str(path))
+        assert load_table(str(path)) is None
+
+    def test_missing_file_disables_wages(self, tmp_path):
+        assert load_table(str(tmp_path / 'missing.bin')) is None
+
+    def test_build_command(self, tmp_path):
+        csv_path = tmp_path / 'oes_state.csv'
+        csv_path.write_text(
+            'AREA,AREA_TYPE,PRIM_STATE,OCC_CODE,O_GROUP,TOT_EMP,A_MEAN,A_PCT10,A_PCT25,A_MEDIAN,A_PCT75,A_PCT90\n'
+            '48,2,TX,15-1232,detailed,"30,120","58,000","36,000","44,000","55,270","68,000","84,000"\n'
+        )
+        output = str(tmp_path / 'out.bin')
+
+        main(['build', str(csv_path), '--output', output])
+
+        assert WageTable(output).lookup('15-1232.00', 'TX').median == 55_270
+
+
+class TestRecommendWages:
+
+    def test_recommend_includes_wages_for_matched_careers(self, table_path, monkeypatch):
+        crosswalk = {'keyword': '68W', 'total': 1, 'match': [{
+            'code': '68W',
+            'occupations': {'occupation': [{'code': '29-2042.00'}, {'code': '29-1229.01'}]}
+        }]}
+        monkeypatch.setattr(lambda_function, 'get_wage_table', lambda: WageTable(table_path))
+        monkeypatch.setattr(lambda_function, 'get_onet_crosswalk_data', lambda code, branch: crosswalk)
+        monkeypatch.setattr(lambda_function, 'store_session', lambda *args: None)
+
+        response = lambda_function.lambda_handler({
+            'httpMethod': 'POST',
+            'path': '/recommend',
+            'body': json.dumps({'branch': 'army', 'code': '68W', 'homeState': 'FL', 'relocate': True,
+                                'relocateState': 'TX', 'education': 'high_school'})
+        }, None)
+
+        wages = json.loads(response['body'])['wages']
+        assert wages['29-2042.00']['median'] == 41_210
+        assert wages['29-1229.01']['median'] == TOP_CODED_ANNUAL
+
+
+class TestONetClientWages:
+
+    def test_wages_for_veterans_military_careers(self, table_path, veterans_military_response, monkeypatch):
+        monkeypatch.setattr(onet_client, '_onet_credentials', lambda secret_name: ('user', 'secret'))
+        monkeypatch.setattr(onet_client, 'get_wage_table', lambda: WageTable(table_path))
+
+        wages = onet_client.ONetClient().get_career_wages(veterans_military_response, 'TX')
+
+        # Only 29-2042 is in the test table; the crosswalk's other careers have no wages
+        assert list(wages) == ['29-2042.00']
+        assert wages['29-2042.00']['median'] == 41_210
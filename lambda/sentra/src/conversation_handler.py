@@ -6,11 +6,15 @@ import uuid
 from datetime import datetime, timedelta
 import hashlib
 
+from vetroi_shared.token_budget import ContextOverflowError, input_budget, message_tokens, output_budget
+
 bedrock_runtime = boto3.client('bedrock-runtime')
 dynamodb = boto3.resource('dynamodb')
 s3 = boto3.client('s3')
 
 MODEL_ID = os.environ.get('BEDROCK_MODEL_ID', 'anthropic.claude-3-5-sonnet-20241022-v2:0')
+EXPECTED_OUTPUT_TOKENS = int(os.environ.get('EXPECTED_OUTPUT_TOKENS', '1000'))
+MAX_OUTPUT_TOKENS = int(os.environ.get('MAX_OUTPUT_TOKENS', '2048'))
 CONVERSATION_TABLE = os.environ.get('CONVERSATION_TABLE')
 SESSION_TABLE = os.environ.get('SESSION_TABLE')
 DD214_BUCKET = os.environ.get('DD214_BUCKET')
@@ -44,16 +48,19 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Build Sentra's system prompt
         system_prompt = build_sentra_system_prompt(full_context)
         
-        # Prepare messages for Bedrock
-        messages = build_conversation_messages(conversation_history, message)
+        # Prepare messages for Bedrock, trimmed to the model's input budget
+        system = [{"text": system_prompt}]
+        messages = fit_messages(system, build_conversation_messages(conversation_history, message))
+        max_tokens = output_budget(MODEL_ID, message_tokens(system + messages), EXPECTED_OUTPUT_TOKENS,
+                                   ceiling=MAX_OUTPUT_TOKENS)
         
         # Call Bedrock Converse API
         response = bedrock_runtime.converse(
             modelId=MODEL_ID,
-            system=[{"text": system_prompt}],
+            system=system,
             messages=messages,
             inferenceConfig={
-                "maxTokens": 2048,
+                "maxTokens": max_tokens,
                 "temperature": 0.7,
                 "topP": 0.95
             }
@@ -81,6 +88,15 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             })
         }
         
+    except ContextOverflowError as e:
+        print(f"Sentra prompt too large: {str(e)}")
+        return {
+            'statusCode': 413,
+            'headers': headers,
+            'body': json.dumps({
+                'error': 'Message is too long for Sentra to answer; please shorten it'
+            })
+        }
     except Exception as e:
         print(f"Error in Sentra conversation: {str(e)}")
         return {
@@ -243,6 +259,16 @@ def build_conversation_messages(history: List[Dict], new_message: str) -> List[D
     
     return messages
 
+def fit_messages(system: List[Dict], messages: List[Dict]) -> List[Dict]:
+    """
+    Drop the oldest turns until system plus messages fit the model's input budget
+    """
+    budget = input_budget(MODEL_ID, EXPECTED_OUTPUT_TOKENS)
+    while len(messages) > 1 and message_tokens(system + messages) > budget:
+        # Keep the first message a user turn, as Converse requires
+        messages = messages[2:] if messages[1]["role"] == "assistant" else messages[1:]
+    return messages
+
 def load_conversation_history(conversation_id: str) -> List[Dict]:
     """
     Load previous conversation turns
@@ -0,0 +1,6 @@
+"""
+Modules shared by the VetROI Lambdas
+
+Deployed in SharedLibrariesLayer (importable from /opt/python). Lambdas
+packaged as standalone zips bundle this package next to their handler.
+"""
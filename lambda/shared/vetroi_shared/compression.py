@@ -0,0 +1,107 @@
+"""
+Accept-Encoding negotiation for API Gateway proxy responses
+
+Large JSON bodies (crosswalks, career reports, DD214 insights) are compressed
+with the encoding the client ranks highest by q-value, Brotli when the brotli
+package is importable, otherwise gzip. They are returned base64-encoded with
+isBase64Encoded. Bodies under the threshold are left alone: below about 1 KB
+the base64 overhead and CPU outweigh the saving.
+
+Only HTTP APIs decode isBase64Encoded bodies unconditionally. A REST API does
+so only for binaryMediaTypes, and VetROI_DD214_API defines none, so
+compress_event_response leaves REST API responses uncompressed.
+"""
+
+import base64
+import gzip
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}"""
+    encodings = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding the client accepts, or None for identity"""
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for identical payloads
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response: Dict[str, Any], accept_encoding: Optional[str],
+                      min_bytes: int = COMPRESSION_MIN_BYTES) -> Dict[str, Any]:
+    """Compress the response body in place when negotiated and large enough"""
+    body = response.get('body')
+    if not isinstance(body, str) or response.get('isBase64Encoded'):
+        return response
+
+    headers = response.setdefault('headers', {})
+    headers['Vary'] = 'Accept-Encoding'
+
+    raw = body.encode('utf-8')
+    if len(raw) < min_bytes:
+        return response
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    response['body'] = base64.b64encode(compress(raw, encoding)).decode('ascii')
+    response['isBase64Encoded'] = True
+    headers['Content-Encoding'] = encoding
+    return response
+
+
+def is_http_api_event(event: Dict[str, Any]) -> bool:
+    """HTTP API events carry a payload `version` ('1.0' or '2.0'); REST API events do not"""
+    return bool(event.get('version'))
+
+
+def compress_event_response(response: Dict[str, Any], event: Dict[str, Any],
+                            min_bytes: int = COMPRESSION_MIN_BYTES) -> Dict[str, Any]:
+    """compress_response for a proxy event, negotiated from its Accept-Encoding; HTTP APIs only"""
+    if not is_http_api_event(event):
+        return response
+    accept_encoding = next(
+        (value for name, value in (event.get('headers') or {}).items() if name.lower() == 'accept-encoding'), None
+    )
+    return compress_response(response, accept_encoding, min_bytes)
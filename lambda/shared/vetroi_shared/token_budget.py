@@ -0,0 +1,199 @@
+"""
+Token estimates and per-call input/output budgets for Bedrock
+
+The estimate is linear in a few cheap text features (words, letters, digits,
+symbols, non-ASCII characters), which tracks BPE tokenizers much better than
+a flat characters-per-token ratio on JSON, numbers and DD214 text. The
+default coefficients follow common English BPE ratios and can be refit from
+logged Bedrock usage with calibrate(); see
+lambda/recommend/benchmarks/bench_token_budget.py.
+
+Used by the recommend, sentra and dd214_insights Lambdas.
+"""
+
+import re
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_DIGIT_RE = re.compile(r"\d")
+_SYMBOL_RE = re.compile(r"[^\w\s]")
+
+
+class TokenFeatures(NamedTuple):
+    words: int
+    letters: int
+    digits: int
+    symbols: int
+    non_ascii: int
+
+
+# Tokens per unit of each feature; refit with calibrate() from recorded usage
+COEFFICIENTS = TokenFeatures(words=0.75, letters=0.08, digits=0.5, symbols=0.85, non_ascii=1.0)
+
+# Estimates are padded by this factor wherever an overflow would fail the call
+SAFETY_MARGIN = 1.1
+
+# Requested output is the expected size plus this headroom, so typical replies are not cut off
+OUTPUT_HEADROOM = 1.25
+MIN_OUTPUT_TOKENS = 256
+
+
+class ModelLimits(NamedTuple):
+    context_tokens: int
+    max_output_tokens: int
+
+
+# Model ID fragment -> limits; first match wins, so more specific fragments come first
+MODEL_LIMITS: Sequence[Tuple[str, ModelLimits]] = (
+    ('anthropic.claude-3-7-sonnet', ModelLimits(200_000, 64_000)),
+    ('anthropic.claude-sonnet-4', ModelLimits(200_000, 64_000)),
+    ('anthropic.claude-opus-4', ModelLimits(200_000, 32_000)),
+    ('anthropic.claude-3-5-sonnet', ModelLimits(200_000, 8_192)),
+    ('anthropic.claude-3-5-haiku', ModelLimits(200_000, 8_192)),
+    ('anthropic.claude-3', ModelLimits(200_000, 4_096)),
+    ('amazon.nova-micro', ModelLimits(128_000, 10_000)),
+    ('amazon.nova-lite', ModelLimits(300_000, 10_000)),
+    ('amazon.nova-pro', ModelLimits(300_000, 10_000)),
+)
+DEFAULT_LIMITS = ModelLimits(128_000, 4_096)
+
+
+class ContextOverflowError(ValueError):
+    """The input leaves too little of the model's context window for a reply"""
+
+
+def token_features(text: str) -> TokenFeatures:
+    words = _WORD_RE.findall(text)
+    return TokenFeatures(
+        words=len(words),
+        letters=sum(map(len, words)),
+        digits=len(_DIGIT_RE.findall(text)),
+        symbols=len(_SYMBOL_RE.findall(text)),
+        non_ascii=len(text) - len(text.encode('ascii', 'ignore'))
+    )
+
+
+def estimate_from_features(features: Sequence[int], coefficients: Sequence[float] = COEFFICIENTS) -> int:
+    return int(sum(f * c for f, c in zip(features, coefficients)) + 0.5)
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return estimate_from_features(token_features(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens by the estimate, on a word boundary when possible"""
+    estimate = estimate_tokens(text)
+    if estimate <= max_tokens:
+        return text
+
+    # Token density is close to uniform, so cut proportionally and tighten until it fits
+    limit = int(len(text) * max_tokens / estimate)
+    while limit > 0:
+        cut = text.rfind(' ', 0, limit)
+        candidate = text[:cut if cut > 0 else limit]
+        if estimate_tokens(candidate) <= max_tokens:
+            return candidate
+        limit = int(limit * 0.95)
+    return ''
+
+
+def message_features(messages: Iterable[dict]) -> TokenFeatures:
+    """Summed features of Converse messages or system blocks; non-text blocks are ignored"""
+    totals = [0] * len(COEFFICIENTS)
+    for message in messages:
+        blocks = message.get('content', [message])
+        for block in blocks:
+            if 'text' in block:
+                for i, value in enumerate(token_features(block['text'])):
+                    totals[i] += value
+    return TokenFeatures(*totals)
+
+
+def message_tokens(messages: Iterable[dict]) -> int:
+    return estimate_from_features(message_features(messages))
+
+
+def model_limits(model_id: str) -> ModelLimits:
+    for fragment, limits in MODEL_LIMITS:
+        if fragment in model_id:
+            return limits
+    return DEFAULT_LIMITS
+
+
+def input_budget(model_id: str, expected_output_tokens: int) -> int:
+    """Largest estimated input that still leaves room for the expected reply"""
+    limits = model_limits(model_id)
+    reserved = min(int(expected_output_tokens * OUTPUT_HEADROOM), limits.max_output_tokens)
+    return int((limits.context_tokens - reserved) / SAFETY_MARGIN)
+
+
+def output_budget(model_id: str, input_tokens: int, expected_output_tokens: int,
+                  ceiling: Optional[int] = None) -> int:
+    """
+    maxTokens for a call: the expected reply plus headroom, capped by the model and remaining context
+
+    A ceiling, when given, is requested instead of the expected size plus
+    headroom, for calls whose long replies must not be cut shorter than before.
+    """
+    limits = model_limits(model_id)
+    room = limits.context_tokens - int(input_tokens * SAFETY_MARGIN)
+    if room < MIN_OUTPUT_TOKENS:
+        raise ContextOverflowError(
+            f'Input of ~{input_tokens} tokens leaves {max(room, 0)} of {limits.context_tokens} for the reply'
+        )
+
+    wanted = ceiling if ceiling is not None else int(expected_output_tokens * OUTPUT_HEADROOM)
+    wanted = max(wanted, MIN_OUTPUT_TOKENS)
+    return min(wanted, limits.max_output_tokens, room)
+
+
+def calibrate(samples: Iterable[Tuple[Sequence[int], int]]) -> TokenFeatures:
+    """
+    Least-squares coefficients from (features, actual inputTokens) pairs
+
+    Samples come from the bedrock_usage log lines, which record prompt
+    features rather than prompt text.
+    """
+    size = len(COEFFICIENTS)
+    normal = [[0.0] * size for _ in range(size)]
+    target = [0.0] * size
+    count = 0
+    for features, tokens in samples:
+        count += 1
+        for i in range(size):
+            target[i] += features[i] * tokens
+            for j in range(size):
+                normal[i][j] += features[i] * features[j]
+
+    if count < size:
+        raise ValueError(f'Need at least {size} samples to calibrate, got {count}')
+
+    # Light ridge toward the defaults keeps unused features (e.g. no non-ASCII text) sensible
+    for i in range(size):
+        ridge = 1e-3 * (normal[i][i] or 1.0)
+        normal[i][i] += ridge
+        target[i] += ridge * COEFFICIENTS[i]
+
+    return TokenFeatures(*_solve(normal, target))
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Gaussian elimination with partial pivoting for the small calibration system"""
+    size = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        solution[r] = (rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))) / rows[r][r]
+    return solution
+